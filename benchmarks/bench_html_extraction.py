@@ -0,0 +1,76 @@
+# benchmarks/bench_html_extraction.py
+
+"""
+utils.data_processing.extract_text_from_html için karşılaştırmalı ölçüm.
+
+Eski (html.parser ile tüm sayfa metnini alan) çıkarma ile yeni ana içerik motoru,
+menü ve alt bilgi içeren büyük bir sentetik sayfa üzerinde karşılaştırılır.
+Süreler en iyi tekrarın süresidir; seslendirilecek karakter sayısı, hızlanma ve
+yeni motorun aşama süreleri raporlanır.
+
+Kullanım:
+    python -m benchmarks.bench_html_extraction
+"""
+
+import time
+
+from bs4 import BeautifulSoup
+
+from utils.html_extraction import HTML_PARSER, extract_main_text
+
+PARAGRAPH = (
+    "Çocukluğumun geçtiği o eski İstanbul sokaklarında, akşamüstü güneşi ağır ağır "
+    "batarken komşularımızın pencerelerinden yükselen ıhlamur kokusu hâlâ burnumdadır. "
+)
+NAV_ITEMS = "".join(f'<li><a href="/tur/{i}">Tür {i}</a></li>' for i in range(200))
+
+
+def build_page(paragraphs: int) -> str:
+    body = "".join(f"<p>{PARAGRAPH * 3}</p>" for _ in range(paragraphs))
+    return (
+        "<html><head><title>Kitap</title><style>body{color:#000}</style>"
+        "<script>var x = 1;</script></head><body>"
+        f'<header><nav class="navbar"><ul>{NAV_ITEMS}</ul></nav></header>'
+        f'<div class="sidebar"><ul>{NAV_ITEMS}</ul></div>'
+        f'<div class="content"><h1>Bölüm 1</h1>{body}</div>'
+        f'<footer><ul>{NAV_ITEMS}</ul><p>Tüm hakları saklıdır.</p></footer>'
+        "</body></html>"
+    )
+
+
+def legacy_extract(html: str) -> str:
+    """Önceki uygulama: tüm sayfa metni, yalnızca script/style atılır."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.extract()
+    return soup.get_text(separator=' ', strip=True)
+
+
+def measure(fn, html: str, repeat: int = 10) -> tuple[float, str]:
+    best = float("inf")
+    text = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = fn(html)
+        best = min(best, time.perf_counter() - started)
+    return best, text
+
+
+def main():
+    print(f"Ayrıştırıcı: {HTML_PARSER}")
+    for paragraphs in (50, 500, 2000):
+        html = build_page(paragraphs)
+        legacy_time, legacy_text = measure(legacy_extract, html)
+        new_time, new_text = measure(extract_main_text, html)
+        timings = {}
+        extract_main_text(html, timings)
+        stages = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items())
+        print(
+            f"{len(html) / 1024:8.0f} KB | eski: {legacy_time * 1000:7.1f} ms, {len(legacy_text):8d} karakter"
+            f" | yeni: {new_time * 1000:7.1f} ms, {len(new_text):8d} karakter"
+            f" | {legacy_time / new_time:4.1f}x | {stages}"
+        )
+
+
+if __name__ == "__main__":
+    main()
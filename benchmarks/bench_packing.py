@@ -0,0 +1,65 @@
+# benchmarks/bench_packing.py
+
+"""
+core.packing.PagePacker için ölçüm: sentetik şiir, diyalog ve düzyazı kitaplarında
+sayfa başına bir istek yerine birleştirilmiş parçalarla kaç TTS isteği yapıldığı,
+isteklerin bayt sınırını ne kadar doldurduğu ve gruplamanın kendi maliyeti.
+
+Kullanım:
+    python -m benchmarks.bench_packing [--pages 400]
+"""
+
+import time
+import random
+import argparse
+import statistics
+
+from core.packing import PagePacker, TTS_PACK_MAX_BYTES
+
+WORDS = ["gece", "yıldız", "rüzgâr", "deniz", "kapı", "ışık", "göl", "şehir", "ağaç", "sessizlik",
+         "çocuk", "yol", "güneş", "bulut", "pencere", "söz", "yürek", "sabah", "dağ", "gölge"]
+
+
+def make_page(rng: random.Random, min_words: int, max_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+def make_book(kind: str, page_count: int, rng: random.Random) -> list[str]:
+    pages = []
+    for page_index in range(page_count):
+        if kind == "şiir":
+            page = make_page(rng, 20, 80)
+        elif kind == "diyalog":
+            page = make_page(rng, 60, 250)
+        elif kind == "düzyazı":
+            page = make_page(rng, 300, 450)
+        else:  # karışık: her 12 sayfada bir bölüm başı ve boş sayfa
+            page = "" if page_index % 12 == 0 else make_page(rng, 10, 30) if page_index % 12 == 1 else make_page(rng, 250, 450)
+        pages.append(page)
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kısa sayfaları birleştirmenin TTS istek sayısına etkisi")
+    parser.add_argument("--pages", type=int, default=400, help="Kitap başına sayfa sayısı")
+    args = parser.parse_args()
+
+    print(f"{'kitap':<10} {'sayfa isteği':>13} {'parça isteği':>13} {'azalma':>8} {'doluluk':>9} {'gruplama':>10}")
+    for kind in ("şiir", "diyalog", "düzyazı", "karışık"):
+        pages = make_book(kind, args.pages, random.Random(kind))
+        page_requests = sum(1 for page in pages if page.strip())
+
+        started = time.perf_counter()
+        packer = PagePacker(pages)
+        chunks = list(packer.iter_chunks())
+        pack_time = time.perf_counter() - started
+
+        sizes = [len(packer.text(chunk).encode("utf-8")) for chunk in chunks]
+        sizes = [size for size in sizes if size]
+        fill = statistics.mean(sizes) / TTS_PACK_MAX_BYTES
+        print(f"{kind:<10} {page_requests:>13} {len(sizes):>13} {1 - len(sizes) / page_requests:>7.0%} "
+              f"{fill:>8.0%} {pack_time * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_pdf_extraction.py
+
+"""
+download_and_process_pdf için seri ve çok süreçli metin çıkarma karşılaştırması.
+
+Birkaç yüz sayfalık sentetik PDF'ler üretilir, her biri önce seri (workers=1)
+sonra paralel çıkarılır ve iki sonucun birebir aynı olduğu doğrulanır. Paralel çıkarma
+süreç havuzunu çağrılar arasında paylaştığından havuzun ilk açılışı ayrıca ölçülür.
+
+Kullanım:
+    python -m benchmarks.bench_pdf_extraction [--workers 4]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+import fitz  # PyMuPDF
+
+from utils.data_processing import download_and_process_pdf
+
+LINE = "Ağaçların gölgesinde uyuyan çocuk, rüyasında ışıklı bir şehre yürü- yordu."
+
+
+def build_pdf(path: str, page_count: int) -> None:
+    doc = fitz.open()
+    for page_number in range(page_count):
+        page = doc.new_page()
+        y = 50
+        for line_number in range(40):
+            page.insert_text((40, y), f"{page_number}.{line_number} {LINE}", fontsize=9)
+            y += 18
+    doc.save(path)
+    doc.close()
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"işçi sayısı: {args.workers}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        warm_up_path = os.path.join(tmp_dir, "isinma.pdf")
+        build_pdf(warm_up_path, 128)
+        warm_up_time, _ = timed(download_and_process_pdf, warm_up_path, workers=args.workers)
+        print(f"havuzun ilk açılışı dahil 128 sayfa: {warm_up_time:.2f} s")
+
+        print(f"{'sayfa':>6} {'seri (s)':>10} {'paralel (s)':>12} {'hızlanma':>10}")
+        for page_count in (200, 400, 800):
+            pdf_path = os.path.join(tmp_dir, f"kitap_{page_count}.pdf")
+            build_pdf(pdf_path, page_count)
+            serial_time, serial_result = timed(download_and_process_pdf, pdf_path, workers=1)
+            parallel_time, parallel_result = timed(download_and_process_pdf, pdf_path, workers=args.workers)
+            assert serial_result == parallel_result, "Paralel çıkarma seri sonuçla aynı olmalı"
+            print(f"{page_count:>6} {serial_time:>10.2f} {parallel_time:>12.2f} {serial_time / parallel_time:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_search.py
+
+"""
+core.search.SearchIndex için ölçüm: 10 bin ve 100 bin kitaplık sentetik kataloglarda
+indeks kurma süresi, önek ve yazım hatalı (bulanık) sorguların gecikmesi ile
+otomatik tamamlama gecikmesi.
+
+Karşılaştırma için eski aramanın yaptığı gibi her kayıtta büyük/küçük harf duyarsız
+düzenli ifade çalıştıran doğrusal tarama da ölçülür (Mongo'daki COLLSCAN'in süreç içi karşılığı).
+
+Kullanım:
+    python -m benchmarks.bench_search
+"""
+
+import re
+import time
+import random
+import statistics
+
+from core.search import SearchIndex, build_autocompleter
+
+SYLLABLES = ["ka", "ra", "de", "niz", "yıl", "dız", "gü", "neş", "ay", "şe", "hir", "ço",
+             "cuk", "öy", "kü", "sa", "ba", "hat", "tin", "ke", "mal", "na", "zım", "ih", "san"]
+CATEGORIES = ["Roman", "Şiir", "Öykü", "Deneme", "Tarih", "Felsefe"]
+QUERIES = 200
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_catalog(size: int, rng: random.Random) -> list[dict]:
+    authors = [f"{make_word(rng).title()} {make_word(rng).title()}" for _ in range(max(size // 20, 1))]
+    return [
+        {
+            "url": f"https://dijitalkitaplar.net/kitap-{i}/",
+            "title": " ".join(make_word(rng).title() for _ in range(rng.randint(1, 4))),
+            "author": rng.choice(authors),
+            "category": rng.choice(CATEGORIES),
+        }
+        for i in range(size)
+    ]
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Kelimenin rastgele bir harfini siler veya yanındakiyle yer değiştirir."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    if rng.random() < 0.5:
+        return word[:i] + word[i + 1:]
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    return f"p50 {statistics.median(samples) * 1000:7.3f} ms, p95 {p95 * 1000:7.3f} ms"
+
+
+def timed(fn, queries) -> list[float]:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def regex_scan(catalog: list[dict], query: str) -> list[dict]:
+    pattern = re.compile(re.escape(query), re.IGNORECASE)
+    results = []
+    for book in catalog:
+        if pattern.search(book["title"]) or pattern.search(book["author"]) or pattern.search(book["category"]):
+            results.append(book)
+            if len(results) == 20:
+                break
+    return results
+
+
+def main():
+    for size in (10_000, 100_000):
+        rng = random.Random(size)
+        catalog = make_catalog(size, rng)
+
+        index = SearchIndex()
+        started = time.perf_counter()
+        index.build(catalog)
+        build_time = time.perf_counter() - started
+
+        sample = [rng.choice(catalog) for _ in range(QUERIES)]
+        prefix_queries = [book["author"].split()[0][:4] for book in sample]
+        full_queries = [f"{book['title'].split()[0]} {book['author'].split()[-1]}" for book in sample]
+        typo_queries = [misspell(book["author"].split()[-1], rng) for book in sample]
+        # Rastgele bir harf eksik sorgularda düzenli ifade taraması genellikle sonuna kadar gider
+        regex_queries = [book["title"].split()[0] for book in sample[:20]]
+
+        prefix = timed(lambda q: index.search(q, fuzzy=False), prefix_queries)
+        full = timed(lambda q: index.search(q, fuzzy=False), full_queries)
+        typo = timed(lambda q: index.search(q), typo_queries)
+        found = sum(1 for q in typo_queries if index.search(q))
+        scan = timed(lambda q: regex_scan(catalog, q), regex_queries + typo_queries[:20])
+
+        popularity = {book["url"]: rng.randint(0, 500) for book in catalog}
+        started = time.perf_counter()
+        completer = build_autocompleter(index.documents, popularity)
+        completer_build_time = time.perf_counter() - started
+        short_prefixes = [book["title"][:rng.randint(1, 3)] for book in sample]
+        long_prefixes = [book["title"][:rng.randint(4, 10)] for book in sample]
+        short_complete = timed(completer.complete, short_prefixes)
+        long_complete = timed(completer.complete, long_prefixes)
+
+        print(f"{size:>7} kitap | indeks {build_time:6.2f} s, {len(index.terms)} kelime, {len(index.trigram_terms)} üçlü")
+        print(f"          önek (4 harf)    : {percentiles(prefix)}")
+        print(f"          başlık + yazar   : {percentiles(full)}")
+        print(f"          yazım hatalı     : {percentiles(typo)}  ({found}/{len(typo_queries)} sonuç buldu)")
+        print(f"          regex taraması   : {percentiles(scan)}")
+        print(f"          tamamlama (≤3)   : {percentiles(short_complete)}  (kurulum {completer_build_time:.2f} s)")
+        print(f"          tamamlama (4-10) : {percentiles(long_complete)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_split_text.py
+
+"""
+utils.helpers.split_text_by_bytes için karşılaştırmalı ölçüm.
+
+Eski (her kelimede büyüyen parçayı yeniden kodlayan) uygulama ile yeni
+artımlı, cümle duyarlı parçalayıcı büyük Türkçe metinler üzerinde karşılaştırılır.
+
+Kullanım:
+    python -m benchmarks.bench_split_text
+"""
+
+import time
+
+from utils.helpers import split_text_by_bytes
+
+MAX_BYTES = 4800
+
+TURKISH_SAMPLE = (
+    "Çocukluğumun geçtiği o eski İstanbul sokaklarında, akşamüstü güneşi ağır ağır "
+    "batarken şıpsevdi komşularımızın pencerelerinden yükselen ıhlamur kokusu hâlâ "
+    "burnumdadır. Öğretmenimiz Işıl Hanım, güzel Türkçemizin inceliklerini anlatırken "
+    "gözlerindeki ışıltı hiç sönmezdi! Peki, o günlerden geriye ne kaldı? Belki birkaç "
+    "soluk fotoğraf, belki de yüreğimizde taşıdığımız şiirler… "
+)
+
+
+def legacy_split_text_by_bytes(text: str, max_bytes=MAX_BYTES) -> list[str]:
+    """Önceki uygulama: her kelimede tüm parçayı yeniden UTF-8'e kodlar."""
+    if not text:
+        return []
+    chunks = []
+    current_chunk = ""
+    for word in text.split():
+        if len((current_chunk + " " + word).encode('utf-8')) > max_bytes:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = word
+        else:
+            current_chunk = f"{current_chunk} {word}" if current_chunk else word
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def build_text(target_bytes: int) -> str:
+    paragraph = TURKISH_SAMPLE * 6
+    repeats = max(1, target_bytes // len(paragraph.encode("utf-8")))
+    return "\n\n".join([paragraph] * repeats)
+
+
+def measure(func, text: str, rounds: int = 3) -> tuple[float, list[str]]:
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print(f"{'boyut':>10} {'eski (ms)':>12} {'yeni (ms)':>12} {'hızlanma':>10} {'parça eski/yeni':>18}")
+    for size_kb in (100, 500, 2000):
+        text = build_text(size_kb * 1024)
+        legacy_time, legacy_chunks = measure(legacy_split_text_by_bytes, text)
+        new_time, new_chunks = measure(split_text_by_bytes, text)
+        assert all(len(chunk.encode("utf-8")) <= MAX_BYTES for chunk in new_chunks)
+        assert " ".join(new_chunks).split() == text.split()
+        print(f"{size_kb:>8}KB {legacy_time * 1000:>12.1f} {new_time * 1000:>12.1f} "
+              f"{legacy_time / new_time:>9.1f}x {len(legacy_chunks):>8}/{len(new_chunks):<8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/profile_imports.py
+
+"""
+Uygulama modüllerinin içe aktarma süresi raporu.
+
+Her hedef ayrı ve temiz bir Python sürecinde `-X importtime` ile içe aktarılır;
+toplam süre, en pahalı bağımlılıklar ve ağır kütüphanelerden (pygame, Google TTS,
+pandas, plotly, PyMuPDF, scikit-learn) hangilerinin yüklendiği raporlanır.
+Giriş ekranı (streamlit_app.py) için hedef, ağır kütüphanelerin hiçbirinin yüklenmemesidir.
+
+Kullanım:
+    python -m benchmarks.profile_imports [--top 10] [--repeat 3] [modül ...]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# streamlit_app.py'nin içe aktardıkları önce gelir; modülün kendisi çalıştırılınca
+# sayfa ayarı ve veritabanı ısıtması başladığı için doğrudan içe aktarılmaz
+LOGIN_MODULES = ["core.auth", "core.database", "utils.ui"]
+DEFAULT_TARGETS = ["streamlit", *LOGIN_MODULES, "core.actions", "components.audio_player", "core.recommender"]
+HEAVY_MODULES = ["pygame", "google.cloud.texttospeech", "pandas", "plotly", "fitz", "sklearn"]
+
+
+def import_times(modules: list[str]) -> tuple[dict[str, tuple[int, int]], set[str]]:
+    """
+    Modülleri yeni bir süreçte içe aktarır. {modül: (kendi µs, toplam µs)} ile sonunda
+    sys.modules'te bulunan modülleri döndürür (başarısız içe aktarma denemeleri de
+    importtime çıktısında göründüğünden "yüklendi" kararı sys.modules'e göre verilir).
+    """
+    code = "; ".join([f"import {name}" for name in modules] + ["import sys", "print(*sys.modules, sep='\\n')"])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    times = {}
+    loaded = set(result.stdout.split())
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    if result.returncode != 0:
+        # Eksik bağımlılık vb.; o ana kadar yüklenenler yine de raporlanır
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "bilinmeyen hata"
+        print(f"  ! {', '.join(modules)} içe aktarılamadı: {error}")
+    return times, loaded
+
+
+def package_of(name: str) -> str:
+    for heavy in HEAVY_MODULES:
+        if name == heavy or name.startswith(heavy + "."):
+            return heavy
+    return name.split(".")[0]
+
+
+def report(target: str, baseline: set[str], top: int, repeat: int) -> None:
+    runs = [import_times([target]) for _ in range(repeat)]
+    loaded = runs[0][1]
+    # Her modül için en hızlı ölçüm alınır (disk önbelleği ve zamanlama gürültüsüne karşı)
+    best = {}
+    for times, _ in runs:
+        for name, (self_us, cumulative_us) in times.items():
+            if name not in best or cumulative_us < best[name][1]:
+                best[name] = (self_us, cumulative_us)
+
+    total_us = best.get(target, (0, 0))[1]
+    own = {name: value for name, value in best.items() if name not in baseline}
+    by_package = defaultdict(int)
+    for name, (self_us, _) in own.items():
+        by_package[package_of(name)] += self_us
+
+    loaded_heavy = [heavy for heavy in HEAVY_MODULES if heavy in loaded]
+    print(f"{target:<26} {total_us / 1000:8.1f} ms  ({len(own)} yeni modül)")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {package:<30} {self_us / 1000:8.1f} ms")
+    print(f"    ağır modüller: {', '.join(loaded_heavy) if loaded_heavy else 'yok'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kitavox modüllerinin içe aktarma süresi raporu")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="Ölçülecek modüller")
+    parser.add_argument("--top", type=int, default=10, help="Hedef başına gösterilecek paket sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Her hedef için tekrar sayısı")
+    args = parser.parse_args()
+
+    # Yorumlayıcının kendi açılışında yüklenenler (site, encodings...) rapora katılmaz
+    baseline = set(import_times([])[0])
+    print(f"Python {sys.version.split()[0]}, her hedef {args.repeat} temiz süreçte ölçüldü (en iyi sonuç)\n")
+    for target in args.targets:
+        report(target, baseline, args.top, args.repeat)
+
+    login, login_loaded = import_times(LOGIN_MODULES)
+    login_heavy = [heavy for heavy in HEAVY_MODULES if heavy in login_loaded]
+    login_us = sum(self_us for name, (self_us, _) in login.items() if name not in baseline)
+    print(f"\nGiriş ekranı içe aktarmaları: {login_us / 1000:.1f} ms, "
+          f"ağır modüller: {', '.join(login_heavy) if login_heavy else 'yok'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/session_memory.py
+
+"""
+Dinleme oturumu başına session_state bellek kullanımı raporu.
+
+Güncel düzen gerçek nesnelerle ölçülür: `components.audio_player.new_player_state` ile
+kurulan ve çalma sırasında güncellenen oynatıcı durumu, oturuma konan PagePacker ve
+işleri tamamlanmış bir PagePrefetcher. Ön seslendirme işleri geçici bir ses önbelleğine
+önceden yazılmış sesleri okur; TTS istemcisi gerekmez.
+
+Eski düzen (çalan sayfanın MP3'ü `audio_data` olarak oynatıcı durumunda, ön seslendirme
+işlerinin sonuçları da MP3 baytları) artık kodda bulunmadığından sentetik bir modeldir:
+aynı alanlara sahip sözlükler ve sonucu bayt olan Future nesneleri kurulur. Bu satırın
+rakamları yalnızca karşılaştırma içindir.
+
+Her iki düzen için N oturumluk durum kurulur ve tracemalloc ile ölçülen bellek raporlanır.
+
+Kullanım:
+    python -m benchmarks.session_memory [--sessions 300] [--audio-kb 900]
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from concurrent.futures import Future, wait
+
+# Ölçüm sırasında üretilen sesler kullanıcının önbelleğine karışmasın; dizin sonunda silinir
+_TEMP_AUDIO_DIR = None
+if "KITAVOX_AUDIO_CACHE_DIR" not in os.environ:
+    _TEMP_AUDIO_DIR = os.environ["KITAVOX_AUDIO_CACHE_DIR"] = tempfile.mkdtemp(prefix="kitavox-session-memory-")
+
+from components.audio_player import new_player_state
+from core.audio_cache import AUDIO_CACHE_MAX_BYTES
+from core.packing import PagePacker
+from core.prefetch import PREFETCH_PAGES, PagePrefetcher
+from core.tts import audio_key_for, get_audio_cache
+
+# 32 kbps MP3 ile yaklaşık 4-5 dakikalık, 5000 baytlık bir sayfanın seslendirmesi
+DEFAULT_AUDIO_KB = 900
+BOOK_PAGES = 400
+USER_PREFERENCES = {"voice_gender": "FEMALE"}
+
+
+def make_book() -> list[str]:
+    # Her sayfa tek bir TTS isteği olacak kadar uzun; oturumlar PDF havuzundaki gibi aynı listeyi paylaşır
+    return [f"Sayfa {index}. " + "Ağaçların gölgesinde uyuyan çocuk ışıklı bir şehre yürüyordu. " * 45
+            for index in range(BOOK_PAGES)]
+
+
+def _finished(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def legacy_session(page_index: int, audio_bytes: int, pages: list[str]) -> dict:
+    """Eski düzenin modeli: çalan sayfanın ve tamamlanmış ön seslendirmelerin sesi oturumda."""
+    return {
+        "player": {
+            "current_page_index": page_index,
+            "is_playing": True,
+            "is_paused": False,
+            "audio_data": bytes(audio_bytes),
+            "last_played_time": time.time(),
+        },
+        "prefetch": {page_index + i: _finished(bytes(audio_bytes)) for i in range(1, PREFETCH_PAGES + 1)},
+    }
+
+
+def current_session(page_index: int, audio_bytes: int, pages: list[str]) -> dict:
+    """Güncel düzen: oynatıcının oturuma yazdığı gerçek nesneler, ön seslendirme işleri bitmiş halde."""
+    packer = PagePacker(pages)
+    prefetcher = PagePrefetcher(client_tts=None, user_preferences=USER_PREFERENCES)
+    prefetcher.schedule(packer, page_index)
+    wait(list(prefetcher._futures.values()))
+
+    player_state = new_player_state(page_index)
+    # render_server_player'daki play_current_page'in bıraktığı durum
+    player_state.update(chunk_end=packer.chunk(page_index)[1], is_playing=True, last_played_time=time.time())
+    return {"player": player_state, "packer": packer, "prefetcher": prefetcher}
+
+
+def prepare_audio_cache(pages: list[str], audio_bytes: int) -> None:
+    """Ön seslendirme işlerinin okuyacağı sesleri geçici önbelleğe yazar."""
+    audio_cache = get_audio_cache()
+    packer = PagePacker(pages)
+    for chunk in packer.iter_chunks():
+        audio_cache.put(audio_key_for(packer.text(chunk), USER_PREFERENCES), bytes(audio_bytes))
+
+
+def measure(build, sessions: int, audio_bytes: int, pages: list[str]) -> int:
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    states = [build(i % (BOOK_PAGES - PREFETCH_PAGES - 1), audio_bytes, pages) for i in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del states
+    return used
+
+
+def human(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oturum başına oynatıcı durumu bellek raporu")
+    parser.add_argument("--sessions", type=int, default=300, help="Eşzamanlı dinleyici sayısı")
+    parser.add_argument("--audio-kb", type=int, default=DEFAULT_AUDIO_KB, help="Bir sayfanın MP3 boyutu (KB)")
+    args = parser.parse_args()
+    audio_bytes = args.audio_kb * 1024
+
+    pages = make_book()
+    try:
+        prepare_audio_cache(pages, audio_bytes)
+        print(f"{args.sessions} oturum, sayfa başına {args.audio_kb} KB ses, {PREFETCH_PAGES} sayfa ön seslendirme\n")
+        for label, build in (("ses oturumda (model)", legacy_session), ("güncel (ölçülen)", current_session)):
+            used = measure(build, args.sessions, audio_bytes, pages)
+            print(f"{label:<22} toplam {human(used):>10}   oturum başına {human(used / args.sessions):>10}")
+    finally:
+        if _TEMP_AUDIO_DIR:
+            shutil.rmtree(_TEMP_AUDIO_DIR, ignore_errors=True)
+    print(f"\nSes baytları yalnızca paylaşılan disk önbelleğinde tutulur (üst sınır {human(AUDIO_CACHE_MAX_BYTES)}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,280 @@
 # components/audio_player.py
 import streamlit as st
-import pygame
+import streamlit.components.v1 as components
 import io
+import os
+import json
 import time
+import queue
 import hashlib
-from google.cloud import texttospeech
-from core.tts import initialize_tts_client
+import secrets
+from typing import Optional
+from core.tts import PLAYBACK_MODE, initialize_tts_client, synthesize_page_audio, audio_key_for
+from core.prefetch import PagePrefetcher
+from core.packing import PagePacker
+from core.audio_server import get_audio_server
+from utils.lazy_import import lazy_import
+
+pygame = lazy_import("pygame")
 
 # Bu fonksiyon, actions modülü tarafından dinamik olarak atanacak.
 # Bu, modüller arası döngüsel bağımlılığı (circular import) önler.
 dinleme_gecmisi_ekle = lambda *args, **kwargs: None
 
-def audio_player_component(
-    pages: list[str],
-    user_preferences: dict,
-    user_id: str,
-    kitap_url: str,
-    start_page: int, # 0-indexed
-    physical_pages_total: int,
-    book_name: str
-):
-    st.header(f"🎧 Dinleniyor: {book_name}")
-    
-    session_key = f"audio_player_{hashlib.md5(f'{user_id}_{kitap_url}'.encode()).hexdigest()[:10]}"
+# Tarayıcı modunda istemcinin ses sunucusundan tek seferde alacağı en fazla sayfa sayısı;
+# çalan pencere bitmeden sonraki pencere istenir.
+BROWSER_WINDOW_PAGES = int(os.getenv("KITAVOX_BROWSER_WINDOW_PAGES", "50"))
+# Oynatıcının çalan parçayı kontrol etme aralığı (saniye): sunucu modunda sayfanın bitip
+# bitmediği, tarayıcı modunda hangi parçanın çalmaya başladığı. Kontrol yalnızca oynatıcı
+# parçasını (fragment) yeniden çalıştırır, sayfanın geri kalanını değil.
+PLAYER_POLL_SECONDS = float(os.getenv("KITAVOX_PLAYER_POLL_SECONDS", "1"))
+# Seçilen kitap için bir kez hazırlanan dinleme oturumunun anahtarı (core.actions doldurur)
+LISTENING_SESSION_KEY = "_listening_session"
 
-    if session_key not in st.session_state:
-        st.session_state[session_key] = {
-            'current_page_index': start_page,
-            'is_playing': False,
-            'is_paused': False,
-            'audio_data': None,
-            'last_played_time': 0,
-        }
-    
-    player_state = st.session_state[session_key]
+_BROWSER_PLAYER_HTML = """
+<div style="font-family: sans-serif;">
+  <div id="kv-status" style="margin-bottom: 6px;"></div>
+  <audio id="kv-audio" controls autoplay style="width: 100%;"></audio>
+  <div style="margin-top: 6px;">
+    <button id="kv-prev">⏮️ Önceki</button>
+    <button id="kv-next">⏭️ Sonraki</button>
+  </div>
+</div>
+<script>
+  const playlistUrl = __PLAYLIST_URL__;
+  const total = __TOTAL__;
+  const audio = document.getElementById("kv-audio");
+  const status = document.getElementById("kv-status");
+  const tracks = [];
+  let current = -1;
+  let next;  // sonraki pencerenin ilk sayfası; null ise kitabın sonuna gelindi
+  let pending = null;
+  // İlk istekte sayfa verilmez: sunucu en son çalmaya başlanan parçadan devam eder
+  function extend() {
+    if (!pending) {
+      const url = next === undefined ? playlistUrl : playlistUrl + "?from=" + next;
+      pending = fetch(url)
+        .then(r => { if (!r.ok) throw new Error(r.status); return r.json(); })
+        .then(win => { tracks.push(...win.tracks); next = win.next; return true; })
+        .catch(() => false)
+        .finally(() => { pending = null; });
+    }
+    return pending;
+  }
+  function load(index) {
+    current = index;
+    audio.src = tracks[current].url;
+    status.textContent = "Sayfa " + tracks[current].pages + " / " + total;
+    audio.play().catch(() => {});
+    // Pencerenin son parçası çalarken sonraki pencere önceden istenir
+    if (current === tracks.length - 1 && next !== null) { extend(); }
+  }
+  function advance() {
+    if (current + 1 < tracks.length) { load(current + 1); }
+    else if (next === null) {
+      status.textContent = current < 0 ? "Dinlenecek sayfa kalmadı." :
+        "Dinleme tamamlandı (sayfa " + tracks[current].pages + " / " + total + ").";
+    }
+    else { extend().then(ok => { if (ok) { advance(); } else { status.textContent = "Sonraki sayfalar alınamadı."; } }); }
+  }
+  audio.addEventListener("ended", advance);
+  document.getElementById("kv-prev").onclick = () => { if (current > 0) load(current - 1); };
+  document.getElementById("kv-next").onclick = advance;
+  advance();
+</script>
+"""
 
-    client_tts = initialize_tts_client()
+def _pages_label(page_range):
+    """Parçanın sayfa aralığını "5" veya "5-9" biçiminde döndürür."""
+    start, end = page_range
+    return f"{start + 1}" if end - start <= 1 else f"{start + 1}-{end}"
+
+def _current_chunk(packer, page_index):
+    """Oynatıcının bulunduğu sayfadan başlayan parça; kitap bittiyse boş aralık."""
+    return next(packer.iter_chunks(page_index), (page_index, page_index))
+
+class BrowserPlayback:
+    """
+    Tarayıcı oynatıcısının ses sunucusu tarafındaki durumu.
+
+    Oynatıcı parçaları ses sunucusundan pencere pencere ister; bir pencerenin son parçası
+    çalarken sonraki istenir, böylece dinleme BROWSER_WINDOW_PAGES ile sınırlı kalmaz.
+    `window` ve parçaların başlama bildirimleri sunucunun iş parçacığında çalışır ve
+    Streamlit'e dokunmaz: başlayan parçalar kuyruğa yazılır, ilerleme kaydı ve oturum durumu
+    oynatıcı parçası (fragment) tarafından betik iş parçacığında `drain` ile güncellenir.
+    """
+
+    def __init__(self, audio_server, packer, user_preferences, client_tts, prefetcher, start_page: int):
+        self.packer = packer
+        self.user_preferences = user_preferences
+        self.client_tts = client_tts
+        self.prefetcher = prefetcher
+        self.position = start_page  # en son çalmaya başlanan parçanın ilk sayfası
+        self._audio_server = audio_server
+        self._started: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        self.url = audio_server.register_playlist(secrets.token_hex(16), self.window)
+
+    def window(self, from_page: Optional[int] = None) -> dict:
+        """from_page'den (verilmezse kalınan yerden) başlayan parçaları ve sonraki pencerenin ilk sayfasını döndürür."""
+        start = self.position if from_page is None else max(0, from_page)
+        window_end = min(start + BROWSER_WINDOW_PAGES, len(self.packer))
+        tracks, next_start = [], None
+        for chunk in self.packer.iter_chunks(start):
+            if chunk[0] >= window_end:
+                next_start = chunk[0]
+                break
+            chunk_text = self.packer.text(chunk)
+            if not chunk_text:
+                continue
+            url = self._audio_server.register(
+                audio_key_for(chunk_text, self.user_preferences), chunk_text, self.user_preferences,
+                self.client_tts, on_start=lambda page_index=chunk[0]: self._on_track_start(page_index),
+            )
+            tracks.append({"url": url, "pages": _pages_label(chunk)})
+        return {"tracks": tracks, "next": next_start}
+
+    def _on_track_start(self, page_index: int) -> None:
+        self.position = page_index
+        self.prefetcher.schedule(self.packer, page_index)
+        self._started.put(page_index)
+
+    def drain(self) -> Optional[int]:
+        """Son kontrolden bu yana çalmaya başlanan en son parçanın ilk sayfasını döndürür."""
+        latest = None
+        while True:
+            try:
+                latest = self._started.get_nowait()
+            except queue.Empty:
+                return latest
+
+def new_player_state(start_page: int) -> dict:
+    """Oturumda tutulan oynatıcı durumu; ses verisi değil yalnızca konum ve çalma bayrakları."""
+    return {
+        'current_page_index': start_page,
+        'is_playing': False,
+        'is_paused': False,
+        'last_played_time': 0,
+    }
+
+def _go_to_page(player_state, page_index):
+    """Önceki/Sonraki düğmesi geri çağrısı; parça yeni sayfayla çizilir."""
+    player_state['current_page_index'] = page_index
+
+def _skip_to_page(player_state, page_index):
+    """Sunucu modunda sayfa atlar; yeni sayfa parça çizilirken seslendirilip çalınır."""
+    pygame.mixer.music.stop()
+    player_state['current_page_index'] = page_index
+    player_state['play_requested'] = True
+
+def _toggle_play(player_state):
+    if player_state['is_playing'] and not player_state['is_paused']:
+        pygame.mixer.music.pause()
+        player_state['is_paused'] = True
+    elif player_state['is_paused']:
+        pygame.mixer.music.unpause()
+        player_state['is_paused'] = False
+    else:
+        player_state['play_requested'] = True
+
+def _end_listening(session_key, prefetcher):
+    """Dinlemeyi sonlandırır; oynatıcı kaybolacağı için sayfanın tamamı yeniden çalıştırılır."""
+    prefetcher.cancel()
+    for key in ('selected_book', LISTENING_SESSION_KEY, session_key, f"{session_key}_prefetcher",
+                f"{session_key}_packer", f"{session_key}_playback"):
+        st.session_state.pop(key, None)
+    st.success("Dinleme sonlandırıldı.")
+    st.rerun()
+
+def render_browser_player(packer, user_preferences, user_id, kitap_url, physical_pages_total,
+                          session_key, player_state, prefetcher, client_tts):
+    """
+    Sesi tarayıcıya gönderen oynatıcı. Parçalar ses sunucusundan akış halinde çalınır ve
+    bir sonrakine geçiş istemci tarafında yapılır; betik iş parçacığı beklemez.
+    Ses sunucusu başlatılamadıysa mevcut parça st.audio ile çalınır.
+    """
+    audio_server = get_audio_server()
+    if audio_server is None:
+        _render_fallback_player(packer, user_preferences, user_id, kitap_url, physical_pages_total,
+                                session_key, player_state, prefetcher, client_tts)
+        return
+
+    playback_key = f"{session_key}_playback"
+    playback = st.session_state.get(playback_key)
+    if playback is None or playback.packer is not packer:
+        playback = BrowserPlayback(audio_server, packer, user_preferences, client_tts, prefetcher,
+                                   player_state['current_page_index'])
+        st.session_state[playback_key] = playback
+        # İlk parçalar tarayıcı istemeden önce seslendirilmeye başlansın
+        prefetcher.schedule(packer, playback.position, include_current=True)
+    _render_streamed_player(playback, user_id, kitap_url, physical_pages_total,
+                            session_key, player_state, prefetcher)
+
+@st.fragment(run_every=PLAYER_POLL_SECONDS)
+def _render_streamed_player(playback, user_id, kitap_url, physical_pages_total,
+                            session_key, player_state, prefetcher):
+    """
+    Tarayıcıda çalan oynatıcının parçası (fragment). Periyodik çalıştırmalarda tarayıcının
+    çalmaya başladığı son parça okunur; oturumdaki sayfa ve dinleme geçmişi buradan,
+    betik iş parçacığında güncellenir. HTML oynatıcı konumu içermediği için değişmez ve
+    yeniden çalıştırmalarda çalan ses kesilmez; yeniden yüklenirse kaldığı parçadan devam eder.
+    """
+    latest = playback.drain()
+    if latest is not None:
+        player_state['current_page_index'] = latest
+        dinleme_gecmisi_ekle(user_id, kitap_url, physical_pages_total, current_page=latest + 1)
+
+    html = (_BROWSER_PLAYER_HTML.replace("__PLAYLIST_URL__", json.dumps(playback.url))
+            .replace("__TOTAL__", str(physical_pages_total)))
+    components.html(html, height=120)
+
+    if st.button("⏹️ Bitir", key=f"{session_key}_stop"):
+        # İlerleme, parçalar çalınmaya başladıkça kaydedildiği için burada tekrar yazılmaz
+        _end_listening(session_key, prefetcher)
+
+@st.fragment
+def _render_fallback_player(packer, user_preferences, user_id, kitap_url, physical_pages_total,
+                            session_key, player_state, prefetcher, client_tts):
+    """
+    Ses sunucusu olmadan mevcut parçayı st.audio ile çalan oynatıcı. Parça (fragment) olarak
+    çizilir; düğmeler yalnızca oynatıcıyı yeniden çalıştırır ve durumu geri çağrılarda
+    değiştirdiği için ayrıca st.rerun gerekmez.
+    """
+    start_index = player_state['current_page_index']
+    chunk = _current_chunk(packer, start_index)
+    chunk_text = packer.text(chunk)
+    if chunk_text:
+        with st.spinner(f"Sayfa {_pages_label(chunk)} seslendiriliyor..."):
+            audio_data = prefetcher.result(start_index)
+            if audio_data is None:
+                audio_data = synthesize_page_audio(client_tts, chunk_text, user_preferences)
+        st.progress((start_index + 1) / physical_pages_total if physical_pages_total > 0 else 0,
+                    text=f"Sayfa {_pages_label(chunk)} / {physical_pages_total}")
+        st.audio(audio_data, format="audio/mp3", autoplay=True)
+        prefetcher.schedule(packer, start_index)
+        dinleme_gecmisi_ekle(user_id, kitap_url, physical_pages_total, current_page=start_index + 1)
+
+    c1, c3 = st.columns(2)
+    previous_start = packer.chunk(start_index - 1)[0] if start_index > 0 else 0
+    c1.button("⏮️ Önceki", disabled=start_index == 0, key=f"{session_key}_prev",
+              on_click=_go_to_page, args=(player_state, previous_start))
+    c3.button("⏭️ Sonraki", disabled=chunk[1] >= len(packer), key=f"{session_key}_next",
+              on_click=_go_to_page, args=(player_state, chunk[1]))
+
+    if st.button("⏹️ Bitir", key=f"{session_key}_stop"):
+        _end_listening(session_key, prefetcher)
+
+@st.fragment(run_every=PLAYER_POLL_SECONDS)
+def render_server_player(packer, user_preferences, user_id, kitap_url, physical_pages_total,
+                         session_key, player_state, prefetcher, client_tts):
+    """
+    Sesi sunucuda pygame ile çalan oynatıcı. Parça (fragment) olarak çizilir: düğmeler ve
+    sayfa bitişi kontrolü yalnızca bu fonksiyonu yeniden çalıştırır; sayfa betiği, kullanıcı
+    ve geçmiş sorguları ile metin çıkarma tekrar edilmez. Düğmeler durumu geri çağrılarda
+    değiştirir, gereken seslendirme parçanın gövdesinde yapılır.
+
+    Kısa sayfalar PagePacker ile tek istekte seslendirilir; durum yine fiziksel sayfa
+    indeksiyle tutulur ve ilerleme, çalınan parçanın ilk sayfasıyla kaydedilir.
+    """
     if not pygame.mixer.get_init():
         try:
             pygame.mixer.init()
@@ -44,90 +283,111 @@ def audio_player_component(
             return
 
     def play_current_page():
+        # Boş sayfaları atla (tembel PDF görünümünde kısa sayfalar boş string döner;
+        # uzun taranmış bölümlerde özyineleme derinliği sorun olmasın diye döngü kullanılır)
         page_index = player_state['current_page_index']
-        if page_index >= len(pages):
+        while page_index < len(packer) and not packer.pages[page_index].strip():
+            page_index += 1
+        player_state['current_page_index'] = page_index
+
+        if page_index >= len(packer):
             st.success("Kitap tamamlandı!")
             player_state['is_playing'] = False
             return
 
-        page_text = pages[page_index].strip()
-        if not page_text:
-            player_state['current_page_index'] += 1
-            play_current_page()
-            return
+        chunk = _current_chunk(packer, page_index)
+        chunk_text = packer.text(chunk)
+        player_state['chunk_end'] = chunk[1]
         
-        with st.spinner(f"Sayfa {page_index + 1} seslendiriliyor..."):
-            synthesis_input = texttospeech.SynthesisInput(text=page_text)
-            voice_gender_str = user_preferences.get("voice_gender", "FEMALE")
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="tr-TR",
-                name=user_preferences.get("voice_name"),
-                ssml_gender=texttospeech.SsmlVoiceGender[voice_gender_str]
-            )
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=user_preferences.get("speaking_rate"),
-                pitch=user_preferences.get("pitch")
-            )
-            response = client_tts.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
-            player_state['audio_data'] = response.audio_content
+        # Ses baytları oturumda tutulmaz: paylaşılan ses önbelleğinden yalnızca çalmak için
+        # okunur ve pygame'e verildikten sonra bırakılır
+        with st.spinner(f"Sayfa {_pages_label(chunk)} seslendiriliyor..."):
+            audio_data = prefetcher.result(page_index)
+            if audio_data is None:
+                audio_data = synthesize_page_audio(client_tts, chunk_text, user_preferences)
         
-        audio_file = io.BytesIO(player_state['audio_data'])
-        pygame.mixer.music.load(audio_file)
+        pygame.mixer.music.load(io.BytesIO(audio_data))
         pygame.mixer.music.play()
         player_state['is_playing'] = True
         player_state['is_paused'] = False
         player_state['last_played_time'] = time.time()
+        # Sayfa atlandıysa pencere dışında kalan işler burada iptal edilir
+        prefetcher.schedule(packer, page_index)
         dinleme_gecmisi_ekle(user_id, kitap_url, physical_pages_total, current_page=page_index + 1)
 
-    progress = (player_state['current_page_index'] + 1) / physical_pages_total if physical_pages_total > 0 else 0
-    st.progress(progress, text=f"Sayfa {player_state['current_page_index'] + 1} / {physical_pages_total}")
+    # Düğme geri çağrılarının istediği çalma ve çalan parçanın bitişi çizimden önce işlenir;
+    # böylece ilerleme çubuğu ve düğmeler yeni durumu göstermek için st.rerun gerektirmez.
+    if player_state.pop('play_requested', False):
+        play_current_page()
+    elif player_state['is_playing'] and not player_state['is_paused'] and not pygame.mixer.music.get_busy():
+        if time.time() - player_state.get('last_played_time', 0) > 1.0:
+            chunk_end = player_state.get('chunk_end', player_state['current_page_index'] + 1)
+            if chunk_end < len(packer):
+                player_state['current_page_index'] = chunk_end
+                play_current_page()
+            else:
+                player_state['is_playing'] = False
+                prefetcher.cancel()
+                dinleme_gecmisi_ekle(user_id, kitap_url, physical_pages_total, current_page=physical_pages_total)
+                st.success("Kitap başarıyla tamamlandı!")
+
+    page_index = player_state['current_page_index']
+    chunk = _current_chunk(packer, page_index)
+    progress = (page_index + 1) / physical_pages_total if physical_pages_total > 0 else 0
+    st.progress(min(progress, 1.0), text=f"Sayfa {_pages_label(chunk)} / {physical_pages_total}")
     
     c1, c2, c3, c4, c5 = st.columns(5)
     
     # DÜZELTME: Her butona session_key kullanarak benzersiz bir 'key' eklendi.
-    if c1.button("⏮️ Önceki", disabled=player_state['current_page_index'] == 0, key=f"{session_key}_prev"):
-        pygame.mixer.music.stop()
-        player_state['current_page_index'] -= 1
-        play_current_page()
-        st.rerun()
+    previous_start = packer.chunk(page_index - 1)[0] if page_index > 0 else 0
+    c1.button("⏮️ Önceki", disabled=page_index == 0, key=f"{session_key}_prev",
+              on_click=_skip_to_page, args=(player_state, previous_start))
 
     if player_state['is_playing'] and not player_state['is_paused']:
-        if c2.button("⏸️ Duraklat", key=f"{session_key}_pause"):
-            pygame.mixer.music.pause()
-            player_state['is_paused'] = True
-            st.rerun()
+        c2.button("⏸️ Duraklat", key=f"{session_key}_pause", on_click=_toggle_play, args=(player_state,))
     else:
-        if c2.button("▶️ Oynat", type="primary", key=f"{session_key}_play"):
-            if player_state['is_paused']:
-                pygame.mixer.music.unpause()
-                player_state['is_paused'] = False
-            else:
-                play_current_page()
-            st.rerun()
+        c2.button("▶️ Oynat", type="primary", key=f"{session_key}_play", on_click=_toggle_play, args=(player_state,))
 
-    if c3.button("⏭️ Sonraki", disabled=player_state['current_page_index'] >= len(pages) - 1, key=f"{session_key}_next"):
-        pygame.mixer.music.stop()
-        player_state['current_page_index'] += 1
-        play_current_page()
-        st.rerun()
+    c3.button("⏭️ Sonraki", disabled=chunk[1] >= len(packer), key=f"{session_key}_next",
+              on_click=_skip_to_page, args=(player_state, chunk[1]))
         
     if c5.button("⏹️ Bitir", key=f"{session_key}_stop"):
         pygame.mixer.music.stop()
         dinleme_gecmisi_ekle(user_id, kitap_url, physical_pages_total, current_page=player_state['current_page_index'] + 1)
-        st.session_state.pop('selected_book', None)
-        st.session_state.pop(session_key, None)
-        st.success("Dinleme sonlandırıldı.")
-        st.rerun()
+        _end_listening(session_key, prefetcher)
 
-    if player_state['is_playing'] and not player_state['is_paused'] and not pygame.mixer.music.get_busy():
-        if time.time() - player_state.get('last_played_time', 0) > 1.0:
-            if player_state['current_page_index'] < len(pages) - 1:
-                player_state['current_page_index'] += 1
-                play_current_page()
-                st.rerun()
-            else:
-                player_state['is_playing'] = False
-                dinleme_gecmisi_ekle(user_id, kitap_url, physical_pages_total, current_page=physical_pages_total)
-                st.success("Kitap başarıyla tamamlandı!")
-                st.rerun()
+def audio_player_component(
+    pages: list[str],
+    user_preferences: dict,
+    user_id: str,
+    kitap_url: str,
+    start_page: int, # 0-indexed
+    physical_pages_total: int,
+    book_name: str
+):
+    st.header(f"🎧 Dinleniyor: {book_name}")
+    
+    session_key = f"audio_player_{hashlib.md5(f'{user_id}_{kitap_url}'.encode()).hexdigest()[:10]}"
+
+    if session_key not in st.session_state:
+        st.session_state[session_key] = new_player_state(start_page)
+    
+    player_state = st.session_state[session_key]
+
+    client_tts = initialize_tts_client()
+
+    # Kısa sayfaları tek TTS isteğinde birleştiren eşleme; parça sınırları oturum boyunca saklanır
+    packer_key = f"{session_key}_packer"
+    if packer_key not in st.session_state or st.session_state[packer_key].pages is not pages:
+        st.session_state[packer_key] = PagePacker(pages)
+    packer = st.session_state[packer_key]
+
+    # Sonraki parçaları çalan parça sürerken arka planda seslendiren yardımcı
+    prefetcher_key = f"{session_key}_prefetcher"
+    if prefetcher_key not in st.session_state:
+        st.session_state[prefetcher_key] = PagePrefetcher(client_tts, user_preferences)
+    prefetcher = st.session_state[prefetcher_key]
+
+    render_player = render_browser_player if PLAYBACK_MODE == "browser" else render_server_player
+    render_player(packer, user_preferences, user_id, kitap_url, physical_pages_total,
+                  session_key, player_state, prefetcher, client_tts)
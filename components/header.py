@@ -1,7 +1,6 @@
 # components/header.py
 import streamlit as st
-from bson.objectid import ObjectId
-from core.database import get_users_collection
+from core.user_cache import get_session_user
 
 def render_header():
     """Uygulama başlığını (header) oluşturur."""
@@ -9,9 +8,7 @@ def render_header():
     if 'user_id' not in st.session_state or st.session_state.user_id is None:
         return # Kullanıcı giriş yapmamışsa header'ı gösterme
 
-    users_collection = get_users_collection()
-    user_id_obj = ObjectId(st.session_state.user_id)
-    user = users_collection.find_one({"_id": user_id_obj})
+    user = get_session_user()
     username = user.get("username", "Kullanıcı") if user else "Kullanıcı"
     
     # Logo'nun session_state'te yüklendiğini varsayıyoruz
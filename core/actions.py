@@ -1,6 +1,7 @@
 # core/actions.py
 import streamlit as st
 import re
+import requests
 from datetime import datetime, timezone
 from bson.objectid import ObjectId
 
@@ -8,13 +9,13 @@ from bson.objectid import ObjectId
 # Modül importları
 from core.database import (
     get_favorites_collection, 
-    get_listening_history_collection, 
-    get_users_collection,
-    get_all_books_collection
+    get_listening_history_collection
 )
-from utils.helpers import extract_book_info, normalize_url, split_text_by_bytes
-from utils.data_processing import download_and_process_pdf, extract_text_from_html
-from components.audio_player import audio_player_component
+from utils.helpers import normalize_url
+from core.text_cache import get_text_cache, get_pdf_pool
+from core.progress import get_progress_recorder
+from core.user_cache import get_session_user
+from components.audio_player import audio_player_component, LISTENING_SESSION_KEY
 # EKLENMESİ GEREKEN SATIR:
 from .database import get_feedback_collection 
 
@@ -43,172 +44,33 @@ def add_to_favorites(user_id: str, book: dict):
         st.rerun()
 
 
+# --- Dinleme Geçmişi Aksiyonları ---
 def get_listening_history(user_id_str: str) -> list:
-    history_collection = get_listening_history_collection()
-    if history_collection is None: return []
-    
-    user_id_obj = ObjectId(user_id_str)
-    # clean_duplicate_listening_history(user_id_obj) # Bu fonksiyonu daha sonra ekleyebilirsiniz
-    return list(history_collection.find({"userId": user_id_obj}).sort("timestamp", -1))
-
-def save_listening_progress(user_id: str, kitap_url: str, total_pages: int, current_page: int):
     """
-    DÜZELTME: Bu fonksiyon artık veritabanında olmayan özel dokümanları da kaydedebilir.
+    Kullanıcının dinleme geçmişini en son dinlenen başta olacak şekilde döndürür.
+    (userId, bookUrl) benzersiz indeksle korunduğundan okuma sırasında temizlik gerekmez;
+    eski mükerrer kayıtlar core.migrations.dedupe_listening_history ile bir kez temizlenir.
     """
-    history_collection = get_listening_history_collection()
-    all_books_collection = get_all_books_collection()
-    if history_collection is None or all_books_collection is None: return
-
-    user_id_obj = ObjectId(user_id)
-    
-    # Kitap veritabanında var mı diye kontrol et
-    book_in_db = all_books_collection.find_one({"url": kitap_url})
-    
-    # Bilgileri ayıkla
-    if book_in_db:
-        book_name = book_in_db.get("title", extract_book_info(kitap_url))
-        author = book_in_db.get("author", "Bilinmiyor")
-        category = book_in_db.get("category", "Bilinmiyor")
-    else:
-        # Eğer kitap veritabanında yoksa (özel URL/PDF), bilgileri URL'den al
-        book_name = extract_book_info(kitap_url)
-        author = "Özel Doküman"
-        category = "Kişisel"
-
-    progress = round((current_page / total_pages) * 100, 2) if total_pages > 0 else 0
-    is_completed = current_page >= total_pages
-
-    history_collection.update_one(
-        {"userId": user_id_obj, "bookUrl": kitap_url},
-        {"$set": {
-            "userId": user_id_obj, "bookUrl": kitap_url, "bookName": book_name,
-            "author": author, "category": category, # Yazar ve kategori de ekleniyor
-            "normalizedUrl": normalize_url(kitap_url),
-            "pageCount": total_pages, "currentPage": current_page,
-            "readingProgress": progress, "isCompleted": is_completed,
-            "timestamp": datetime.now(timezone.utc)
-        }},
-        upsert=True # Eğer kayıt yoksa oluştur
-    )
-
-def set_selected_book(book_dict: dict, source: str):
-    st.session_state["selected_book"] = book_dict
-    st.session_state["selected_book_source"] = source
-    st.rerun()
-
-def start_listening_process(user_id_str: str):
-    # ... (Bu fonksiyonun geri kalanı aynı)
-    if "selected_book" in st.session_state and st.session_state.selected_book:
-        book = st.session_state.selected_book
-        user_id_obj = ObjectId(user_id_str)
-
-        users_collection = get_users_collection()
-        user = users_collection.find_one({"_id": user_id_obj})
-        user_preferences = user.get("preferences", {})
-        
-        history_key_url = book.get("url")
-        
-        history_collection = get_listening_history_collection()
-        history = history_collection.find_one({"userId": user_id_obj, "bookUrl": history_key_url}) if history_key_url else None
-        
-        start_page = book.get("start_page", history.get("currentPage", 1) if history else 1)
-        
-        kitap_url_to_process = book.get("pdf_url") or book.get("url")
-        
-        if not kitap_url_to_process:
-            st.error("İşlenecek bir URL veya dosya yolu bulunamadı.")
-            st.session_state.pop('selected_book', None)
-            return
-
-        is_pdf = kitap_url_to_process.lower().endswith(".pdf")
-
-        pages = []
-        physical_pages_total = 0
-
-        with st.spinner("Kitap içeriği hazırlanıyor..."):
-            if is_pdf:
-                pages_text, physical_pages_total_from_pdf = download_and_process_pdf(kitap_url_to_process)
-                pages = []
-                for page_content in pages_text:
-                    pages.extend(split_text_by_bytes(page_content))
-                physical_pages_total = len(pages)
-            else:
-                text = extract_text_from_html(kitap_url_to_process)
-                pages = split_text_by_bytes(text)
-                physical_pages_total = len(pages)
-        
-        if not pages:
-            st.error("İçerik okunamadı. Lütfen başka bir kaynak deneyin.")
-            st.session_state.pop('selected_book', None)
-            return
-
-        import components.audio_player
-        components.audio_player.dinleme_gecmisi_ekle = save_listening_progress
-
-        components.audio_player.audio_player_component(
-            pages=pages,
-            user_preferences=user_preferences,
-            user_id=user_id_str,
-            kitap_url=history_key_url,
-            start_page=start_page - 1,
-            physical_pages_total=physical_pages_total,
-            book_name=book["title"]
-        )
-
-
-# --- Dinleme Geçmişi Aksiyonları ---
-def clean_duplicate_listening_history(user_id_obj: ObjectId):
-    history_collection = get_listening_history_collection()
-    if history_collection is None: return
-    
-    pipeline = [
-        {"$match": {"userId": user_id_obj}},
-        {"$group": {
-            "_id": {"bookUrl": "$bookUrl"},
-            "docs": {"$push": {"_id": "$_id", "timestamp": "$timestamp"}}
-        }},
-        {"$match": {"docs.1": {"$exists": True}}} # Birden fazla olanları bul
-    ]
-    duplicates = list(history_collection.aggregate(pipeline))
-    
-    for group in duplicates:
-        docs = sorted(group['docs'], key=lambda x: x['timestamp'], reverse=True)
-        ids_to_delete = [doc['_id'] for doc in docs[1:]] # En sonuncusu hariç hepsini sil
-        history_collection.delete_many({"_id": {"$in": ids_to_delete}})
-
-def get_listening_history(user_id_str: str) -> list:
     history_collection = get_listening_history_collection()
     if history_collection is None: return []
     
+    # Tamponda bekleyen ilerleme kayıtları önce yazılır ki geçmiş güncel görünsün
+    get_progress_recorder().flush(user_id_str)
     user_id_obj = ObjectId(user_id_str)
-    clean_duplicate_listening_history(user_id_obj)
     return list(history_collection.find({"userId": user_id_obj}).sort("timestamp", -1))
 
 def save_listening_progress(user_id: str, kitap_url: str, total_pages: int, current_page: int):
-    history_collection = get_listening_history_collection()
-    if history_collection is None: return
-
-    user_id_obj = ObjectId(user_id)
-    book_name = extract_book_info(kitap_url)
-    progress = round((current_page / total_pages) * 100, 2) if total_pages > 0 else 0
-    is_completed = current_page >= total_pages
-
-    history_collection.update_one(
-        {"userId": user_id_obj, "bookUrl": kitap_url},
-        {"$set": {
-            "userId": user_id_obj, "bookUrl": kitap_url, "bookName": book_name,
-            "normalizedUrl": normalize_url(kitap_url),
-            "pageCount": total_pages, "currentPage": current_page,
-            "readingProgress": progress, "isCompleted": is_completed,
-            "timestamp": datetime.now(timezone.utc)
-        }},
-        upsert=True
-    )
+    """
+    İlerlemeyi arkadan yazan tampona bırakır; oynatma veritabanı yanıtını beklemez.
+    Aynı kitap için art arda gelen güncellemeler birleştirilip toplu olarak yazılır.
+    """
+    get_progress_recorder().record(user_id, kitap_url, total_pages, current_page)
 
 # --- Dinleme Süreci Yönetimi ---
 def set_selected_book(book_dict: dict, source: str):
     st.session_state["selected_book"] = book_dict
     st.session_state["selected_book_source"] = source
+    st.session_state.pop(LISTENING_SESSION_KEY, None)
     st.rerun()
 
 # core/actions.py içindeki start_listening_process fonksiyonunun GÜNCELLENMİŞ hali
@@ -220,64 +82,88 @@ def start_listening_process(user_id_str: str):
     """
     if "selected_book" in st.session_state and st.session_state.selected_book:
         book = st.session_state.selected_book
-        user_id_obj = ObjectId(user_id_str)
-
-        users_collection = get_users_collection()
-        user = users_collection.find_one({"_id": user_id_obj})
-        user_preferences = user.get("preferences", {})
-        
-        # Kitabın URL'si dinleme geçmişi için anahtar olacak
-        history_key_url = book.get("url")
-        
-        history_collection = get_listening_history_collection()
-        history = history_collection.find_one({"userId": user_id_obj, "bookUrl": history_key_url}) if history_key_url else None
-        
-        # Session state'den gelen başlangıç sayfasını öncelikli yap (örn: "kaldığım yerden devam et")
-        start_page = book.get("start_page", history.get("currentPage", 1) if history else 1)
-        
-        kitap_url_to_process = book.get("pdf_url") or book.get("url")
-        
-        if not kitap_url_to_process:
-            st.error("İşlenecek bir URL veya dosya yolu bulunamadı.")
-            st.session_state.pop('selected_book', None)
-            return
-
-        is_pdf = kitap_url_to_process.lower().endswith(".pdf")
-
-        pages = []
-        physical_pages_total = 0
-
-        with st.spinner("Kitap içeriği hazırlanıyor..."):
-            if is_pdf:
-                # Eğer geçici bir dosya yolu ise (yükleme için)
-                if book.get("is_temp_file", False):
-                    # download_and_process_pdf zaten dosya yoluyla çalışabiliyor
-                    pages, physical_pages_total = download_and_process_pdf(kitap_url_to_process)
-                else: # URL ise
-                    pages, physical_pages_total = download_and_process_pdf(kitap_url_to_process)
-            else: # Web sayfası ise
-                text = extract_text_from_html(kitap_url_to_process)
-                pages = split_text_by_bytes(text)
-                physical_pages_total = len(pages)
-        
-        if not pages:
-            st.error("İçerik okunamadı. Lütfen başka bir kaynak deneyin.")
-            st.session_state.pop('selected_book', None)
-            return
+        # Kullanıcı, geçmiş ve metin yalnızca kitap seçildiğinde bir kez hazırlanır;
+        # sayfanın sonraki çalıştırmaları (oynatıcı dışındaki etkileşimler) bunu yeniden kullanır
+        session = st.session_state.get(LISTENING_SESSION_KEY)
+        if session is None or session["book"] is not book:
+            session = _prepare_listening_session(user_id_str, book)
+            if session is None:
+                st.session_state.pop('selected_book', None)
+                return
+            st.session_state[LISTENING_SESSION_KEY] = session
 
         import components.audio_player
         components.audio_player.dinleme_gecmisi_ekle = save_listening_progress
 
         components.audio_player.audio_player_component(
-            pages=pages,
-            user_preferences=user_preferences,
+            pages=session["pages"],
+            user_preferences=session["user_preferences"],
             user_id=user_id_str,
-            kitap_url=history_key_url, # Geçmiş kaydı için ana URL'yi kullan
-            start_page=start_page - 1,
-            physical_pages_total=physical_pages_total,
+            kitap_url=session["history_key_url"], # Geçmiş kaydı için ana URL'yi kullan
+            start_page=session["start_page"] - 1,
+            physical_pages_total=session["physical_pages_total"],
             book_name=book["title"]
         )
 
+def _prepare_listening_session(user_id_str: str, book: dict):
+    """Seçilen kitap için tercihleri, başlangıç sayfasını ve sayfa metinlerini hazırlar; hata olursa None."""
+    user_id_obj = ObjectId(user_id_str)
+
+    user = get_session_user(user_id_str)
+    user_preferences = user.get("preferences", {}) if user else {}
+    
+    # Kitabın URL'si dinleme geçmişi için anahtar olacak
+    history_key_url = book.get("url")
+    
+    # Henüz yazılmamış son ilerleme varsa veritabanına gitmeden o kullanılır
+    history = get_progress_recorder().pending(user_id_str, history_key_url) if history_key_url else None
+    if history is None and history_key_url:
+        history_collection = get_listening_history_collection()
+        history = history_collection.find_one({"userId": user_id_obj, "bookUrl": history_key_url})
+    
+    # Session state'den gelen başlangıç sayfasını öncelikli yap (örn: "kaldığım yerden devam et")
+    start_page = book.get("start_page", history.get("currentPage", 1) if history else 1)
+    
+    kitap_url_to_process = book.get("pdf_url") or book.get("url")
+    
+    if not kitap_url_to_process:
+        st.error("İşlenecek bir URL veya dosya yolu bulunamadı.")
+        return None
+
+    try:
+        with st.spinner("Kitap içeriği hazırlanıyor..."):
+            if kitap_url_to_process.lower().endswith(".pdf"):
+                # PDF'ler (URL veya yüklenen dosya) sayfa sayfa, ihtiyaç duyuldukça çıkarılır;
+                # büyük belgelerin kalan sayfaları arka planda süreç havuzunda hazırlanır
+                pages, physical_pages_total = get_pdf_pool().get(kitap_url_to_process, start_page=start_page - 1)
+            else:
+                # Web sayfaları byte limitine göre bölünür ve sonuç önbellekte tutulur;
+                # sayfa geçişlerinde kaynak yeniden indirilip ayrıştırılmaz.
+                pages, physical_pages_total = get_text_cache().get_or_load(kitap_url_to_process)
+    except ValueError as e:
+        # download_to_file boyut sınırı aşıldığında ValueError fırlatır
+        st.error(f"Kitap açılamadı: {e}")
+        return None
+    except requests.RequestException as e:
+        st.error(f"Kitap indirilemedi: {e}")
+        return None
+    except OSError as e:
+        st.error(f"Kitap dosyası okunamadı: {e}")
+        return None
+    
+    if not pages:
+        st.error("İçerik okunamadı. Lütfen başka bir kaynak deneyin.")
+        return None
+
+    return {
+        "book": book,
+        "user_preferences": user_preferences,
+        "history_key_url": history_key_url,
+        "start_page": start_page,
+        "pages": pages,
+        "physical_pages_total": physical_pages_total,
+    }
+
 # core/actions.py dosyasının sonuna eklenecek yeni fonksiyonlar:
 
 def submit_feedback(user_id: str, book_url: str, rating: int, comment: str, feedback_id_str: str = None):
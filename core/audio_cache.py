@@ -0,0 +1,83 @@
+# core/audio_cache.py
+
+import os
+import hashlib
+import logging
+import tempfile
+from typing import Optional
+
+from utils.disk_budget import DiskBudget
+
+# Sentezlenmiş ses dosyalarının saklanacağı dizin ve toplam boyut sınırı.
+AUDIO_CACHE_DIR = os.getenv("KITAVOX_AUDIO_CACHE_DIR", os.path.join(".cache", "audio"))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("KITAVOX_AUDIO_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+
+def make_audio_key(text: str, voice_name: Optional[str], ssml_gender: Optional[str],
+                   speaking_rate: Optional[float], pitch: Optional[float], encoding: str = "MP3") -> str:
+    """
+    Sayfa metni ve ses ayarlarından içerik adresli (sha256) bir önbellek anahtarı üretir.
+    Aynı metin aynı ayarlarla seslendirildiğinde her zaman aynı anahtar elde edilir.
+    """
+    rate = 1.0 if speaking_rate is None else float(speaking_rate)
+    pitch_value = 0.0 if pitch is None else float(pitch)
+    parts = [
+        text,
+        voice_name or "",
+        ssml_gender or "",
+        f"{rate:.4f}",
+        f"{pitch_value:.4f}",
+        encoding,
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Diskte tutulan, oturumlar ve yeniden başlatmalar arasında paylaşılan ses önbelleği.
+    Dosyaların değiştirilme zamanı (mtime) son erişim zamanı olarak kullanılır; boyut
+    sınırı aşıldığında en uzun süredir kullanılmayan dosyalar silinir (LRU).
+    """
+
+    def __init__(self, directory: str = AUDIO_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._budget = DiskBudget(directory, max_bytes, suffix=".mp3")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Tek bir dizinde çok fazla dosya birikmemesi için ilk iki karakterle alt dizin aç
+        return os.path.join(self.directory, key[:2], f"{key}.mp3")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Anahtara ait ses verisini döndürür; yoksa None döner."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"Ses önbelleği okunamadı ({path}): {e}")
+            return None
+
+        self._budget.touch(path)  # LRU için erişim zamanını güncelle
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Ses verisini atomik olarak diske yazar ve gerekirse eski kayıtları temizler."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Ses önbelleğine yazılamadı ({path}): {e}")
+            return
+
+        self._budget.added(len(data))
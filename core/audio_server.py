@@ -0,0 +1,222 @@
+# core/audio_server.py
+
+import os
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+import streamlit as st
+
+from core.tts import get_audio_cache, synthesize_page_audio
+
+# Sunucu varsayılan olarak yalnızca yerel makineden erişilebilir; başka makinelere veya bir
+# konteynerin dışına açmak için KITAVOX_AUDIO_SERVER_HOST (örn. 0.0.0.0) ayrıca verilmelidir.
+AUDIO_SERVER_HOST = os.getenv("KITAVOX_AUDIO_SERVER_HOST", "127.0.0.1")
+AUDIO_SERVER_PORT = int(os.getenv("KITAVOX_AUDIO_SERVER_PORT", "8502"))
+# Tarayıcının sesi isteyeceği adres (ters vekil sunucu arkasında farklı olabilir)
+AUDIO_PUBLIC_URL = os.getenv("KITAVOX_AUDIO_PUBLIC_URL", f"http://localhost:{AUDIO_SERVER_PORT}").rstrip("/")
+# Çalma listesini okuyabilecek Streamlit uygulamasının adres(ler)i, virgülle ayrılır;
+# CORS yanıtları yalnızca bu kökenlere verilir
+APP_ORIGINS = frozenset(
+    origin.strip().rstrip("/")
+    for origin in os.getenv("KITAVOX_APP_ORIGIN", "http://localhost:8501,http://127.0.0.1:8501").split(",")
+    if origin.strip()
+)
+# Bellekte tutulacak en fazla kayıtlı (henüz seslendirilmemiş olabilecek) sayfa sayısı
+MAX_REGISTERED_TRACKS = 10000
+# Aynı anda tutulacak en fazla tarayıcı çalma listesi (oturum)
+MAX_REGISTERED_PLAYLISTS = 1000
+
+_AUDIO_PATH = re.compile(r"^/audio/([0-9a-f]{64})\.mp3$")
+_PLAYLIST_PATH = re.compile(r"^/playlist/([0-9a-f]{32})\.json$")
+_RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _Track:
+    __slots__ = ("text", "user_preferences", "client_tts", "on_start")
+
+    def __init__(self, text, user_preferences, client_tts, on_start):
+        self.text = text
+        self.user_preferences = user_preferences
+        self.client_tts = client_tts
+        self.on_start = on_start
+
+
+class AudioServer:
+    """
+    Ses önbelleğindeki kayıtları tarayıcıya HTTP üzerinden sunan küçük sunucu.
+    Range isteklerini destekler; böylece tarayıcı sesi akış halinde çalabilir ve
+    Streamlit betik iş parçacıkları çalma süresince meşgul edilmez.
+    """
+
+    def __init__(self, host: str = AUDIO_SERVER_HOST, port: int = AUDIO_SERVER_PORT,
+                 public_url: str = AUDIO_PUBLIC_URL, allowed_origins: frozenset = APP_ORIGINS):
+        self.public_url = public_url
+        self.allowed_origins = allowed_origins
+        self._audio_cache = get_audio_cache()
+        self._tracks: "OrderedDict[str, _Track]" = OrderedDict()
+        self._playlists: "OrderedDict[str, Callable[[Optional[int]], dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.address = self._httpd.server_address[:2]  # port 0 verildiyse atanan port
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="audio-server", daemon=True)
+        self._thread.start()
+        logging.info(f"Ses sunucusu {self.address[0]}:{self.address[1]} adresinde başlatıldı.")
+
+    def register(self, key: str, text: str, user_preferences: dict, client_tts,
+                 on_start: Optional[Callable[[], None]] = None) -> str:
+        """
+        Bir sayfayı sunucuya tanıtır ve tarayıcının kullanacağı URL'yi döndürür.
+        Ses henüz önbellekte yoksa ilk istek geldiğinde seslendirilir.
+        """
+        with self._lock:
+            self._tracks[key] = _Track(text, dict(user_preferences), client_tts, on_start)
+            self._tracks.move_to_end(key)
+            while len(self._tracks) > MAX_REGISTERED_TRACKS:
+                self._tracks.popitem(last=False)
+        return f"{self.public_url}/audio/{key}.mp3"
+
+    def register_playlist(self, token: str, provider: Callable[[Optional[int]], dict]) -> str:
+        """
+        Tarayıcı oynatıcısının parça pencerelerini isteyeceği adresi döndürür.
+        `provider(from_page)` sunucu iş parçacığında çağrılır ve JSON'a çevrilecek bir sözlük
+        döndürür; from_page verilmezse oynatıcının kaldığı yerden başlanır. Streamlit'e erişmemelidir.
+        """
+        with self._lock:
+            self._playlists[token] = provider
+            self._playlists.move_to_end(token)
+            while len(self._playlists) > MAX_REGISTERED_PLAYLISTS:
+                self._playlists.popitem(last=False)
+        return f"{self.public_url}/playlist/{token}.json"
+
+    def _load(self, key: str) -> tuple[Optional[bytes], Optional[_Track]]:
+        with self._lock:
+            track = self._tracks.get(key)
+        audio_data = self._audio_cache.get(key)
+        if audio_data is None and track is not None:
+            audio_data = synthesize_page_audio(track.client_tts, track.text, track.user_preferences,
+                                               audio_cache=self._audio_cache)
+        return audio_data, track
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logging.debug("audio-server: " + format % args)
+
+            def _send_cors_headers(self):
+                # Yalnızca uygulamanın kökeni yanıtı okuyabilir; diğer siteler çalma listesini alamaz
+                origin = self.headers.get("Origin")
+                if origin and origin.rstrip("/") in server.allowed_origins:
+                    self.send_header("Access-Control-Allow-Origin", origin)
+                self.send_header("Vary", "Origin")
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                playlist_match = _PLAYLIST_PATH.match(path)
+                if playlist_match:
+                    self._send_playlist(playlist_match.group(1), parse_qs(query))
+                    return
+                match = _AUDIO_PATH.match(path)
+                if not match:
+                    self.send_error(404)
+                    return
+                try:
+                    audio_data, track = server._load(match.group(1))
+                except Exception as e:
+                    logging.warning(f"Ses sunulurken seslendirme hatası: {e}")
+                    self.send_error(502)
+                    return
+                if audio_data is None:
+                    self.send_error(404)
+                    return
+
+                total = len(audio_data)
+                start, end = 0, total - 1
+                range_header = self.headers.get("Range")
+                if range_header:
+                    range_match = _RANGE_HEADER.match(range_header.strip())
+                    if not range_match or not (range_match.group(1) or range_match.group(2)):
+                        self._send_unsatisfiable(total)
+                        return
+                    first, last = range_match.groups()
+                    if first:
+                        start = int(first)
+                        end = min(int(last), total - 1) if last else total - 1
+                    else:  # "bytes=-N": son N bayt
+                        start = max(0, total - int(last))
+                    if start > end or start >= total:
+                        self._send_unsatisfiable(total)
+                        return
+
+                # Çalmanın başladığı istek (ilk bayt) ilerleme kaydı için bildirilir
+                if start == 0 and track is not None and track.on_start is not None:
+                    try:
+                        track.on_start()
+                    except Exception as e:
+                        logging.warning(f"Dinleme ilerlemesi kaydedilemedi: {e}")
+
+                body = audio_data[start:end + 1]
+                self.send_response(206 if range_header else 200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(len(body)))
+                if range_header:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+                # Anahtar içerik adresli olduğu için yanıt hiç değişmez
+                self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+                self._send_cors_headers()
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_playlist(self, token: str, params: dict):
+                with server._lock:
+                    provider = server._playlists.get(token)
+                if provider is None:
+                    self.send_error(404)
+                    return
+                try:
+                    from_page = int(params["from"][0]) if "from" in params else None
+                    body = json.dumps(provider(from_page)).encode("utf-8")
+                except ValueError:
+                    self.send_error(400)
+                    return
+                except Exception as e:
+                    logging.warning(f"Çalma listesi hazırlanamadı: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self._send_cors_headers()
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_unsatisfiable(self, total: int):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{total}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        return Handler
+
+
+@st.cache_resource
+def get_audio_server() -> Optional[AudioServer]:
+    """
+    Ses sunucusunu süreç başına bir kez başlatır.
+    Port kullanılamıyorsa None döner ve oynatıcı st.audio ile devam eder.
+    """
+    try:
+        return AudioServer()
+    except OSError as e:
+        logging.warning(f"Ses sunucusu başlatılamadı: {e}")
+        return None
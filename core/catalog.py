@@ -0,0 +1,95 @@
+# core/catalog.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import streamlit as st
+
+from core.database import get_all_books_collection
+
+CATALOG_CACHE_ITEMS = int(os.getenv("KITAVOX_CATALOG_CACHE_ITEMS", "5000"))
+# Tarayıcının yaptığı güncellemeler en geç bu süre sonunda görünür
+CATALOG_CACHE_TTL = int(os.getenv("KITAVOX_CATALOG_CACHE_TTL", "600"))
+# Liste, oynatıcı ve öneri ekranlarının kullandığı alanlar
+BOOK_PROJECTION = {
+    "_id": 1, "url": 1, "pdf_url": 1, "title": 1, "author": 1,
+    "category": 1, "cover_image_url": 1, "description": 1,
+}
+
+
+class CatalogRepository:
+    """
+    `all_books` kayıtlarını URL ile toplu okuyan depo.
+    Önünde URL anahtarlı, süreç genelinde paylaşılan bir LRU bulunur; bulunamayan
+    URL'ler de (None olarak) önbelleğe alınır, böylece veritabanında olmayan
+    bağlantılar her çalıştırmada yeniden sorgulanmaz.
+    """
+
+    def __init__(self, collection, max_items: int = CATALOG_CACHE_ITEMS, ttl: float = CATALOG_CACHE_TTL):
+        self.collection = collection
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, Optional[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, urls: list[str]) -> tuple[dict, list[str]]:
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for url in urls:
+                entry = self._entries.get(url)
+                if entry is None or now - entry[0] > self.ttl:
+                    missing.append(url)
+                    continue
+                self._entries.move_to_end(url)
+                found[url] = entry[1]
+        return found, missing
+
+    def _store(self, books: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for url, book in books.items():
+                self._entries[url] = (now, book)
+                self._entries.move_to_end(url)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def get_many(self, urls: Iterable[str]) -> dict[str, dict]:
+        """
+        Verilen URL'lerin kitap kayıtlarını url -> kayıt sözlüğü olarak döndürür.
+        Önbellekte olmayanlar tek bir `$in` sorgusuyla alınır; bulunamayan URL'ler sonuçta yer almaz.
+        """
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        found, missing = self._cached(unique_urls)
+        if missing:
+            fetched = dict.fromkeys(missing)
+            for book in self.collection.find({"url": {"$in": missing}}, BOOK_PROJECTION):
+                fetched[book["url"]] = book
+            self._store(fetched)
+            found.update(fetched)
+        # Paylaşılan önbellek kayıtları çağıranlar tarafından değiştirilmesin diye kopyalanır
+        return {url: dict(book) for url, book in found.items() if book is not None}
+
+    def get(self, url: str) -> Optional[dict]:
+        return self.get_many([url]).get(url)
+
+    def invalidate(self, urls: Optional[Iterable[str]] = None) -> None:
+        """Verilen URL'leri veya URL verilmezse tüm kayıtları önbellekten siler."""
+        with self._lock:
+            if urls is None:
+                self._entries.clear()
+                return
+            for url in urls:
+                self._entries.pop(url, None)
+
+
+@st.cache_resource
+def get_catalog() -> Optional[CatalogRepository]:
+    """Tüm oturumların paylaştığı katalog deposunu döndürür; veritabanı yoksa None."""
+    all_books_collection = get_all_books_collection()
+    if all_books_collection is None:
+        return None
+    return CatalogRepository(all_books_collection)
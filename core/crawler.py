@@ -0,0 +1,202 @@
+# core/crawler.py
+
+"""
+dijitalkitaplar.net kataloğunu tarayıp `all_books` koleksiyonunu güncel tutan komut.
+
+Tür sayfaları ve kitap sayfaları bir iş parçacığı havuzunda eşzamanlı olarak, site
+başına hız sınırına uyularak çekilir. Sonuçlar toplu (`bulk_write`) upsert'lerle
+yazılır. Varsayılan olarak artımlı çalışır: yakın zamanda taranmış kitaplar atlanır.
+
+Kullanım:
+    python -m core.crawler [--full] [--genre Roman --genre Şiir] [--workers 8] [--rate 4]
+"""
+
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from pymongo import UpdateOne
+
+from utils.data_processing import BASE_URL, HEADERS, SESSION
+
+# Tür Seçimi sayfasında gösterilen türler
+DEFAULT_GENRES = ("Roman", "Şiir", "Öykü")
+BULK_BATCH_SIZE = 500
+
+
+class HostRateLimiter:
+    """Her site için iki istek arasında en az `1 / rate` saniye bırakır (iş parçacığı güvenli)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CatalogCrawler:
+    def __init__(self, all_books_collection, workers: int = 8, rate: float = 4.0):
+        self.collection = all_books_collection
+        self.workers = workers
+        self.limiter = HostRateLimiter(rate)
+
+    def _fetch_soup(self, url: str) -> Optional[BeautifulSoup]:
+        self.limiter.wait(url)
+        try:
+            response = SESSION.get(url, headers=HEADERS, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logging.warning(f"Sayfa alınamadı ({url}): {e}")
+            return None
+        return BeautifulSoup(response.text, "html.parser")
+
+    def discover_genres(self, genre_names) -> dict[str, str]:
+        """Ana sayfadan istenen türlerin tam URL'lerini bulur."""
+        soup = self._fetch_soup(BASE_URL)
+        genres = {}
+        if soup is None:
+            return genres
+        for a in soup.find_all("a", href=True):
+            name = a.get_text(strip=True)
+            if name in genre_names and name not in genres:
+                genres[name] = urljoin(BASE_URL, a["href"])
+        return genres
+
+    def list_genre_books(self, genre_url: str) -> list[str]:
+        soup = self._fetch_soup(genre_url)
+        if soup is None:
+            return []
+        return [urljoin(BASE_URL, a["href"]) for a in soup.select("div.card-action a[href]")]
+
+    def parse_book(self, url: str, genre_name: str) -> Optional[dict]:
+        """Kitap sayfasından başlık, yazar, kapak, açıklama ve PDF bağlantısını çıkarır."""
+        soup = self._fetch_soup(url)
+        if soup is None:
+            return None
+
+        def meta(*names):
+            for name in names:
+                tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+                if tag and tag.get("content"):
+                    return tag["content"].strip()
+            return None
+
+        heading = soup.find("h1")
+        author_tag = soup.find(attrs={"itemprop": "author"})
+        pdf_link = soup.find("a", href=lambda href: href and href.lower().endswith(".pdf"))
+        return {
+            "url": url,
+            "title": meta("og:title") or (heading.get_text(strip=True) if heading else None),
+            "author": meta("author", "book:author") or (author_tag.get_text(strip=True) if author_tag else None),
+            "category": genre_name,
+            "cover_image_url": meta("og:image"),
+            "description": meta("og:description", "description"),
+            "pdf_url": urljoin(url, pdf_link["href"]) if pdf_link else None,
+        }
+
+    def _recently_crawled(self, max_age: timedelta) -> set:
+        threshold = datetime.now(timezone.utc) - max_age
+        cursor = self.collection.find({"crawledAt": {"$gte": threshold}}, {"url": 1, "_id": 0})
+        return {doc["url"] for doc in cursor}
+
+    def _to_updates(self, book: dict, now: datetime) -> list[UpdateOne]:
+        """
+        Kitabın yazma işlemlerini döndürür. Açıklayıcı alanlar yalnızca yeni kayıtlarda yazılır;
+        elle zenginleştirilmiş veriler ezilmez. `updatedAt` (arama indeksinin artımlı güncelleme
+        işareti) yalnızca kayıt eklendiğinde veya PDF bağlantısı değiştiğinde ilerletilir;
+        değişmeyen kitapların yeniden taranması yalnızca `crawledAt`'i günceller.
+        """
+        descriptive = {k: v for k, v in book.items() if k not in ("url", "pdf_url", "category") and v}
+        on_insert = {**descriptive, "category": book["category"], "createdAt": now, "updatedAt": now}
+        operations = [UpdateOne({"url": book["url"]}, {"$set": {"crawledAt": now}, "$setOnInsert": on_insert},
+                                upsert=True)]
+        pdf_url = book.get("pdf_url")
+        if pdf_url:
+            on_insert["pdf_url"] = pdf_url
+            # Sıralamasız toplu yazmada sıradan bağımsızdır: yeni kayıtta ya henüz belge yoktur
+            # ya da bağlantı zaten eklemeyle yazılmıştır
+            operations.append(UpdateOne({"url": book["url"], "pdf_url": {"$ne": pdf_url}},
+                                        {"$set": {"pdf_url": pdf_url, "updatedAt": now}}))
+        return operations
+
+    def _flush(self, operations: list) -> int:
+        if not operations:
+            return 0
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    def run(self, genre_names=DEFAULT_GENRES, full: bool = False, max_age: timedelta = timedelta(days=7)) -> dict:
+        started = time.monotonic()
+        genres = self.discover_genres(set(genre_names))
+        skip = set() if full else self._recently_crawled(max_age)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawler") as executor:
+            genre_futures = {executor.submit(self.list_genre_books, url): name for name, url in genres.items()}
+            book_jobs = {}
+            for future in as_completed(genre_futures):
+                for book_url in future.result():
+                    if book_url not in skip and book_url not in book_jobs:
+                        book_jobs[book_url] = genre_futures[future]
+
+            logging.info(f"{len(genres)} tür, taranacak {len(book_jobs)} kitap ({len(skip)} kitap güncel).")
+            book_futures = [executor.submit(self.parse_book, url, genre) for url, genre in book_jobs.items()]
+
+            now = datetime.now(timezone.utc)
+            operations, written, failed = [], 0, 0
+            for future in as_completed(book_futures):
+                book = future.result()
+                if book is None:
+                    failed += 1
+                    continue
+                operations.extend(self._to_updates(book, now))
+                if len(operations) >= BULK_BATCH_SIZE:
+                    written += self._flush(operations)
+                    operations = []
+            written += self._flush(operations)
+
+        summary = {
+            "genres": len(genres), "books": len(book_jobs), "written": written,
+            "failed": failed, "skipped": len(skip), "seconds": round(time.monotonic() - started, 1),
+        }
+        logging.info(f"Tarama tamamlandı: {summary}")
+        return summary
+
+
+def main():
+    from core.database import get_all_books_collection
+
+    parser = argparse.ArgumentParser(description="Kitap kataloğunu tarar ve all_books koleksiyonunu günceller.")
+    parser.add_argument("--genre", action="append", help="Taranacak tür (birden çok verilebilir)")
+    parser.add_argument("--full", action="store_true", help="Yakın zamanda taranmış kitapları da yeniden tara")
+    parser.add_argument("--max-age-days", type=float, default=7, help="Artımlı modda bu süreden eski kitaplar yeniden taranır")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=4.0, help="Site başına saniyedeki en fazla istek")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    all_books_collection = get_all_books_collection()
+    if all_books_collection is None:
+        raise SystemExit("Veritabanı bağlantısı kurulamadı.")
+
+    crawler = CatalogCrawler(all_books_collection, workers=args.workers, rate=args.rate)
+    crawler.run(args.genre or DEFAULT_GENRES, full=args.full, max_age=timedelta(days=args.max_age_days))
+
+
+if __name__ == "__main__":
+    main()
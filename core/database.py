@@ -1,34 +1,165 @@
 # core/database.py
 
 import os
-import streamlit as st
-from pymongo import MongoClient
+import time
+import logging
+import threading
+from typing import Optional
+
+from pymongo import MongoClient, monitoring
 from bson.objectid import ObjectId
 import certifi
 from dotenv import load_dotenv
+from core.migrations import run_startup_migrations
 
 load_dotenv()
 
-@st.cache_resource
-def get_db_connection():
+MONGO_DB_NAME = "Sesli_Kitap"
+# Bağlantı zaman aşımları (ms): yavaş bir küme uygulamayı varsayılan 30 saniye boyunca bekletmesin
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("KITAVOX_MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("KITAVOX_MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("KITAVOX_MONGO_SOCKET_TIMEOUT_MS", "20000"))
+# Bağlantı havuzu boyutları
+MONGO_MAX_POOL_SIZE = int(os.getenv("KITAVOX_MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("KITAVOX_MONGO_MIN_POOL_SIZE", "0"))
+# Isıtma başarısız olursa yeniden deneme aralığı (saniye); her başarısızlıkta üst sınıra kadar ikiye katlanır
+WARM_UP_RETRY_SECONDS = float(os.getenv("KITAVOX_MONGO_WARM_UP_RETRY_SECONDS", "2"))
+WARM_UP_RETRY_MAX_SECONDS = float(os.getenv("KITAVOX_MONGO_WARM_UP_RETRY_MAX_SECONDS", "60"))
+
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+_warm_up_running = False
+_warm_up_backoff = WARM_UP_RETRY_SECONDS
+_next_warm_up = 0.0  # time.monotonic(); bu andan önce yeni deneme başlatılmaz
+_ready = threading.Event()
+_last_error: Optional[str] = None
+
+
+class _HeartbeatListener(monitoring.ServerHeartbeatListener):
+    """
+    İstemcinin arka plandaki sunucu yoklamalarını izler. Bağlantı henüz hazır sayılmazken
+    bir yoklama başarılı olursa geri çekilme beklenmeden yeni bir ısıtma başlatılır.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        global _next_warm_up
+        if not _ready.is_set():
+            _next_warm_up = 0.0
+            warm_up()
+
+    def failed(self, event):
+        pass
+
+
+def get_client() -> Optional[MongoClient]:
+    """
+    Süreç genelinde tek MongoClient'ı ilk kullanımda oluşturur (iş parçacığı güvenli).
+    MongoClient sunucuya arka planda bağlandığından bu çağrı ağ beklemesi yapmaz.
+    """
+    global _client, _last_error
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            mongo_uri = os.getenv("MONGO_URI")
+            if not mongo_uri:
+                _last_error = "MONGO_URI ortam değişkeni .env dosyasında bulunamadı."
+                return None
+            _client = MongoClient(
+                mongo_uri,
+                tlsCAFile=certifi.where(),
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                event_listeners=[_HeartbeatListener()],
+            )
+    return _client
+
+
+def _warm_up() -> None:
+    """
+    Bağlantıyı kurar (TLS el sıkışması, havuz) ve açılış göçlerini çalıştırır.
+    Başarısız olursa bir sonraki deneme zamanı geri çekilmeyle ileri alınır.
+    """
+    global _last_error, _warm_up_running, _warm_up_backoff, _next_warm_up
+    succeeded = False
     try:
-        MONGO_URI = os.getenv("MONGO_URI")
-        if not MONGO_URI:
-            raise ValueError("MONGO_URI ortam değişkeni .env dosyasında bulunamadı.")
-        client = MongoClient(MONGO_URI, tlsCAFile=certifi.where())
+        client = get_client()
+        if client is None:
+            logging.error(f"Veritabanı bağlantı hatası: {_last_error}")
+            return
         client.admin.command("ping")
         print("MongoDB bağlantısı başarılı.")
-        return client["Sesli_Kitap"]
+        _last_error = None
+        _ready.set()
+        succeeded = True
+        run_startup_migrations(client[MONGO_DB_NAME])
     except Exception as e:
-        st.error(f"Veritabanı bağlantı hatası: {e}")
+        if not succeeded:
+            _last_error = str(e)
+        logging.error(f"Veritabanı bağlantı hatası: {e}")
+    finally:
+        with _client_lock:
+            if not succeeded:
+                _next_warm_up = time.monotonic() + _warm_up_backoff
+                _warm_up_backoff = min(_warm_up_backoff * 2, WARM_UP_RETRY_MAX_SECONDS)
+            _warm_up_running = False
+
+
+def warm_up() -> None:
+    """
+    Bağlantıyı arka planda ısıtır; uygulama açılışını ve ilk sayfayı bekletmez.
+    Birden çok kez çağrılabilir: bağlantı hazır olana kadar aynı anda en fazla bir ısıtma
+    çalışır ve başarısız denemeler geri çekilme süresi dolduktan sonraki çağrıda yinelenir.
+    Küme sonradan ulaşılabilir olduğunda hata temizlenir ve açılış göçleri o zaman çalışır.
+    """
+    global _warm_up_running
+    if _ready.is_set():
+        return
+    with _client_lock:
+        if _ready.is_set() or _warm_up_running or time.monotonic() < _next_warm_up:
+            return
+        _warm_up_running = True
+    threading.Thread(target=_warm_up, daemon=True, name="mongo-warm-up").start()
+
+
+def is_ready(timeout: float = 0) -> bool:
+    """
+    Veritabanına en az bir kez başarıyla ulaşıldıysa True döner; gerekirse `timeout` saniye bekler.
+    Henüz ulaşılamadıysa (geri çekilme süresi dolmuşsa) yeni bir ısıtma denemesi başlatır.
+    """
+    warm_up()
+    return _ready.wait(timeout)
+
+
+def get_connection_error() -> Optional[str]:
+    """Son bağlantı hatasının açıklaması (yoksa None)."""
+    return _last_error
+
+
+def get_db():
+    """Uygulama veritabanını döndürür; MONGO_URI tanımlı değilse None."""
+    client = get_client()
+    if client is None:
+        # Hata giriş ekranında get_connection_error ile gösterilir
         return None
+    warm_up()
+    return client[MONGO_DB_NAME]
+
+
+def _collection(name: str):
+    db = get_db()
+    return db[name] if db is not None else None
 
-DB = get_db_connection()
 
-# DÜZELTME: Tüm koleksiyon fonksiyonlarında 'if DB' yerine 'if DB is not None' kullanıldı.
-def get_users_collection(): return DB["users"] if DB is not None else None
-def get_books_collection(): return DB["books"] if DB is not None else None
-def get_listening_history_collection(): return DB["ListeningHistory"] if DB is not None else None
-def get_favorites_collection(): return DB["favorites_books"] if DB is not None else None
-def get_all_books_collection(): return DB["all_books"] if DB is not None else None
-def get_feedback_collection(): return DB["feedback"] if DB is not None else None
\ No newline at end of file
+def get_users_collection(): return _collection("users")
+def get_books_collection(): return _collection("books")
+def get_listening_history_collection(): return _collection("ListeningHistory")
+def get_favorites_collection(): return _collection("favorites_books")
+def get_all_books_collection(): return _collection("all_books")
+def get_feedback_collection(): return _collection("feedback")
@@ -0,0 +1,237 @@
+# core/migrations.py
+
+"""
+MongoDB indeks ve şema göçleri.
+
+`ensure_indexes` uygulamanın sık kullandığı sorguların ihtiyaç duyduğu indeksleri
+idempotent olarak oluşturur; uygulama açılırken veritabanı bağlantısıyla birlikte
+bir kez çalıştırılır. `dedupe_listening_history`, (userId, bookUrl) benzersiz indeksini
+engelleyen eski mükerrer geçmiş kayıtlarını toplu olarak siler; kayıt sildiği için açılışta
+çalışmaz, yalnızca `--dedupe-history` ile elle çalıştırılır. `collscan_report`, uygulamanın gerçek sorgu şekillerini
+`explain` ile çalıştırıp hâlâ tüm koleksiyonu tarayan sorguları listeler.
+
+Kullanım:
+    python -m core.migrations [--dedupe-history] [--report]
+"""
+
+import os
+import logging
+import argparse
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, DeleteMany, IndexModel
+from pymongo.errors import OperationFailure
+
+# Uygulama açılışında indekslerin kontrol edilip edilmeyeceği
+ENSURE_INDEXES_ON_STARTUP = os.getenv("KITAVOX_ENSURE_INDEXES", "1") == "1"
+
+# Koleksiyon adı -> gereken indeksler
+INDEX_SPECS = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "all_books": [
+        IndexModel([("url", ASCENDING)], name="url_unique", unique=True),
+        IndexModel([("crawledAt", ASCENDING)], name="crawledAt"),
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt"),
+    ],
+    "ListeningHistory": [
+        # Her kullanıcı-kitap çifti için tek kayıt; yazma sırasında upsert ile korunur
+        IndexModel([("userId", ASCENDING), ("bookUrl", ASCENDING)], name="userId_bookUrl", unique=True),
+        IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING)], name="userId_timestamp"),
+    ],
+    "favorites_books": [
+        IndexModel([("userId", ASCENDING), ("bookUrl", ASCENDING)], name="userId_bookUrl"),
+        IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING)], name="userId_timestamp"),
+    ],
+    "feedback": [
+        IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING)], name="userId_timestamp"),
+        IndexModel([("userId", ASCENDING), ("bookUrl", ASCENDING)], name="userId_bookUrl"),
+    ],
+}
+
+# Mükerrer temizliğinde tek bir silme işlemine konulacak en fazla _id
+DEDUPE_BATCH_SIZE = 1000
+
+# MongoDB hata kodları
+_DUPLICATE_KEY = 11000
+_INDEX_CONFLICT_CODES = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+
+_SAMPLE_USER_ID = ObjectId()
+_SAMPLE_URL = "https://dijitalkitaplar.net/ornek-kitap/"
+
+# Uygulamanın çalıştırdığı sorgu şekilleri: (ad, koleksiyon, filtre, sıralama)
+QUERY_SHAPES = [
+    ("login_by_email", "users", {"email": "ornek@kitavox.com"}, None),
+    ("book_by_url", "all_books", {"url": _SAMPLE_URL}, None),
+    ("books_by_urls", "all_books", {"url": {"$in": [_SAMPLE_URL]}}, None),
+    ("books_crawled_since", "all_books", {"crawledAt": {"$gte": datetime(2000, 1, 1, tzinfo=timezone.utc)}}, None),
+    # core.search.SearchIndex.refresh: arama indeksinin artımlı güncellemesi
+    ("books_updated_since", "all_books", {"updatedAt": {"$gt": datetime(2000, 1, 1, tzinfo=timezone.utc)}}, None),
+    ("history_by_user_recent", "ListeningHistory", {"userId": _SAMPLE_USER_ID}, [("timestamp", DESCENDING)]),
+    ("history_by_user_book", "ListeningHistory", {"userId": _SAMPLE_USER_ID, "bookUrl": _SAMPLE_URL}, None),
+    ("favorites_by_user_recent", "favorites_books", {"userId": _SAMPLE_USER_ID}, [("timestamp", DESCENDING)]),
+    ("favorite_by_user_book", "favorites_books", {"userId": _SAMPLE_USER_ID, "bookUrl": _SAMPLE_URL}, None),
+    ("feedback_by_user_recent", "feedback", {"userId": _SAMPLE_USER_ID}, [("timestamp", DESCENDING)]),
+]
+
+
+def _ensure_index(collection, model: IndexModel) -> str:
+    """Tek bir indeksi oluşturur ve sonucu ('ok', 'conflict', 'duplicates', 'error') döndürür."""
+    document = model.document
+    options = {k: v for k, v in document.items() if k != "key"}
+    fallback_name = f"{document['name']}_nonunique"
+    try:
+        collection.create_index(list(document["key"].items()), **options)
+        return "ok"
+    except OperationFailure as e:
+        if e.code in _INDEX_CONFLICT_CODES and document.get("unique"):
+            existing = collection.index_information()
+            same_name = existing.get(document["name"])
+            if fallback_name in existing or (
+                same_name and not same_name.get("unique") and same_name["key"] == list(document["key"].items())
+            ):
+                # Daha önce benzersiz olmadan oluşturulan indeks, benzersiz sürümüyle değiştirilir
+                collection.drop_index(fallback_name if fallback_name in existing else document["name"])
+                return _ensure_index(collection, model)
+        if e.code in _INDEX_CONFLICT_CODES:
+            # Aynı adla/anahtarla farklı seçenekli bir indeks zaten var; elle incelenmeli
+            logging.warning(f"{collection.name}.{document['name']} mevcut bir indeksle çakışıyor: {e}")
+            return "conflict"
+        if e.code == _DUPLICATE_KEY and document.get("unique"):
+            # Mevcut mükerrer kayıtlar benzersiz indeksi engelliyor; sorgular hızlansın diye
+            # indeks benzersiz olmadan oluşturulur, kayıtlar temizlenince yeniden denenir
+            logging.warning(f"{collection.name}.{document['name']} mükerrer kayıtlar yüzünden benzersiz oluşturulamadı.")
+            options.pop("unique")
+            options["name"] = fallback_name
+            collection.create_index(list(document["key"].items()), **options)
+            return "duplicates"
+        logging.warning(f"{collection.name}.{document['name']} indeksi oluşturulamadı: {e}")
+        return "error"
+
+
+def ensure_indexes(db) -> dict:
+    """
+    INDEX_SPECS içindeki tüm indeksleri oluşturur. Var olan indeksler için işlem yapılmaz,
+    bu yüzden her açılışta güvenle çağrılabilir. Koleksiyon.indeks -> durum sözlüğü döndürür.
+    """
+    results = {}
+    for collection_name, models in INDEX_SPECS.items():
+        collection = db[collection_name]
+        for model in models:
+            results[f"{collection_name}.{model.document['name']}"] = _ensure_index(collection, model)
+    return results
+
+
+def dedupe_listening_history(db, batch_size: int = DEDUPE_BATCH_SIZE) -> int:
+    """
+    Aynı (userId, bookUrl) çiftine ait birden fazla geçmiş kaydından yalnızca en yenisini
+    bırakır. Silmeler `bulk_write` ile gruplar halinde yapılır; silinen kayıt sayısını döndürür.
+    """
+    collection = db["ListeningHistory"]
+    pipeline = [
+        {"$sort": {"timestamp": -1}},
+        {"$group": {"_id": {"userId": "$userId", "bookUrl": "$bookUrl"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+        {"$project": {"stale": {"$slice": ["$ids", 1, {"$size": "$ids"}]}}},
+    ]
+    removed = 0
+    batch = []
+    for group in collection.aggregate(pipeline, allowDiskUse=True):
+        batch.extend(group["stale"])
+        if len(batch) >= batch_size:
+            removed += collection.bulk_write([DeleteMany({"_id": {"$in": batch}})], ordered=False).deleted_count
+            batch = []
+    if batch:
+        removed += collection.bulk_write([DeleteMany({"_id": {"$in": batch}})], ordered=False).deleted_count
+    if removed:
+        logging.info(f"Dinleme geçmişinden {removed} mükerrer kayıt silindi.")
+    return removed
+
+
+def _plan_stages(plan) -> list[str]:
+    """explain planındaki tüm aşama adlarını (iç içe planlar dahil) toplar."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def collscan_report(db) -> list[dict]:
+    """QUERY_SHAPES içindeki her sorguyu explain ile çalıştırır ve kullanılan planı raporlar."""
+    report = []
+    for name, collection_name, query, sort in QUERY_SHAPES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explain = cursor.explain()
+        except OperationFailure as e:
+            logging.warning(f"{name} sorgusu için explain alınamadı: {e}")
+            continue
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "query": name,
+            "collection": collection_name,
+            "collscan": "COLLSCAN" in stages,
+            "stages": stages,
+            "docsExamined": explain.get("executionStats", {}).get("totalDocsExamined"),
+        })
+    return report
+
+
+def run_startup_migrations(db) -> None:
+    """Uygulama açılışında çağrılır; hatalar uygulamanın açılmasını engellemez."""
+    if not ENSURE_INDEXES_ON_STARTUP:
+        return
+    try:
+        results = ensure_indexes(db)
+        if results.get("ListeningHistory.userId_bookUrl") == "duplicates":
+            # Kayıt silen temizlik açılışta yapılmaz; indeks benzersiz olmadan kalır
+            logging.warning(
+                "Dinleme geçmişinde mükerrer (userId, bookUrl) kayıtları var; benzersiz indeks atlandı. "
+                "Temizlemek için: python -m core.migrations --dedupe-history"
+            )
+        problems = {k: v for k, v in results.items() if v != "ok"}
+        if problems:
+            logging.warning(f"Bazı indeksler beklendiği gibi oluşturulamadı: {problems}")
+    except Exception as e:
+        logging.warning(f"İndeks kontrolü yapılamadı: {e}")
+
+
+def main():
+    from core.database import MONGO_DB_NAME, get_client, get_connection_error
+
+    parser = argparse.ArgumentParser(description="MongoDB indekslerini oluşturur ve sorgu planlarını raporlar.")
+    parser.add_argument("--dedupe-history", action="store_true", help="Mükerrer dinleme geçmişi kayıtlarını sil")
+    parser.add_argument("--report", action="store_true", help="Tüm koleksiyonu tarayan sorguları listele")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    client = get_client()
+    if client is None:
+        raise SystemExit(f"Veritabanı bağlantısı kurulamadı: {get_connection_error()}")
+    db = client[MONGO_DB_NAME]
+
+    if args.dedupe_history:
+        print(f"{dedupe_listening_history(db)} mükerrer geçmiş kaydı silindi.")
+
+    for index_name, status in ensure_indexes(db).items():
+        print(f"{status:>10}  {index_name}")
+
+    if args.report:
+        print()
+        for row in collscan_report(db):
+            marker = "COLLSCAN" if row["collscan"] else "index"
+            print(f"{marker:>10}  {row['collection']}.{row['query']}  ({' > '.join(row['stages'])})")
+
+
+if __name__ == "__main__":
+    main()
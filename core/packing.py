@@ -0,0 +1,102 @@
+# core/packing.py
+
+import os
+import threading
+from bisect import bisect_right
+from typing import Iterator, Sequence
+
+from utils.helpers import iter_text_chunks
+
+# Bir TTS isteğine konacak en fazla metin (UTF-8 bayt); split_text_by_bytes gibi
+# Google'ın 5000 baytlık sınırının altında pay bırakılır.
+TTS_PACK_MAX_BYTES = int(os.getenv("KITAVOX_TTS_PACK_MAX_BYTES", "4800"))
+# Parçalar bu kadar sayfalık blokların dışına taşmaz: kaldığı yerden devam ederken yalnızca
+# o bloğun sayfaları okunur ve parça sınırları dinlemenin nereden başladığına bağlı olmaz.
+TTS_PACK_BLOCK_PAGES = int(os.getenv("KITAVOX_TTS_PACK_BLOCK_PAGES", "32"))
+PAGE_SEPARATOR = "\n\n"
+
+PageRange = tuple[int, int]  # [başlangıç, bitiş) fiziksel sayfa aralığı
+
+
+def request_texts(text: str, max_bytes: int = TTS_PACK_MAX_BYTES) -> list[str]:
+    """
+    Parça metnini TTS isteklerine böler. Sınıra sığan metin tek istektir; sınırı tek başına
+    aşan bir sayfanın metni iter_text_chunks ile cümle ve paragraf sınırlarından bölünür.
+    """
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text] if text else []
+    return list(iter_text_chunks(text, max_bytes))
+
+
+class PagePacker:
+    """
+    Art arda gelen kısa sayfaları (şiir, diyalog, bölüm başları) tek TTS isteğinde birleştirir.
+
+    Sayfalar sabit boyutlu bloklar içinde soldan sağa, toplam boyut `max_bytes`'ı aşmayacak
+    şekilde gruplanır. Boş sayfalar bulundukları parçaya katılır; sınırı tek başına aşan sayfa
+    kendi parçasını oluşturur ve `segments` ile birden çok TTS isteğine bölünür (parça yine o
+    sayfaya eşlenir). Gruplama yalnızca sayfa metinlerine bağlı olduğundan oynatıcı,
+    ön seslendirme ve core.prerender aynı parçaları, dolayısıyla aynı ses önbelleği
+    anahtarlarını üretir. Oynatıcı durumu ve dinleme geçmişi fiziksel sayfa numarasıyla
+    tutulmaya devam eder; parça yalnızca seslendirme birimidir.
+    """
+
+    def __init__(self, pages: Sequence[str], max_bytes: int = TTS_PACK_MAX_BYTES,
+                 block_pages: int = TTS_PACK_BLOCK_PAGES):
+        self.pages = pages
+        self.max_bytes = max_bytes
+        self.block_pages = max(1, block_pages)
+        self._starts: dict[int, list[int]] = {}  # blok -> bloktaki parçaların başlangıç sayfaları
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def _block_starts(self, block: int) -> list[int]:
+        starts = self._starts.get(block)
+        if starts is not None:
+            return starts
+
+        first = block * self.block_pages
+        starts, size = [first], 0
+        for index in range(first, min(first + self.block_pages, len(self.pages))):
+            page_bytes = len(self.pages[index].strip().encode("utf-8"))
+            if not page_bytes:
+                continue
+            if size and size + len(PAGE_SEPARATOR) + page_bytes > self.max_bytes:
+                starts.append(index)
+                size = page_bytes
+            else:
+                size += (len(PAGE_SEPARATOR) if size else 0) + page_bytes
+        with self._lock:
+            self._starts[block] = starts
+        return starts
+
+    def chunk(self, page_index: int) -> PageRange:
+        """Sayfayı içeren parçanın sayfa aralığını döndürür."""
+        block = page_index // self.block_pages
+        starts = self._block_starts(block)
+        position = bisect_right(starts, page_index) - 1
+        if position + 1 < len(starts):
+            return starts[position], starts[position + 1]
+        return starts[position], min((block + 1) * self.block_pages, len(self.pages))
+
+    def iter_chunks(self, page_index: int = 0) -> Iterator[PageRange]:
+        """
+        Verilen sayfadan başlayarak parçaları üretir. Sayfa bir parçanın ortasındaysa ilk parça
+        o sayfadan başlar; dinleme tam kaldığı sayfadan sürer, sonraki parçalar her zamankiyle aynıdır.
+        """
+        while page_index < len(self.pages):
+            end = self.chunk(page_index)[1]
+            yield page_index, end
+            page_index = end
+
+    def text(self, page_range: PageRange) -> str:
+        """Aralıktaki boş olmayan sayfaların metnini tek istek metni olarak birleştirir."""
+        start, end = page_range
+        texts = (self.pages[index].strip() for index in range(start, end))
+        return PAGE_SEPARATOR.join(text for text in texts if text)
+
+    def segments(self, page_range: PageRange) -> list[str]:
+        """Aralığın metnini `max_bytes`'ı aşmayan TTS isteklerine böler; çoğu parça tek istektir."""
+        return request_texts(self.text(page_range), self.max_bytes)
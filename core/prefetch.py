@@ -0,0 +1,95 @@
+# core/prefetch.py
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from itertools import islice
+from typing import Optional
+
+import streamlit as st
+
+from core.tts import get_audio_cache, synthesize_page_audio, audio_key_for
+from core.packing import PagePacker
+
+# Çalan parçadan sonra önceden seslendirilecek parça sayısı ve
+# tüm oturumların paylaştığı arka plan iş parçacığı sayısı.
+PREFETCH_PAGES = int(os.getenv("KITAVOX_PREFETCH_PAGES", "2"))
+PREFETCH_WORKERS = int(os.getenv("KITAVOX_PREFETCH_WORKERS", "4"))
+
+
+@st.cache_resource
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    """
+    Ön seslendirme işleri için süreç genelinde paylaşılan, sınırlı boyutlu havuz.
+    """
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="tts-prefetch")
+
+
+class PagePrefetcher:
+    """
+    Bir oynatıcı oturumu için çalan parçadan sonraki N parçayı arka planda seslendirir.
+    İşler parçanın ilk sayfasının indeksiyle tutulur.
+    Sonuçlar paylaşılan ses önbelleğine yazılır; oynatıcı sayfaya geldiğinde
+    ya önbellekten okur ya da devam eden işin bitmesini bekler. İşlerin sonucu ses
+    değil önbellek anahtarıdır; oturumda bekleyen işler MP3 baytlarını bellekte tutmaz.
+    """
+
+    def __init__(self, client_tts, user_preferences: dict, lookahead: int = PREFETCH_PAGES):
+        self.client_tts = client_tts
+        self.user_preferences = dict(user_preferences)
+        self.lookahead = lookahead
+        # Arka plan iş parçacıklarında Streamlit önbelleklerine erişmemek için
+        # paylaşılan nesneler burada, betik iş parçacığında alınır.
+        self._executor = get_prefetch_executor()
+        self._audio_cache = get_audio_cache()
+        self._futures: dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def _synthesize(self, text: str) -> str:
+        synthesize_page_audio(self.client_tts, text, self.user_preferences, audio_cache=self._audio_cache)
+        return audio_key_for(text, self.user_preferences)
+
+    def schedule(self, packer: PagePacker, current_index: int, include_current: bool = False) -> None:
+        """Mevcut sayfadan başlayan parçadan sonraki N parçayı kuyruğa alır; pencere dışındaki işleri iptal eder."""
+        chunks = packer.iter_chunks(current_index)
+        if not include_current:
+            next(chunks, None)
+        window = dict(islice(chunks, self.lookahead + 1 if include_current else self.lookahead))
+        with self._lock:
+            for index in list(self._futures):
+                if index not in window:
+                    self._futures.pop(index).cancel()
+
+            for index, end in window.items():
+                if index in self._futures:
+                    continue
+                chunk_text = packer.text((index, end))
+                if not chunk_text:
+                    continue
+                self._futures[index] = self._executor.submit(self._synthesize, chunk_text)
+
+    def result(self, page_index: int, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Sayfadan başlayan parça için önceden başlatılmış bir iş varsa bitmesini bekler ve sesi önbellekten okur.
+        İş yoksa, iptal edildiyse, hata aldıysa veya ses önbellekten silindiyse None döner.
+        """
+        with self._lock:
+            future = self._futures.pop(page_index, None)
+        if future is None:
+            return None
+        try:
+            audio_key = future.result(timeout=timeout)
+        except CancelledError:
+            return None
+        except Exception as e:
+            logging.warning(f"Sayfa {page_index + 1} önceden seslendirilemedi: {e}")
+            return None
+        return self._audio_cache.get(audio_key)
+
+    def cancel(self) -> None:
+        """Bekleyen tüm işleri iptal eder (sayfa atlama veya durdurma sırasında)."""
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
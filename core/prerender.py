@@ -0,0 +1,172 @@
+# core/prerender.py
+
+"""
+Popüler katalog kitaplarını önceden seslendiren çevrimdışı iş.
+
+Kitabın metni oynatıcının kullandığı `load_book_pages` ile çıkarılır, kısa sayfalar
+oynatıcıdaki gibi PagePacker ile birleştirilir ve her parça bir süreç havuzunda
+seslendirilerek oynatıcının okuduğu ses önbelleğine yazılır.
+İlerleme bir manifest dosyasında tutulur; iş yarıda kesilirse aynı komutla
+kaldığı yerden devam eder.
+
+Kullanım:
+    python -m core.prerender --url https://dijitalkitaplar.net/... --voice-name tr-TR-Wavenet-A
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from core.audio_cache import AudioCache
+from core.packing import PagePacker
+from core.text_cache import BookTextCache
+from core.tts import create_tts_client, synthesize_page_audio, audio_key_for
+from utils.data_processing import load_book_pages
+
+PRERENDER_STATE_DIR = os.getenv("KITAVOX_PRERENDER_STATE_DIR", os.path.join(".cache", "prerender"))
+PRERENDER_WORKERS = int(os.getenv("KITAVOX_PRERENDER_WORKERS", str(os.cpu_count() or 2)))
+
+# Her işçi süreç kendi TTS istemcisini ve önbellek nesnesini bir kez oluşturur
+_worker_client = None
+_worker_cache = None
+
+
+def _init_worker():
+    global _worker_client, _worker_cache
+    _worker_client = create_tts_client()
+    _worker_cache = AudioCache()
+
+
+def _render_page(page_index: int, page_text: str, user_preferences: dict) -> int:
+    synthesize_page_audio(_worker_client, page_text, user_preferences, audio_cache=_worker_cache)
+    return page_index
+
+
+def _manifest_path(source: str, user_preferences: dict) -> str:
+    profile = json.dumps(user_preferences, sort_keys=True)
+    digest = hashlib.sha256(f"{source}\x1f{profile}".encode("utf-8")).hexdigest()[:24]
+    return os.path.join(PRERENDER_STATE_DIR, f"{digest}.json")
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _log_progress(done: int, total: int, title: str) -> None:
+    logging.info(f"[{title}] {done}/{total} sayfa hazır.")
+
+
+def prerender_book(book: dict, user_preferences: dict, workers: int = PRERENDER_WORKERS,
+                   progress_callback: Optional[Callable[[int, int, str], None]] = _log_progress) -> dict:
+    """
+    Bir `all_books` kaydının tüm sayfalarını verilen ses profiliyle seslendirir.
+    Önbellekte zaten bulunan sayfalar atlanır (önbellekten silinenler yeniden üretilir);
+    dönen manifest işin son durumunu içerir.
+    """
+    source = book.get("pdf_url") or book.get("url")
+    if not source:
+        raise ValueError("Kitap kaydında 'pdf_url' veya 'url' alanı bulunamadı.")
+    title = book.get("title", source)
+
+    manifest_path = _manifest_path(source, user_preferences)
+    manifest = _load_manifest(manifest_path)
+
+    pages, _ = BookTextCache().get_or_load(source, load_book_pages)
+    packer = PagePacker(pages)
+    audio_cache = AudioCache()
+
+    # İlerleme sayfa cinsinden tutulur; bir parça bittiğinde kapsadığı sayfaların hepsi hazırdır
+    pending = []
+    done = 0
+    for start, end in packer.iter_chunks():
+        chunk_text = packer.text((start, end))
+        if not chunk_text or audio_key_for(chunk_text, user_preferences) in audio_cache:
+            done += end - start
+            continue
+        pending.append((start, end, chunk_text))
+
+    manifest.update({
+        "source": source, "title": title, "voice_profile": user_preferences,
+        "total": len(pages), "done": done, "failed": [], "status": "running",
+        "startedAt": manifest.get("startedAt", time.time()),
+    })
+    _save_manifest(manifest_path, manifest)
+    if progress_callback:
+        progress_callback(done, len(pages), title)
+
+    failed = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(_render_page, start, chunk_text, user_preferences): (start, end)
+                for start, end, chunk_text in pending
+            }
+            for future in as_completed(futures):
+                start, end = futures[future]
+                try:
+                    future.result()
+                    done += end - start
+                except Exception as e:
+                    logging.warning(f"[{title}] Sayfa {start + 1}-{end} seslendirilemedi: {e}")
+                    failed.extend(range(start, end))
+                manifest.update({"done": done, "failed": sorted(failed)})
+                _save_manifest(manifest_path, manifest)
+                if progress_callback:
+                    progress_callback(done, len(pages), title)
+
+    manifest.update({"status": "failed" if failed else "completed", "finishedAt": time.time()})
+    _save_manifest(manifest_path, manifest)
+    return manifest
+
+
+def main():
+    from core.database import get_all_books_collection
+
+    parser = argparse.ArgumentParser(description="Katalog kitaplarını önceden seslendirir.")
+    parser.add_argument("--url", action="append", required=True, help="all_books kaydının URL'si (birden çok verilebilir)")
+    parser.add_argument("--voice-name", default=None)
+    parser.add_argument("--voice-gender", default="FEMALE", choices=["FEMALE", "MALE"])
+    parser.add_argument("--speaking-rate", type=float, default=1.0)
+    parser.add_argument("--pitch", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=PRERENDER_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    user_preferences = {
+        "voice_name": args.voice_name, "voice_gender": args.voice_gender,
+        "speaking_rate": args.speaking_rate, "pitch": args.pitch,
+    }
+
+    all_books_collection = get_all_books_collection()
+    if all_books_collection is None:
+        raise SystemExit("Veritabanı bağlantısı kurulamadı.")
+
+    for url in args.url:
+        book = all_books_collection.find_one({"url": url})
+        if not book:
+            logging.warning(f"Kitap bulunamadı: {url}")
+            continue
+        manifest = prerender_book(book, user_preferences, workers=args.workers)
+        logging.info(f"[{manifest['title']}] durum: {manifest['status']} ({manifest['done']}/{manifest['total']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# core/progress.py
+
+import os
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import streamlit as st
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.database import get_listening_history_collection
+from utils.helpers import extract_book_info, normalize_url
+
+# Bekleyen ilerleme kayıtlarının veritabanına yazılma aralığı
+PROGRESS_FLUSH_SECONDS = float(os.getenv("KITAVOX_PROGRESS_FLUSH_SECONDS", "5"))
+_DUPLICATE_KEY = 11000
+
+ProgressKey = tuple[str, str]  # (user_id, kitap_url)
+
+
+def build_progress_fields(user_id: str, kitap_url: str, total_pages: int, current_page: int) -> dict:
+    """Dinleme geçmişi kaydına yazılacak alanları hazırlar."""
+    progress = round((current_page / total_pages) * 100, 2) if total_pages > 0 else 0
+    return {
+        "userId": ObjectId(user_id), "bookUrl": kitap_url, "bookName": extract_book_info(kitap_url),
+        "normalizedUrl": normalize_url(kitap_url),
+        "pageCount": total_pages, "currentPage": current_page,
+        "readingProgress": progress, "isCompleted": current_page >= total_pages,
+        "timestamp": datetime.now(timezone.utc),
+    }
+
+
+class ProgressRecorder:
+    """
+    Dinleme ilerlemesi için arkadan yazan (write-behind) tampon.
+
+    `record` yalnızca belleğe yazar ve hemen döner; aynı (kullanıcı, kitap) için gelen
+    güncellemeler birleştirilir, yalnızca sonuncusu yazılır. Arka plandaki iş parçacığı
+    bekleyenleri `flush_interval` aralıklarla tek bir `bulk_write` ile yazar. Süreç düzgün
+    kapanırken (atexit) kalan kayıtlar da yazılır; yazılamayanlar bir sonraki denemeye kalır.
+    """
+
+    def __init__(self, collection_getter: Callable, flush_interval: float = PROGRESS_FLUSH_SECONDS):
+        self.collection_getter = collection_getter
+        self.flush_interval = flush_interval
+        self._pending: dict[ProgressKey, dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.close)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="progress-recorder")
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def record(self, user_id: str, kitap_url: str, total_pages: int, current_page: int) -> None:
+        fields = build_progress_fields(user_id, kitap_url, total_pages, current_page)
+        with self._lock:
+            self._pending[(user_id, kitap_url)] = fields
+            self._ensure_thread()
+
+    def pending(self, user_id: str, kitap_url: str) -> Optional[dict]:
+        """Henüz yazılmamış son ilerleme kaydını (varsa) döndürür."""
+        with self._lock:
+            return self._pending.get((user_id, kitap_url))
+
+    def _take(self, user_id: Optional[str]) -> dict[ProgressKey, dict]:
+        with self._lock:
+            if user_id is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {key: fields for key, fields in self._pending.items() if key[0] == user_id}
+                for key in batch:
+                    del self._pending[key]
+        return batch
+
+    def _requeue(self, batch: dict[ProgressKey, dict]) -> None:
+        with self._lock:
+            for key, fields in batch.items():
+                # Bu arada daha yeni bir güncelleme geldiyse o korunur
+                self._pending.setdefault(key, fields)
+
+    def flush(self, user_id: Optional[str] = None) -> int:
+        """
+        Bekleyen kayıtları (user_id verilirse yalnızca o kullanıcınınkileri) yazar ve yazılan
+        kayıt sayısını döndürür. Okumalardan önce çağrılarak kullanıcının son ilerlemesi görülür.
+        """
+        with self._flush_lock:
+            batch = self._take(user_id)
+            if not batch:
+                return 0
+            collection = self.collection_getter()
+            if collection is None:
+                self._requeue(batch)
+                return 0
+
+            keys = list(batch)
+
+            def update(key, upsert):
+                fields = batch[key]
+                return UpdateOne({"userId": fields["userId"], "bookUrl": key[1]}, {"$set": fields}, upsert=upsert)
+
+            try:
+                try:
+                    collection.bulk_write([update(key, True) for key in keys], ordered=False)
+                except BulkWriteError as e:
+                    # Başka bir süreçle yarışan upsert'ler benzersiz indekse takılır; kayıt artık var, güncellenir
+                    errors = e.details.get("writeErrors", [])
+                    retry = [update(keys[err["index"]], False) for err in errors if err.get("code") == _DUPLICATE_KEY]
+                    failed = {keys[err["index"]] for err in errors if err.get("code") != _DUPLICATE_KEY}
+                    if retry:
+                        collection.bulk_write(retry, ordered=False)
+                    if failed:
+                        logging.warning(f"{len(failed)} ilerleme kaydı yazılamadı, yeniden denenecek.")
+                        self._requeue({key: batch[key] for key in failed})
+                        return len(batch) - len(failed)
+            except Exception as e:
+                logging.warning(f"İlerleme kayıtları yazılamadı, yeniden denenecek: {e}")
+                self._requeue(batch)
+                return 0
+            return len(batch)
+
+    def close(self) -> None:
+        """Arka plan iş parçacığını durdurur ve kalan kayıtları yazar."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+@st.cache_resource
+def get_progress_recorder() -> ProgressRecorder:
+    """Tüm oturumların paylaştığı ilerleme tamponunu döndürür."""
+    return ProgressRecorder(get_listening_history_collection)
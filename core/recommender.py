@@ -2,8 +2,6 @@
 
 import streamlit as st
 from bson.objectid import ObjectId
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 # Modül importları
 from core.database import (
@@ -12,6 +10,7 @@ from core.database import (
     get_feedback_collection,
     get_all_books_collection
 )
+from core.catalog import get_catalog
 
 # --- ANA ÖNERİ FONKSİYONU ---
 
@@ -39,27 +38,32 @@ def get_enhanced_recommendations(user_id_str: str, n_recommendations=5):
         user_favorites = list(favorites_collection.find({"userId": user_id}))
         user_feedback = list(feedback_collection.find({"userId": user_id}))
 
+        # Geçmiş, favori ve geri bildirimlerdeki tüm kitaplar tek sorguyla alınır
+        books_by_url = get_catalog().get_many(
+            entry.get("bookUrl") for entry in user_history + user_favorites + user_feedback
+        )
+
         # Kullanıcı tercihlerini (kategori ve yazar puanları) hesapla
         preferred_categories = {}
         preferred_authors = {}
         
         # Geçmişten gelenler (ağırlık: 1)
         for entry in user_history:
-            book = all_books_collection.find_one({"url": entry.get("bookUrl")})
+            book = books_by_url.get(entry.get("bookUrl"))
             if book:
                 if book.get("category"): preferred_categories[book["category"]] = preferred_categories.get(book["category"], 0) + 1
                 if book.get("author"): preferred_authors[book["author"]] = preferred_authors.get(book["author"], 0) + 1
         
         # Favorilerden gelenler (ağırlık: 2)
         for fav in user_favorites:
-            book = all_books_collection.find_one({"url": fav.get("bookUrl")})
+            book = books_by_url.get(fav.get("bookUrl"))
             if book:
                 if book.get("category"): preferred_categories[book["category"]] = preferred_categories.get(book["category"], 0) + 2
                 if book.get("author"): preferred_authors[book["author"]] = preferred_authors.get(book["author"], 0) + 2
 
         # Geri bildirimlerden gelenler (ağırlık: puana göre -2 ile +2 arası)
         for fb in user_feedback:
-            book = all_books_collection.find_one({"url": fb.get("bookUrl")})
+            book = books_by_url.get(fb.get("bookUrl"))
             if book:
                 weight = fb.get("rating", 3) - 3
                 if book.get("category"): preferred_categories[book["category"]] = preferred_categories.get(book["category"], 0) + weight
@@ -0,0 +1,475 @@
+# core/search.py
+
+"""
+Katalog araması için süreç içi, Türkçe duyarlı ters indeks.
+
+Başlık, yazar ve kategori alanları Türkçe büyük/küçük harf kurallarına (I/ı, İ/i) göre
+küçültülüp aksanlardan arındırılarak kelimelere ayrılır. Her kelime, geçtiği kitaplara
+ve alan ağırlığına işaret eder. Sorgu kelimeleri önek olarak eşleşir; sıralı kelime
+listesi üzerinde ikili arama yapıldığından arama süresi katalog büyüdükçe sabit kalır.
+Hiç eşleşmeyen (örn. yanlış yazılmış) kelimeler, kelime dağarcığı üzerindeki karakter
+üçlüsü (trigram) indeksiyle en benzer kelimelere genişletilir.
+İndeks `updatedAt` alanına göre artımlı olarak güncellenir.
+"""
+
+import os
+import re
+import time
+import bisect
+import heapq
+import logging
+import threading
+import unicodedata
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Optional
+
+import streamlit as st
+
+from core.catalog import BOOK_PROJECTION
+from core.database import get_all_books_collection, get_listening_history_collection
+
+# Artımlı güncellemenin en sık hangi aralıkla kontrol edileceği
+SEARCH_REFRESH_SECONDS = int(os.getenv("KITAVOX_SEARCH_REFRESH_SECONDS", "60"))
+# Silinen kitapların ve updatedAt taşımayan eski kayıtların da yansıması için tam yeniden kurulum aralığı
+SEARCH_REBUILD_SECONDS = int(os.getenv("KITAVOX_SEARCH_REBUILD_SECONDS", str(6 * 3600)))
+# Alan ağırlıkları: başlıkta geçen kelime yazardakinden, yazardaki kategoridekinden değerlidir
+FIELD_WEIGHTS = {"title": 3.0, "author": 2.0, "category": 1.0}
+# Önek eşleşmesi tam kelime eşleşmesinden daha düşük puan alır
+PREFIX_MATCH_FACTOR = 0.6
+# Tek bir önek için genişletilecek en fazla kelime (çok kısa öneklerde gecikmeyi sınırlar)
+MAX_PREFIX_TERMS = 256
+# Bulanık eşleşme: en az bu benzerlikteki kelimeler, benzerlikleriyle orantılı düşük puan alır
+FUZZY_MIN_SIMILARITY = 0.35
+FUZZY_MATCH_FACTOR = 0.5
+# Yanlış yazılmış bir kelime için denenecek en fazla benzer kelime
+FUZZY_MAX_TERMS = 8
+# Bundan kısa kelimelerde üçlüler anlamlı benzerlik vermez
+FUZZY_MIN_TOKEN_CHARS = 3
+# Bulanık genişletmenin aşmaması gereken süre; dolduğunda o ana kadarki adaylarla devam edilir
+SEARCH_BUDGET_MS = float(os.getenv("KITAVOX_SEARCH_BUDGET_MS", "50"))
+# Otomatik tamamlama: bu uzunluğa kadarki önekler için öneriler önceden hesaplanır
+PRECOMPUTED_PREFIX_CHARS = 3
+AUTOCOMPLETE_K = 8
+
+_TOKEN = re.compile(r"\w+")
+
+
+def fold_turkish(text: str) -> str:
+    """Türkçe kurallarla küçültür ve aksanları kaldırır: 'IŞIK İçin' -> 'isik icin'."""
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).replace("ı", "i")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(fold_turkish(text)) if text else []
+
+
+def trigrams(term: str) -> set[str]:
+    """Kelimenin başı iki, sonu bir boşlukla doldurulmuş karakter üçlüleri ('ali' -> '  a', ' al', 'ali', 'li ')."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """Tek bir arama sonucu. `fuzzy`, sorgudaki en az bir kelimenin benzerlikle eşleştiğini gösterir."""
+    book: dict
+    score: float
+    fuzzy: bool = False
+
+
+class SearchIndex:
+    """
+    URL anahtarlı kitap kayıtları üzerinde ters indeks.
+    `postings[kelime][url]` kelimenin kitapta aldığı en yüksek alan ağırlığıdır.
+    """
+
+    def __init__(self):
+        self.documents: dict[str, dict] = {}
+        self.postings: dict[str, dict[str, float]] = {}
+        self.terms: list[str] = []  # sıralı kelime listesi (önek araması için)
+        self.trigram_terms: dict[str, set[str]] = {}  # üçlü -> onu içeren kelimeler (bulanık arama için)
+        self._doc_terms: dict[str, set] = {}
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_rebuild = 0.0
+        self.version = 0  # her değişiklikte artar; otomatik tamamlama tablosu buna göre yenilenir
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()  # aynı anda yalnızca bir güncelleme çalışır
+
+    # --- İndeks bakımı ---
+    def _index_terms(self, book: dict) -> dict[str, float]:
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(book.get(field) or ""):
+                weights[token] = max(weights.get(token, 0.0), weight)
+        return weights
+
+    def _add_term(self, term: str) -> None:
+        bisect.insort(self.terms, term)
+        for trigram in trigrams(term):
+            self.trigram_terms.setdefault(trigram, set()).add(term)
+
+    def _drop_term(self, term: str) -> None:
+        del self.postings[term]
+        position = bisect.bisect_left(self.terms, term)
+        if position < len(self.terms) and self.terms[position] == term:
+            del self.terms[position]
+        for trigram in trigrams(term):
+            terms = self.trigram_terms.get(trigram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.trigram_terms[trigram]
+
+    def _remove(self, url: str) -> None:
+        self.version += 1
+        for term in self._doc_terms.pop(url, ()):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(url, None)
+            if not docs:
+                self._drop_term(term)
+        self.documents.pop(url, None)
+
+    def upsert(self, book: dict) -> None:
+        url = book.get("url")
+        if not url:
+            return
+        with self._lock:
+            self._remove(url)
+            weights = self._index_terms(book)
+            for term, weight in weights.items():
+                docs = self.postings.get(term)
+                if docs is None:
+                    docs = self.postings[term] = {}
+                    self._add_term(term)
+                docs[url] = weight
+            self._doc_terms[url] = set(weights)
+            self.documents[url] = book
+
+    def remove(self, url: str) -> None:
+        with self._lock:
+            self._remove(url)
+
+    def build(self, books) -> None:
+        """İndeksi verilen kayıtlardan sıfırdan kurar (tek tek eklemekten hızlıdır)."""
+        documents, postings, doc_terms = {}, {}, {}
+        for book in books:
+            url = book.get("url")
+            if not url:
+                continue
+            weights = self._index_terms(book)
+            for term, weight in weights.items():
+                postings.setdefault(term, {})[url] = weight
+            doc_terms[url] = set(weights)
+            documents[url] = book
+        trigram_terms = {}
+        for term in postings:
+            for trigram in trigrams(term):
+                trigram_terms.setdefault(trigram, set()).add(term)
+        with self._lock:
+            self.documents, self.postings, self._doc_terms = documents, postings, doc_terms
+            self.terms = sorted(postings)
+            self.trigram_terms = trigram_terms
+            self.version += 1
+
+    # --- Veritabanı ile eşitleme ---
+    def _track_watermark(self, book: dict) -> None:
+        updated_at = book.get("updatedAt")
+        if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+
+    def refresh(self, collection, force_rebuild: bool = False) -> int:
+        """
+        Koleksiyondaki değişiklikleri indekse yansıtır ve işlenen kayıt sayısını döndürür.
+        Normalde yalnızca `updatedAt` son görülen değerden yeni olan kayıtlar okunur;
+        ilk çağrıda ve SEARCH_REBUILD_SECONDS aralıklarla tüm koleksiyon yeniden okunur.
+        """
+        projection = {**BOOK_PROJECTION, "updatedAt": 1}
+        now = time.monotonic()
+        with self._lock:
+            rebuild = force_rebuild or not self._last_rebuild or now - self._last_rebuild > SEARCH_REBUILD_SECONDS
+            watermark = self._watermark
+
+        # Veritabanı okuması kilit dışında yapılır; bu sırada aramalar eski indeksle sürer
+        if rebuild:
+            books = list(collection.find({}, projection))
+        else:
+            query = {"updatedAt": {"$gt": watermark}} if watermark is not None else {"updatedAt": {"$exists": True}}
+            books = list(collection.find(query, projection))
+
+        with self._lock:
+            if rebuild:
+                self._watermark = None
+                self.build(books)
+                self._last_rebuild = now
+            else:
+                for book in books:
+                    self.upsert(book)
+            for book in books:
+                self._track_watermark(book)
+            self._last_refresh = now
+        if books:
+            logging.info(f"Arama indeksi güncellendi: {len(books)} kayıt ({'tam' if rebuild else 'artımlı'}).")
+        return len(books)
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._last_refresh > SEARCH_REFRESH_SECONDS or not self._last_rebuild
+
+    def refresh_if_stale(self, collection) -> None:
+        """
+        İndeks eskiyse günceller. Aynı anda yalnızca bir çağıran güncelleme yapar; diğerleri
+        beklemeden eldeki indeksle devam eder. İndeks henüz hiç kurulmadıysa sunulacak bir şey
+        olmadığından çağıranlar ilk kurulumu bekler.
+        """
+        if not self._is_stale():
+            return
+        if not self._refresh_lock.acquire(blocking=not self._last_rebuild):
+            return
+        try:
+            # Kilidi beklerken başka bir çağıran güncellemiş olabilir
+            if self._is_stale():
+                self.refresh(collection)
+        except Exception as e:
+            # Güncelleme başarısız olsa da eldeki indeksle aramaya devam edilir
+            logging.warning(f"Arama indeksi güncellenemedi: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    # --- Arama ---
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        """Sorgu kelimesiyle başlayan indeks kelimelerini ve eşleşme katsayılarını döndürür."""
+        start = bisect.bisect_left(self.terms, token)
+        matches = []
+        for term in self.terms[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(token):
+                break
+            matches.append((term, 1.0 if term == token else PREFIX_MATCH_FACTOR))
+        return matches
+
+    def _fuzzy_expand(self, token: str, deadline: float) -> list[tuple[str, float]]:
+        """
+        Ortak üçlü sayısına göre kelimeye en benzer indeks kelimelerini döndürür.
+        Benzerlik Jaccard katsayısıdır: ortak üçlüler / toplam farklı üçlüler.
+        """
+        if len(token) < FUZZY_MIN_TOKEN_CHARS:
+            return []
+        query_trigrams = trigrams(token)
+        shared: dict[str, int] = {}
+        # Nadir üçlülerden başlanır; süre dolarsa en ayırt edici olanlar işlenmiş olur
+        for trigram in sorted(query_trigrams, key=lambda t: len(self.trigram_terms.get(t, ()))):
+            for term in self.trigram_terms.get(trigram, ()):
+                shared[term] = shared.get(term, 0) + 1
+            if time.perf_counter() > deadline:
+                break
+
+        candidates = []
+        for term, common in shared.items():
+            similarity = common / (len(query_trigrams) + len(term) + 1 - common)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                candidates.append((term, similarity))
+        best = heapq.nlargest(FUZZY_MAX_TERMS, candidates, key=itemgetter(1))
+        return [(term, FUZZY_MATCH_FACTOR * similarity) for term, similarity in best]
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True,
+               budget_ms: float = SEARCH_BUDGET_MS) -> list[SearchHit]:
+        """
+        Tüm sorgu kelimelerini (önek olarak) içeren kitapları puana göre sıralı döndürür.
+        Puan, her sorgu kelimesi için en iyi eşleşmenin alan ağırlığı × eşleşme katsayısının toplamıdır.
+        `fuzzy` açıksa hiç eşleşmeyen kelimeler en benzer kelimelere genişletilir; bu adım
+        `budget_ms` milisaniye ile sınırlıdır.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        deadline = time.perf_counter() + budget_ms / 1000
+        with self._lock:
+            used_fuzzy = False
+            expansions = []
+            for token in tokens:
+                matches = self._expand(token)
+                if not matches and fuzzy:
+                    matches = self._fuzzy_expand(token, deadline)
+                    used_fuzzy = used_fuzzy or bool(matches)
+                expansions.append(matches)
+
+            scores: Optional[dict[str, float]] = None
+            # Az eşleşen kelimeden başlamak ara kümeleri küçük tutar
+            expansions.sort(key=len)
+            for matches in expansions:
+                token_scores: dict[str, float] = {}
+                for term, factor in matches:
+                    for url, weight in self.postings[term].items():
+                        if scores is not None and url not in scores:
+                            continue
+                        score = weight * factor
+                        if score > token_scores.get(url, 0.0):
+                            token_scores[url] = score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {url: scores[url] + score for url, score in token_scores.items()}
+                if not scores:
+                    return []
+
+            ranked = heapq.nsmallest(limit, scores.items(),
+                                     key=lambda item: (-item[1], self.documents[item[0]].get("title") or ""))
+            return [SearchHit(dict(self.documents[url]), score, used_fuzzy) for url, score in ranked]
+
+
+@dataclass(frozen=True)
+class Completion:
+    """Otomatik tamamlama önerisi: bir kitap başlığı (url ile) veya bir yazar adı."""
+    text: str
+    kind: str  # "title" | "author"
+    popularity: int
+    url: Optional[str] = None
+
+
+class Autocompleter:
+    """
+    Başlık ve yazarlar için sıralı dizi + ikili arama tabanlı otomatik tamamlama.
+
+    Her öneri, metnindeki her kelimeden başlayan katlanmış anahtarlarla diziye eklenir;
+    böylece 'kemal' yazıldığında 'Yaşar Kemal' de önerilir. En fazla
+    PRECOMPUTED_PREFIX_CHARS karakterlik önekler için en popüler k öneri önceden
+    hesaplanır; daha uzun önekler dizide dar bir aralığa düştüğünden doğrudan taranır.
+    """
+
+    def __init__(self, completions: list[Completion], k: int):
+        self.k = k
+        self.completions = completions
+        entries = []
+        for position, completion in enumerate(completions):
+            words = tokenize(completion.text)
+            for start in range(len(words)):
+                entries.append((" ".join(words[start:]), position))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [position for _, position in entries]
+
+        groups: dict[str, set[int]] = {}
+        for key, position in entries:
+            for length in range(1, min(PRECOMPUTED_PREFIX_CHARS, len(key)) + 1):
+                groups.setdefault(key[:length], set()).add(position)
+        self.table = {prefix: self._top(positions) for prefix, positions in groups.items()}
+
+    def _top(self, positions) -> list[Completion]:
+        best = heapq.nsmallest(self.k, positions, key=lambda p: (-self.completions[p].popularity, self.completions[p].text))
+        return [self.completions[p] for p in best]
+
+    def complete(self, prefix: str, k: Optional[int] = None) -> list[Completion]:
+        k = min(k or self.k, self.k)
+        key = " ".join(tokenize(prefix))
+        if not key:
+            return []
+        if len(key) <= PRECOMPUTED_PREFIX_CHARS:
+            return self.table.get(key, [])[:k]
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + "\uffff", start)
+        return self._top(set(self.ids[start:end]))[:k]
+
+
+def build_autocompleter(documents: dict[str, dict], popularity: dict[str, int], k: int = AUTOCOMPLETE_K) -> Autocompleter:
+    """Kitap kayıtlarından ve url -> dinlenme sayısı sözlüğünden tamamlama yapısını kurar."""
+    completions = []
+    author_popularity: dict[str, int] = {}
+    author_names: dict[str, str] = {}
+    for url, book in documents.items():
+        count = popularity.get(url, 0)
+        if book.get("title"):
+            completions.append(Completion(book["title"], "title", count, url))
+        author = book.get("author")
+        if author:
+            key = fold_turkish(author)
+            author_names.setdefault(key, author)
+            author_popularity[key] = author_popularity.get(key, 0) + count
+    for key, name in author_names.items():
+        completions.append(Completion(name, "author", author_popularity[key]))
+    return Autocompleter(completions, k)
+
+
+@st.cache_data(ttl=1800)
+def get_book_popularity() -> dict[str, int]:
+    """Kitap URL'si -> dinleme geçmişindeki kayıt sayısı."""
+    history_collection = get_listening_history_collection()
+    if history_collection is None:
+        return {}
+    pipeline = [{"$group": {"_id": "$bookUrl", "count": {"$sum": 1}}}]
+    return {doc["_id"]: doc["count"] for doc in history_collection.aggregate(pipeline) if doc["_id"]}
+
+
+@st.cache_resource
+def get_search_index() -> SearchIndex:
+    """Tüm oturumların paylaştığı arama indeksini döndürür."""
+    return SearchIndex()
+
+
+def search_books(query: str, limit: int = 20, fuzzy: bool = True) -> list[SearchHit]:
+    """Kataloğu indeks üzerinden arar; indeks gerekiyorsa önce artımlı olarak güncellenir."""
+    all_books_collection = get_all_books_collection()
+    if all_books_collection is None:
+        return []
+    index = get_search_index()
+    index.refresh_if_stale(all_books_collection)
+    return index.search(query, limit, fuzzy=fuzzy)
+
+
+@st.cache_resource
+def _autocomplete_state() -> dict:
+    return {"completer": None, "version": None, "building": False, "lock": threading.Lock()}
+
+
+def _rebuild_autocompleter(state: dict, index: SearchIndex, popularity: dict[str, int]) -> None:
+    try:
+        with index._lock:
+            version, documents = index.version, dict(index.documents)
+        completer = build_autocompleter(documents, popularity)
+        with state["lock"]:
+            state["completer"], state["version"] = completer, version
+    except Exception as e:
+        logging.warning(f"Otomatik tamamlama yapısı kurulamadı: {e}")
+    finally:
+        with state["lock"]:
+            state["building"] = False
+
+
+def autocomplete(prefix: str, k: int = AUTOCOMPLETE_K) -> list[Completion]:
+    """
+    Yazılan öneke göre en popüler başlık ve yazar önerilerini döndürür.
+    Arama indeksi değiştiğinde (yeni veya güncellenen kitaplar) tamamlama yapısı arka planda,
+    aynı anda en fazla bir iş parçacığıyla yeniden kurulur; bu sırada eski yapı kullanılır.
+    Yalnızca ilk kurulum çağıranı bekletir.
+    """
+    all_books_collection = get_all_books_collection()
+    if all_books_collection is None:
+        return []
+    index = get_search_index()
+    index.refresh_if_stale(all_books_collection)
+
+    state = _autocomplete_state()
+    with state["lock"]:
+        completer = state["completer"]
+        outdated = state["version"] != index.version and not state["building"]
+    start_rebuild = False
+    if outdated:
+        # Popülerlik st.cache_data'dan gelir; Streamlit bağlamı olan bu iş parçacığında okunur
+        popularity = get_book_popularity()
+        with state["lock"]:
+            start_rebuild = not state["building"]
+            state["building"] = True
+    if start_rebuild:
+        args = (state, index, popularity)
+        if completer is None:
+            _rebuild_autocompleter(*args)
+        else:
+            threading.Thread(target=_rebuild_autocompleter, args=args, daemon=True,
+                             name="autocomplete-rebuild").start()
+    if completer is None:
+        completer = state["completer"]
+    return completer.complete(prefix, k) if completer is not None else []
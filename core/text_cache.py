@@ -0,0 +1,209 @@
+# core/text_cache.py
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional
+
+import streamlit as st
+
+from utils.data_processing import fetch_validators, load_book_pages, open_lazy_pdf
+from utils.disk_budget import DiskBudget
+
+if TYPE_CHECKING:
+    from utils.data_processing import LazyPdfPages
+
+TEXT_CACHE_DIR = os.getenv("KITAVOX_TEXT_CACHE_DIR", os.path.join(".cache", "text"))
+TEXT_CACHE_MAX_BYTES = int(os.getenv("KITAVOX_TEXT_CACHE_MAX_MB", "512")) * 1024 * 1024
+TEXT_CACHE_MEMORY_ITEMS = int(os.getenv("KITAVOX_TEXT_CACHE_MEMORY_ITEMS", "32"))
+# Bellekteki URL kayıtları bu süre boyunca ağa hiç gidilmeden kullanılır
+URL_REVALIDATE_SECONDS = int(os.getenv("KITAVOX_TEXT_CACHE_REVALIDATE_SECONDS", "3600"))
+# ETag/Last-Modified vermeyen kaynakların disk kayıtları bu süre sonunda yeniden çıkarılır
+UNVALIDATED_TTL_SECONDS = 24 * 3600
+# Sayfalama mantığı değiştiğinde eski disk kayıtlarının kullanılmaması için artırılır
+TEXT_CACHE_VERSION = "4"
+# Aynı anda açık tutulacak en fazla PDF belgesi
+OPEN_PDF_LIMIT = int(os.getenv("KITAVOX_OPEN_PDF_LIMIT", "16"))
+
+BookPages = tuple[list[str], int]
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BookTextCache:
+    """
+    Kitaplardan çıkarılan sayfa metinleri için iki katmanlı önbellek.
+    Önde sınırlı boyutlu bir bellek içi LRU, arkada gzip ile sıkıştırılmış disk kayıtları bulunur.
+    Disk anahtarı URL'ler için URL + ETag/Last-Modified, yüklenen dosyalar için içerik özetidir.
+    Disk katmanı `max_bytes` ile sınırlıdır; en uzun süredir okunmayan kayıtlar silinir (LRU).
+    """
+
+    def __init__(self, directory: str = TEXT_CACHE_DIR, memory_items: int = TEXT_CACHE_MEMORY_ITEMS,
+                 max_bytes: int = TEXT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.memory_items = memory_items
+        self._budget = DiskBudget(directory, max_bytes, suffix=".json.gz")
+        self._memory: "OrderedDict[str, tuple[float, BookPages]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    # --- Bellek katmanı ---
+    def _memory_key(self, source: str) -> str:
+        if _is_url(source):
+            return f"url:{source}"
+        stat = os.stat(source)
+        return f"file:{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _memory_get(self, key: str, max_age: Optional[float]) -> Optional[BookPages]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if max_age is not None and time.time() - stored_at > max_age:
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key: str, value: BookPages) -> None:
+        with self._lock:
+            self._memory[key] = (time.time(), value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    # --- Disk katmanı ---
+    def _disk_key(self, source: str) -> tuple[str, bool]:
+        """Disk anahtarını ve kaynağın doğrulayıcıyla (validator) eşlenip eşlenmediğini döndürür."""
+        if not _is_url(source):
+            return _file_sha256(source), True
+        validators = fetch_validators(source)
+        etag = validators.get("etag", "")
+        last_modified = validators.get("last_modified", "")
+        raw = "\x1f".join([TEXT_CACHE_VERSION, source, etag, last_modified])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), bool(etag or last_modified)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{TEXT_CACHE_VERSION}-{key}.json.gz")
+
+    def _disk_get(self, key: str, validated: bool) -> Optional[BookPages]:
+        path = self._disk_path(key)
+        try:
+            if not validated and time.time() - os.path.getmtime(path) > UNVALIDATED_TTL_SECONDS:
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if validated:
+                # Doğrulanmamış kayıtların mtime'ı TTL için yazma zamanı olarak kalmalıdır
+                self._budget.touch(path)  # LRU için erişim zamanını güncelle
+            return data["pages"], data["total"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Metin önbelleği okunamadı ({path}): {e}")
+            return None
+
+    def _disk_put(self, key: str, value: BookPages) -> None:
+        path = self._disk_path(key)
+        pages, total = value
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump({"pages": pages, "total": total}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._budget.added(os.path.getsize(path))
+        except OSError as e:
+            logging.warning(f"Metin önbelleğine yazılamadı ({path}): {e}")
+
+    def get_or_load(self, source: str, loader: Callable[[str], BookPages] = load_book_pages) -> BookPages:
+        """
+        Kaynağın sayfalarını önbellekten döndürür; yoksa loader ile çıkarıp her iki katmana yazar.
+        Bellekte bulunan kayıtlar için ağ veya ayrıştırma maliyeti oluşmaz.
+        """
+        memory_key = self._memory_key(source)
+        max_age = URL_REVALIDATE_SECONDS if _is_url(source) else None
+        cached = self._memory_get(memory_key, max_age)
+        if cached is not None:
+            return cached
+
+        disk_key, validated = self._disk_key(source)
+        cached = self._disk_get(disk_key, validated)
+        if cached is None:
+            cached = loader(source)
+            # Boş sonuçlar (örn. geçici ağ hatası) önbelleğe alınmaz
+            if not cached[0]:
+                return cached
+            self._disk_put(disk_key, cached)
+        self._memory_put(memory_key, cached)
+        return cached
+
+
+class PdfPagePool:
+    """
+    Açık PDF belgelerini (LazyPdfPages) kaynağa göre tutan sınırlı LRU havuzu.
+    Aynı kitabı dinleyen oturumlar ve yeniden çalıştırmalar aynı belgeyi ve
+    daha önce çıkarılmış sayfaları paylaşır.
+    """
+
+    def __init__(self, limit: int = OPEN_PDF_LIMIT):
+        self.limit = limit
+        self._documents: "OrderedDict[str, LazyPdfPages]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, source: str) -> str:
+        if _is_url(source):
+            return f"url:{source}"
+        stat = os.stat(source)
+        return f"file:{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def get(self, source: str, start_page: int = 0) -> BookPages:
+        """
+        Kaynağın tembel sayfa görünümünü ve toplam sayfa sayısını döndürür. Belge ilk kez
+        açıldığında büyük PDF'lerin sayfaları `start_page`'den (0 tabanlı) başlanarak
+        arka planda paralel çıkarılır; oynatıcı bu sırada sayfaları tembel okumaya devam eder.
+        """
+        key = self._key(source)
+        with self._lock:
+            pages = self._documents.get(key)
+            if pages is not None:
+                self._documents.move_to_end(key)
+                return pages, len(pages)
+
+        pages = open_lazy_pdf(source)
+        pages.extract_in_background(start_page)
+        with self._lock:
+            self._documents[key] = pages
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.limit:
+                _, evicted = self._documents.popitem(last=False)
+                # Hâlâ kullanan biri varsa belge ilk erişimde yeniden açılır
+                evicted.close()
+        return pages, len(pages)
+
+
+@st.cache_resource
+def get_pdf_pool() -> PdfPagePool:
+    """Tüm oturumların paylaştığı açık PDF havuzunu döndürür."""
+    return PdfPagePool()
+
+
+@st.cache_resource
+def get_text_cache() -> BookTextCache:
+    """Tüm oturumların paylaştığı kitap metni önbelleğini döndürür."""
+    return BookTextCache()
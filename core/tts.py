@@ -2,10 +2,31 @@
 
 import os
 import streamlit as st
-import pygame
 import io
-from google.cloud import texttospeech
 from typing import List, Optional
+from core.audio_cache import AudioCache, make_audio_key
+from core.packing import request_texts
+from utils.lazy_import import lazy_import
+
+# Ağır bağımlılıklar ilk seslendirme/çalma isteğinde yüklenir; giriş ekranı bunları beklemez
+pygame = lazy_import("pygame")
+texttospeech = lazy_import("google.cloud.texttospeech")
+
+# "server": ses sunucuda pygame ile çalınır (varsayılan)
+# "browser": ses tarayıcıya gönderilir ve istemci tarafında çalınır
+PLAYBACK_MODE = os.getenv("KITAVOX_PLAYBACK_MODE", "server")
+
+def create_tts_client() -> "texttospeech.TextToSpeechClient":
+    """
+    Yeni bir Google Text-to-Speech istemcisi oluşturur.
+    Streamlit dışında çalışan işler (örn. ön seslendirme süreçleri) bunu doğrudan kullanır.
+    """
+    # GOOGLE_APPLICATION_CREDENTIALS ortam değişkeni .env üzerinden yüklenir.
+    if "GOOGLE_APPLICATION_CREDENTIALS" not in os.environ:
+         # .env dosyasında yolu belirtin veya doğrudan os.environ'a atayın.
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_PATH")
+
+    return texttospeech.TextToSpeechClient()
 
 @st.cache_resource
 def initialize_tts_client():
@@ -14,17 +35,71 @@ def initialize_tts_client():
     Credentials'ın ortam değişkeni olarak ayarlandığını varsayar.
     """
     try:
-        # GOOGLE_APPLICATION_CREDENTIALS ortam değişkeni .env üzerinden yüklenir.
-        if "GOOGLE_APPLICATION_CREDENTIALS" not in os.environ:
-             # .env dosyasında yolu belirtin veya doğrudan os.environ'a atayın.
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_PATH")
-
-        return texttospeech.TextToSpeechClient()
+        return create_tts_client()
     except Exception as e:
         st.error(f"TTS istemcisi başlatılamadı: {e}")
         return None
 
-def list_available_voices(gender_filter: Optional[str] = None) -> List[texttospeech.Voice]:
+@st.cache_resource
+def get_audio_cache() -> AudioCache:
+    """
+    Tüm oturumların paylaştığı disk tabanlı ses önbelleğini döndürür.
+    """
+    return AudioCache()
+
+def audio_key_for(text: str, user_preferences: dict) -> str:
+    """
+    Metin ve kullanıcının ses tercihleri için ses önbelleği anahtarını döndürür.
+    """
+    return make_audio_key(
+        text,
+        user_preferences.get("voice_name"),
+        user_preferences.get("voice_gender", "FEMALE"),
+        user_preferences.get("speaking_rate"),
+        user_preferences.get("pitch"),
+        encoding="MP3"
+    )
+
+def synthesize_page_audio(client_tts, text: str, user_preferences: dict, audio_cache: Optional[AudioCache] = None) -> bytes:
+    """
+    Verilen metni kullanıcının ses tercihleriyle seslendirir.
+    Aynı metin ve ayarlar daha önce seslendirildiyse sonuç önbellekten döner.
+    TTS sınırını aşan metin (tek başına çok uzun bir sayfa) birden çok istekle seslendirilir ve
+    MP3 çıktıları art arda eklenir; önbellekte yine tek kayıt olarak tutulur.
+    Arka plan iş parçacıklarından çağrılırken önbellek nesnesi parametre olarak verilmelidir.
+    """
+    voice_name = user_preferences.get("voice_name")
+    voice_gender_str = user_preferences.get("voice_gender", "FEMALE")
+    speaking_rate = user_preferences.get("speaking_rate")
+    pitch = user_preferences.get("pitch")
+
+    if audio_cache is None:
+        audio_cache = get_audio_cache()
+    cache_key = audio_key_for(text, user_preferences)
+    cached_audio = audio_cache.get(cache_key)
+    if cached_audio is not None:
+        return cached_audio
+
+    voice = texttospeech.VoiceSelectionParams(
+        language_code="tr-TR",
+        name=voice_name,
+        ssml_gender=texttospeech.SsmlVoiceGender[voice_gender_str]
+    )
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        speaking_rate=speaking_rate,
+        pitch=pitch
+    )
+    audio_content = b"".join(
+        client_tts.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=segment), voice=voice, audio_config=audio_config
+        ).audio_content
+        for segment in request_texts(text)
+    )
+    audio_cache.put(cache_key, audio_content)
+    return audio_content
+
+def list_available_voices(gender_filter: Optional[str] = None) -> List["texttospeech.Voice"]:
     """
     Kullanılabilir Türkçe sesleri listeler ve cinsiyete göre filtreler.
     """
@@ -83,6 +158,10 @@ def play_voice_preview(voice_name: str):
             input=synthesis_input, voice=voice, audio_config=audio_config
         )
         
+        if PLAYBACK_MODE == "browser":
+            st.audio(response.audio_content, format="audio/mp3", autoplay=True)
+            return
+
         st.info(f"'{voice_name}' sesi için önizleme oynatılıyor...")
         play_audio_from_bytes(response.audio_content)
         st.success("Önizleme tamamlandı.")
@@ -0,0 +1,45 @@
+# core/user_cache.py
+
+import os
+import time
+from typing import Optional
+
+import streamlit as st
+from bson.objectid import ObjectId
+
+from core.database import get_users_collection
+
+# Başka bir oturumda (örn. ikinci sekme) yapılan değişikliklerin en geç görüneceği süre
+USER_CACHE_TTL = int(os.getenv("KITAVOX_USER_CACHE_TTL", "300"))
+# Ağır ve hassas alanlar önbelleğe alınmaz; gereken sayfalar bunları ayrıca okur
+USER_PROJECTION = {"profile_photo": 0, "password": 0}
+_SESSION_KEY = "_cached_user"
+
+
+def get_session_user(user_id=None) -> Optional[dict]:
+    """
+    Oturumdaki kullanıcının belgesini (profile_photo ve password hariç) döndürür.
+    Belge oturum boyunca saklanır; başlık, tema, oynatıcı ve ayarlar aynı sayfa
+    görüntülemesinde veritabanına tekrar gitmez. Kayıt işlemlerinden sonra
+    `invalidate_session_user` çağrılmalıdır.
+    """
+    user_id_str = str(user_id or st.session_state.get("user_id") or "")
+    if not user_id_str:
+        return None
+
+    cached = st.session_state.get(_SESSION_KEY)
+    if cached and cached["user_id"] == user_id_str and time.monotonic() - cached["loaded_at"] < USER_CACHE_TTL:
+        return cached["user"]
+
+    users_collection = get_users_collection()
+    if users_collection is None:
+        return None
+    user = users_collection.find_one({"_id": ObjectId(user_id_str)}, USER_PROJECTION)
+    if user is not None:
+        st.session_state[_SESSION_KEY] = {"user_id": user_id_str, "user": user, "loaded_at": time.monotonic()}
+    return user
+
+
+def invalidate_session_user() -> None:
+    """Ayarlar, tema veya profil kaydedildiğinde önbellekteki kullanıcı belgesini siler."""
+    st.session_state.pop(_SESSION_KEY, None)
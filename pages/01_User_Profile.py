@@ -1,7 +1,5 @@
 # pages/01_User_Profile.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import bcrypt
 from PIL import Image
 from io import BytesIO
@@ -17,9 +15,15 @@ from core.database import (
     get_users_collection,
     get_listening_history_collection,
     get_favorites_collection,
-    get_feedback_collection,
-    get_all_books_collection  # Bu import eksikti, eklendi.
+    get_feedback_collection
 )
+from core.catalog import get_catalog
+from core.user_cache import invalidate_session_user
+from utils.lazy_import import lazy_import
+
+# Grafik kütüphaneleri yalnızca dinleme grafiği çizilirken yüklenir
+pd = lazy_import("pandas")
+px = lazy_import("plotly.express")
 
 # --- Oturum Kontrolü ---
 if 'user_id' not in st.session_state or st.session_state.user_id is None:
@@ -31,7 +35,6 @@ users_collection = get_users_collection()
 listening_history_collection = get_listening_history_collection()
 favorites_collection = get_favorites_collection()
 feedback_collection = get_feedback_collection()
-all_books_collection = get_all_books_collection()
 
 # --- PROFİL İÇİN YARDIMCI FONKSİYONLAR (GÜNCELLENMİŞ) ---
 
@@ -39,12 +42,13 @@ def get_user_preferences(user_id_obj):
     # DÜZELTME: Bu fonksiyon artık all_books_collection'ı kullanarak tercihleri doğru bir şekilde analiz ediyor.
     preferences = {"categories": {}, "authors": {}, "read_books": set()}
     history = list(listening_history_collection.find({"userId": user_id_obj}))
+    books_by_url = get_catalog().get_many(entry.get("bookUrl") for entry in history)
     
     for entry in history:
         book_url = entry.get("bookUrl")
         preferences["read_books"].add(book_url)
         
-        book = all_books_collection.find_one({"url": book_url})
+        book = books_by_url.get(book_url)
         if book:
             if book.get("category"):
                 cat = book["category"]
@@ -149,6 +153,7 @@ def show_profile_edit_form(user_id_str):
                 except Exception as e:
                     st.error(f"Resim işlenirken hata oluştu: {e}")
             users_collection.update_one({"_id": user_id_obj}, {"$set": update_fields})
+            invalidate_session_user()
             st.success("Profil başarıyla güncellendi!")
             st.session_state.editing_mode = None
             st.rerun()
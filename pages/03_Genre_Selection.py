@@ -3,14 +3,13 @@ import streamlit as st
 from PIL import Image
 import os
 import logging
-from urllib.parse import urljoin
 
 
 
 # Modül importları
 from core.actions import set_selected_book, start_listening_process, add_to_favorites
-from core.database import get_all_books_collection
-from utils.data_processing import fetch_page
+from core.catalog import get_catalog
+from utils.data_processing import get_genre_links, get_genre_book_urls
 from components.header import render_header
 from components.footer import render_footer
 
@@ -27,8 +26,8 @@ def display_genres():
     }
     istenen_turler = {"Roman", "Şiir", "Öykü"}
     
-    soup = fetch_page("/")
-    if not soup:
+    genre_links = get_genre_links()
+    if not genre_links:
         st.error("Türler alınamadı. Lütfen daha sonra tekrar deneyin.")
         return
 
@@ -36,8 +35,7 @@ def display_genres():
     col_idx = 0
     found_genres = set()
 
-    for a in soup.find_all("a", href=True):
-        tur_adi = a.get_text(strip=True)
+    for tur_adi, tur_href in genre_links:
         if tur_adi in istenen_turler and tur_adi not in found_genres:
             with cols[col_idx]:
                 image_path = tur_resimleri.get(tur_adi)
@@ -46,7 +44,7 @@ def display_genres():
                 
                 if st.button(f"{tur_adi} Kitaplarını Gör", key=f"genre_{tur_adi}"):
                     st.session_state.selected_genre_name = tur_adi
-                    st.session_state.selected_genre_url = a['href']
+                    st.session_state.selected_genre_url = tur_href
                     st.rerun()
             col_idx += 1
             found_genres.add(tur_adi)
@@ -56,29 +54,27 @@ def display_books_for_genre(user_id_str, genre_name, genre_url):
     """Seçilen türe ait kitapları siteden çeker ve listeler."""
     st.subheader(f"'{genre_name}' Türündeki Kitaplar")
 
-    all_books_collection = get_all_books_collection()
+    catalog = get_catalog()
     
     with st.spinner(f"'{genre_name}' türündeki kitaplar yükleniyor..."):
-        soup = fetch_page(genre_url)
-        if not soup:
-            st.error("Kitaplar alınamadı."); return
-
         # DÜZELTME: Web sitesinin yapısı değişmiş olabileceğinden, kitapları bulmak için
         # daha genel ve güvenilir bir yöntem kullanıyoruz. 'card-action' içindeki linkleri arıyoruz.
-        kitap_linkleri = soup.select("div.card-action a[href]")
+        # Liste önbellekten gelir; her tıklamada siteye istek atılmaz.
+        kitap_linkleri = get_genre_book_urls(genre_url)
+        if kitap_linkleri is None:
+            st.error("Kitaplar alınamadı."); return
         
         if not kitap_linkleri:
             st.warning("Bu türde gösterilecek kitap bulunamadı veya site yapısı değişti.")
             return
 
+        # Listedeki tüm kitapların zenginleştirilmiş verisi tek sorguyla alınır
+        books_by_url = catalog.get_many(kitap_linkleri)
+
         kitap_sayaci = 0
-        for title_a in kitap_linkleri:
+        for kitap_url in kitap_linkleri:
             try:
-                # Tam URL'yi oluştur
-                kitap_url = urljoin("https://dijitalkitaplar.net", title_a['href'])
-                
-                # Veritabanından bu URL ile eşleşen zenginleştirilmiş veriyi bul
-                book = all_books_collection.find_one({"url": kitap_url})
+                book = books_by_url.get(kitap_url)
 
                 # Eğer kitap veritabanında yoksa, bu adımı atla
                 if not book:
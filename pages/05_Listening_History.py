@@ -16,7 +16,8 @@ from bson.objectid import ObjectId # MongoDB ObjectID'leri için gerekebilir
 
 # Proje içi modüllerin import edilmesi
 # Bu yollar, projenizin kök dizininden çalıştırıldığı varsayımına dayanır.
-from core.database import get_all_books_collection, get_listening_history_collection
+from core.database import get_listening_history_collection
+from core.catalog import get_catalog
 from core.actions import get_listening_history, set_selected_book
 from components.header import render_header
 from components.footer import render_footer
@@ -59,7 +60,6 @@ def display_listening_history():
 
     user_id = st.session_state.user_id
     history = get_listening_history(user_id)
-    all_books_collection = get_all_books_collection()
     history_collection = get_listening_history_collection()
 
     # Dinleme geçmişi boş ise bilgilendirme mesajı göster
@@ -73,6 +73,11 @@ def display_listening_history():
         render_footer()
         return # Fonksiyonun devam etmesini engelle
 
+    # Geçmişteki katalog kitaplarının bilgileri tek sorguyla alınır
+    books_by_url = get_catalog().get_many(
+        entry["bookUrl"] for entry in history if str(entry.get("bookUrl", "")).startswith("http")
+    )
+
     # Dinleme geçmişindeki her bir kayıt için döngü
     for entry in reversed(history): # Son dinleneni en üstte göstermek için
         
@@ -80,7 +85,7 @@ def display_listening_history():
         book_in_db = None
         
         if not is_local_file:
-            book_in_db = all_books_collection.find_one({"url": entry["bookUrl"]})
+            book_in_db = books_by_url.get(entry["bookUrl"])
 
         # --- Arayüz için bilgileri hazırla ---
         if book_in_db:
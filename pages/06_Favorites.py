@@ -3,7 +3,8 @@ import streamlit as st
 from bson.objectid import ObjectId
 import re
 
-from core.database import get_favorites_collection, get_all_books_collection
+from core.database import get_favorites_collection
+from core.catalog import get_catalog
 from core.actions import set_selected_book, start_listening_process, add_to_favorites # add_to_favorites burada kullanılmayacak ama import kalabilir
 from utils.helpers import normalize_url
 
@@ -22,7 +23,6 @@ def favorites_page(user_id_str: str):
 
     user_id_obj = ObjectId(user_id_str)
     favorites_collection = get_favorites_collection()
-    all_books_collection = get_all_books_collection()
     
     favorites = list(favorites_collection.find({"userId": user_id_obj}).sort("timestamp", -1))
 
@@ -31,8 +31,10 @@ def favorites_page(user_id_str: str):
         st.page_link("pages/07_Search_Books.py", label="Kitap Aramak İçin Tıklayın")
         return
 
+    books_by_url = get_catalog().get_many(fav["bookUrl"] for fav in favorites)
+
     for fav in favorites:
-        book = all_books_collection.find_one({"url": fav["bookUrl"]})
+        book = books_by_url.get(fav["bookUrl"])
         if not book: continue
 
         display_title = book.get("title", fav.get("bookName", "Başlık Bilinmiyor"))
@@ -3,7 +3,7 @@ import streamlit as st
 import re
 from bson.objectid import ObjectId
 
-from core.database import get_all_books_collection
+from core.search import search_books, autocomplete
 from core.actions import add_to_favorites, set_selected_book, start_listening_process
 
 
@@ -11,6 +11,10 @@ from core.actions import add_to_favorites, set_selected_book, start_listening_pr
 if 'user_id' not in st.session_state or st.session_state.user_id is None:
     st.warning("Bu sayfayı görüntülemek için lütfen giriş yapın."); st.page_link("streamlit_app.py", label="Giriş Sayfasına Git"); st.stop()
 
+def _use_suggestion(text: str):
+    # Widget anahtarı yalnızca bir sonraki çalıştırmadan önce (geri çağırmada) değiştirilebilir
+    st.session_state.search_term_input = text
+
 def search_page(user_id_str: str):
     st.title("🔍 Kitaplarda Arama Yap")
     
@@ -19,25 +23,30 @@ def search_page(user_id_str: str):
         start_listening_process(user_id_str)
         return
 
-    all_books_collection = get_all_books_collection()
-    
     search_term = st.text_input("Kitap adı, yazar veya kategori girin:", key="search_term_input")
     
     if search_term:
-        # Arama sorgusunu oluştur (büyük/küçük harf duyarsız)
-        query = {"$or": [
-            {"title": {"$regex": search_term, "$options": "i"}},
-            {"author": {"$regex": search_term, "$options": "i"}},
-            {"category": {"$regex": search_term, "$options": "i"}},
-        ]}
-        
-        results = list(all_books_collection.find(query).limit(20))
+        # Popülerliğe göre başlık ve yazar önerileri
+        suggestions = [c for c in autocomplete(search_term, k=6) if c.text != search_term]
+        if suggestions:
+            cols = st.columns(len(suggestions))
+            for i, (col, suggestion) in enumerate(zip(cols, suggestions)):
+                icon = "✍️" if suggestion.kind == "author" else "📖"
+                col.button(f"{icon} {suggestion.text}", key=f"suggest_{i}",
+                           on_click=_use_suggestion, args=(suggestion.text,), use_container_width=True)
+
+        # Arama bellek içi indeks üzerinden yapılır (Türkçe harf ve aksan duyarsız, önek eşleşmeli,
+        # yanlış yazılmış kelimeler için benzerlik araması)
+        hits = search_books(search_term, limit=20)
         
-        if not results:
+        if not hits:
             st.warning("Aramanızla eşleşen bir kitap bulunamadı.")
         else:
-            st.success(f"{len(results)} kitap bulundu.")
-            for book in results:
+            st.success(f"{len(hits)} kitap bulundu.")
+            if any(hit.fuzzy for hit in hits):
+                st.caption("Tam eşleşme bulunamayan kelimeler için en yakın sonuçlar gösteriliyor.")
+            for hit in hits:
+                book = hit.book
                 display_title = book.get("title", "Başlık Bilinmiyor")
                 cover_image = book.get("cover_image_url", "https://www.cihatayaz.com/wp-content/uploads/2017/06/slider_item_01.gif")
 
@@ -13,7 +13,7 @@ import streamlit as st
 
 # Proje içi modüllerin import edilmesi
 from core.actions import get_listening_history
-from core.database import get_all_books_collection
+from core.catalog import get_catalog
 from core.gemini import initialize_gemini, answer_book_question
 from components.header import render_header
 from components.footer import render_footer
@@ -46,8 +46,10 @@ def prepare_history_data(user_id: str):
     if not history:
         return {}
 
-    all_books_collection = get_all_books_collection()
     book_data_map = {}
+    books_by_url = get_catalog().get_many(
+        entry["bookUrl"] for entry in history if str(entry.get("bookUrl", "")).startswith("http")
+    )
 
     for entry in history:
         book_title = entry.get("bookName", "Bilinmeyen Başlık")
@@ -58,7 +60,7 @@ def prepare_history_data(user_id: str):
         book_in_db = None
         
         if not is_local_file:
-            book_in_db = all_books_collection.find_one({"url": entry["bookUrl"]})
+            book_in_db = books_by_url.get(entry["bookUrl"])
 
         if book_in_db:
             book_data_map[book_title] = {
@@ -3,6 +3,8 @@ import streamlit as st
 from bson.objectid import ObjectId
 from core.database import get_users_collection
 from core.tts import list_available_voices, play_voice_preview
+from core.user_cache import get_session_user, invalidate_session_user
+from utils.ui import save_user_theme
 
 if 'user_id' not in st.session_state or st.session_state.user_id is None:
     st.warning("Bu sayfayı görüntülemek için lütfen giriş yapın.")
@@ -13,7 +15,7 @@ def handle_user_settings(user_id_str: str):
     st.title("Kullanıcı Ayarları")
     users_collection = get_users_collection()
     user_id_obj = ObjectId(user_id_str)
-    user = users_collection.find_one({"_id": user_id_obj})
+    user = get_session_user(user_id_str)
     
     if not user:
         st.error("Kullanıcı bulunamadı.")
@@ -59,6 +61,7 @@ def handle_user_settings(user_id_str: str):
             }
             users_collection.update_one({"_id": user_id_obj}, 
                                       {"$set": {f"preferences.{k}": v for k, v in new_prefs.items()}})
+            invalidate_session_user()
             st.success("Ses ayarları başarıyla kaydedildi!")
             st.rerun()
 
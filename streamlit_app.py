@@ -3,6 +3,7 @@
 import streamlit as st
 import os
 from core.auth import login_page, register_page
+from core.database import warm_up, is_ready, get_connection_error
 from utils.ui import load_css, load_image_as_base64
 
 st.set_page_config(
@@ -11,6 +12,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Veritabanı bağlantısı arka planda kurulur; giriş ekranı el sıkışmayı beklemeden açılır
+warm_up()
+
 # --- Oturum Yönetimi ---
 if 'user_id' not in st.session_state:
     st.session_state.user_id = None
@@ -53,6 +57,8 @@ def main():
         # Ana ekranda giriş/kayıt sekmelerini göster.
         st.title("Kitavox'a Hoş Geldiniz")
         st.info("Lütfen devam etmek için giriş yapın veya yeni bir hesap oluşturun.")
+        if not is_ready() and get_connection_error():
+            st.warning(f"Veritabanına şu anda ulaşılamıyor: {get_connection_error()}")
 
         login_tab, register_tab = st.tabs(["Giriş Yap", "Kayıt Ol"])
 
@@ -0,0 +1,36 @@
+# tests/test_audio_server.py
+
+import json
+import urllib.request
+
+import pytest
+
+from core import audio_server
+from core.audio_cache import AudioCache
+
+APP_ORIGIN = "http://localhost:8501"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_server, "get_audio_cache", lambda: AudioCache(str(tmp_path)))
+    return audio_server.AudioServer(host="127.0.0.1", port=0, allowed_origins=frozenset([APP_ORIGIN]))
+
+
+def fetch_playlist(server, url, origin):
+    host, port = server.address
+    request = urllib.request.Request(url.replace(server.public_url, f"http://{host}:{port}"),
+                                     headers={"Origin": origin})
+    with urllib.request.urlopen(request) as response:
+        return response.headers, json.loads(response.read())
+
+
+def test_cors_is_limited_to_the_app_origin(server):
+    url = server.register_playlist("a" * 32, lambda from_page: {"tracks": [], "next": None})
+
+    headers, body = fetch_playlist(server, url, APP_ORIGIN)
+    assert body == {"tracks": [], "next": None}
+    assert headers["Access-Control-Allow-Origin"] == APP_ORIGIN
+
+    headers, _ = fetch_playlist(server, url, "https://kotu-site.example")
+    assert headers["Access-Control-Allow-Origin"] is None
@@ -0,0 +1,41 @@
+# tests/test_crawler.py
+
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from core.crawler import CatalogCrawler
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+URL = "https://dijitalkitaplar.net/ornek-kitap/"
+PDF_URL = "https://dijitalkitaplar.net/ornek-kitap.pdf"
+
+
+def test_recrawl_only_bumps_updated_at_when_pdf_changes():
+    book = {"url": URL, "title": "Örnek", "author": None, "category": "Roman", "pdf_url": PDF_URL}
+    operations = CatalogCrawler(None)._to_updates(book, NOW)
+
+    assert operations == [
+        UpdateOne(
+            {"url": URL},
+            {
+                "$set": {"crawledAt": NOW},
+                "$setOnInsert": {"title": "Örnek", "category": "Roman", "createdAt": NOW,
+                                 "updatedAt": NOW, "pdf_url": PDF_URL},
+            },
+            upsert=True,
+        ),
+        UpdateOne({"url": URL, "pdf_url": {"$ne": PDF_URL}}, {"$set": {"pdf_url": PDF_URL, "updatedAt": NOW}}),
+    ]
+
+
+def test_book_without_pdf_is_a_single_upsert():
+    book = {"url": URL, "title": "Örnek", "category": "Şiir", "pdf_url": None}
+    assert CatalogCrawler(None)._to_updates(book, NOW) == [
+        UpdateOne(
+            {"url": URL},
+            {"$set": {"crawledAt": NOW},
+             "$setOnInsert": {"title": "Örnek", "category": "Şiir", "createdAt": NOW, "updatedAt": NOW}},
+            upsert=True,
+        ),
+    ]
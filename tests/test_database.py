@@ -0,0 +1,60 @@
+# tests/test_database.py
+
+import core.database as database
+
+
+class FlakyAdmin:
+    def __init__(self, failures):
+        self.failures = failures
+
+    def command(self, name):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("küme yanıt vermiyor")
+        return {"ok": 1}
+
+
+class FakeClient:
+    def __init__(self, failures):
+        self.admin = FlakyAdmin(failures)
+
+    def __getitem__(self, name):
+        return name
+
+
+def _reset(monkeypatch, client, migrations):
+    monkeypatch.setattr(database, "get_client", lambda: client)
+    monkeypatch.setattr(database, "run_startup_migrations", migrations.append)
+    monkeypatch.setattr(database, "_ready", database.threading.Event())
+    monkeypatch.setattr(database, "_last_error", None)
+    monkeypatch.setattr(database, "_warm_up_running", False)
+    monkeypatch.setattr(database, "_warm_up_backoff", 2.0)
+    monkeypatch.setattr(database, "_next_warm_up", 0.0)
+
+
+def test_failed_warm_up_is_retried_after_backoff(monkeypatch):
+    migrations = []
+    _reset(monkeypatch, FakeClient(failures=1), migrations)
+    started = []
+    monkeypatch.setattr(database.threading, "Thread",
+                        lambda target, **kwargs: type("T", (), {"start": lambda self: started.append(target)})())
+
+    database.warm_up()
+    started.pop()()
+    assert not database.is_ready()
+    assert database.get_connection_error() == "küme yanıt vermiyor"
+    assert not started  # geri çekilme süresi dolmadan yeniden denenmez
+
+    monkeypatch.setattr(database, "_next_warm_up", 0.0)
+    database.is_ready()
+    started.pop()()
+    assert database.is_ready()
+    assert database.get_connection_error() is None
+    assert migrations == [database.MONGO_DB_NAME]
+
+
+def test_backoff_doubles_up_to_limit(monkeypatch):
+    _reset(monkeypatch, FakeClient(failures=10), [])
+    for expected in (4.0, 8.0, 16.0, 32.0, 60.0, 60.0):
+        database._warm_up()
+        assert database._warm_up_backoff == expected
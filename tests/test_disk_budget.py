@@ -0,0 +1,34 @@
+# tests/test_disk_budget.py
+
+import os
+
+from utils.disk_budget import DiskBudget
+
+
+def test_oldest_files_and_sidecars_are_evicted(tmp_path):
+    budget = DiskBudget(str(tmp_path), max_bytes=1000, suffix=".pdf", sidecar_suffixes=(".meta.json",))
+    for index in range(5):
+        path = tmp_path / f"{index}.pdf"
+        path.write_bytes(b"x" * 300)
+        (tmp_path / f"{index}.pdf.meta.json").write_text("{}")
+        os.utime(path, (index, index))
+        budget.added(300)
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "2.pdf", "2.pdf.meta.json", "3.pdf", "3.pdf.meta.json", "4.pdf", "4.pdf.meta.json",
+    ]
+
+
+def test_touch_protects_recently_read_files(tmp_path):
+    budget = DiskBudget(str(tmp_path), max_bytes=1000, suffix=".pdf")
+    for index in range(3):
+        path = tmp_path / f"{index}.pdf"
+        path.write_bytes(b"x" * 300)
+        os.utime(path, (index, index))
+    budget.touch(str(tmp_path / "0.pdf"))
+
+    (tmp_path / "3.pdf").write_bytes(b"x" * 300)
+    budget.added(300)
+
+    assert "0.pdf" in os.listdir(tmp_path)
+    assert "1.pdf" not in os.listdir(tmp_path)
@@ -0,0 +1,53 @@
+# tests/test_html_extraction.py
+
+from utils.html_extraction import extract_main_text
+
+PARAGRAPH = "Ağaçların gölgesinde uyuyan çocuk, rüyasında ışıklı bir şehre yürüyordu. " * 4
+
+
+def test_state_class_on_wrapper_keeps_article():
+    html = (
+        '<html><body><div class="site-wrap no-sidebar">'
+        '<nav class="menu"><a href="/">Ana sayfa</a></nav>'
+        f"<article><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p>"
+        '<div class="share">Paylaş</div></article>'
+        "</div></body></html>"
+    )
+    text = extract_main_text(html)
+    assert PARAGRAPH.strip() in text
+    assert "Paylaş" not in text
+    assert "Ana sayfa" not in text
+
+
+def test_state_classes_do_not_remove_scored_content():
+    html = (
+        '<html><body><div class="layout has-sidebar menu-open">'
+        f'<div class="content"><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p></div>'
+        '<div class="sidebar"><p>Yan sütundaki duyurular ve bağlantılar burada yer alır.</p></div>'
+        "</div></body></html>"
+    )
+    text = extract_main_text(html)
+    assert text.count(PARAGRAPH.strip()) == 3
+    assert "duyurular" not in text
+
+
+def test_chosen_paragraphs_survive_boilerplate_class():
+    html = f'<html><body><div class="related"><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p></div></body></html>'
+    assert extract_main_text(html).count(PARAGRAPH.strip()) == 3
+
+
+def test_tail_text_after_removed_block_is_kept():
+    html = (
+        f'<html><body><article><p>{PARAGRAPH}</p>'
+        '<div class="share">Paylaş</div>Son cümle burada.<!-- yorum --></article></body></html>'
+    )
+    text = extract_main_text(html)
+    assert "Paylaş" not in text
+    assert text.endswith("Son cümle burada.")
+
+
+def test_encoding_declaration_and_empty_input():
+    html = f'<?xml version="1.0" encoding="utf-8"?><html><body><main><p>{PARAGRAPH}</p></main></body></html>'
+    assert extract_main_text(html) == PARAGRAPH.strip()
+    assert extract_main_text("") == ""
+    assert extract_main_text("   ") == ""
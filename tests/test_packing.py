@@ -0,0 +1,32 @@
+# tests/test_packing.py
+
+from core.packing import PagePacker, request_texts
+
+SENTENCE = "Ağaçların gölgesinde uyuyan çocuk ışıklı bir şehre yürüyordu. "
+
+
+def test_short_pages_are_packed_into_one_request():
+    pages = ["Birinci şiir.", "", "İkinci şiir.", "Üçüncü şiir."]
+    packer = PagePacker(pages, max_bytes=200)
+    assert list(packer.iter_chunks()) == [(0, 4)]
+    assert packer.segments((0, 4)) == ["Birinci şiir.\n\nİkinci şiir.\n\nÜçüncü şiir."]
+
+
+def test_page_larger_than_max_bytes_is_split_into_requests():
+    long_page = SENTENCE * 20
+    pages = ["Kısa bir giriş sayfası.", long_page, "Son sayfa."]
+    packer = PagePacker(pages, max_bytes=200)
+
+    # Sayfa eşlemesi korunur: uzun sayfa kendi parçasıdır, komşuları ayrı parçalardır
+    assert list(packer.iter_chunks()) == [(0, 1), (1, 2), (2, 3)]
+    assert packer.chunk(1) == (1, 2)
+
+    segments = packer.segments((1, 2))
+    assert len(segments) > 1
+    assert all(len(segment.encode("utf-8")) <= 200 for segment in segments)
+    assert " ".join(segments) == " ".join(long_page.split())
+    assert packer.segments((0, 1)) == ["Kısa bir giriş sayfası."]
+
+
+def test_request_texts_of_empty_text():
+    assert request_texts("") == []
@@ -0,0 +1,49 @@
+# tests/test_pdf_extraction.py
+
+from concurrent.futures import wait
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from utils import data_processing
+from utils.data_processing import PARALLEL_PDF_MIN_PAGES, LazyPdfPages, download_and_process_pdf
+
+LINE = "Ağaçların gölgesinde uyuyan çocuk ışıklı bir şehre yürüyordu."
+
+
+def build_pdf(path, page_count):
+    doc = fitz.open()
+    for page_number in range(page_count):
+        doc.new_page().insert_text((40, 50), f"{page_number}. {LINE}", fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def test_background_extraction_fills_page_index(tmp_path, monkeypatch):
+    pdf_path = str(tmp_path / "kitap.pdf")
+    build_pdf(pdf_path, PARALLEL_PDF_MIN_PAGES)
+    expected, _ = download_and_process_pdf(pdf_path, workers=1)
+
+    pages = LazyPdfPages(pdf_path)
+    futures = pages.extract_in_background(start=10, workers=2)
+    assert futures
+    wait(futures)
+    assert pages.extract_in_background(workers=2) == []
+
+    # Tüm sayfalar arka plan çıkarmasından gelmeli; bu süreçte hiçbir sayfa çıkarılmamalı
+    def fail(page):
+        raise AssertionError("sayfa tembel yoldan çıkarıldı")
+
+    monkeypatch.setattr(data_processing, "extract_page_text", fail)
+    assert list(pages) == expected
+    pages.close()
+
+
+def test_small_documents_are_not_sent_to_the_pool(tmp_path):
+    pdf_path = str(tmp_path / "kisa.pdf")
+    build_pdf(pdf_path, 3)
+    pages = LazyPdfPages(pdf_path)
+    assert pages.extract_in_background(workers=2) == []
+    assert pages[1].startswith("1. ")
+    pages.close()
@@ -0,0 +1,73 @@
+# tests/test_progress.py
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.progress import ProgressRecorder
+
+USER_ID = str(ObjectId())
+BOOK_URL = "https://dijitalkitaplar.net/kitap/ornek-kitap.pdf"
+
+
+class StubCollection:
+    """bulk_write çağrılarını kaydeden koleksiyon; `errors` verilirse ilk çağrı hata verir."""
+
+    def __init__(self, errors=None):
+        self.calls = []
+        self.errors = errors
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append(list(operations))
+        if self.errors is not None and len(self.calls) == 1:
+            raise BulkWriteError({"writeErrors": self.errors})
+
+
+def expected_update(fields: dict, upsert: bool) -> UpdateOne:
+    """ProgressRecorder'ın bekleyen kayıt için yazması gereken işlem."""
+    return UpdateOne({"userId": fields["userId"], "bookUrl": fields["bookUrl"]}, {"$set": fields}, upsert=upsert)
+
+
+def test_close_flushes_only_the_last_update_in_one_write():
+    collection = StubCollection()
+    recorder = ProgressRecorder(lambda: collection, flush_interval=3600)
+    for page in range(1, 101):
+        recorder.record(USER_ID, BOOK_URL, 100, page)
+    last = recorder.pending(USER_ID, BOOK_URL)
+    assert last["currentPage"] == 100
+
+    recorder.close()
+
+    assert collection.calls == [[expected_update(last, upsert=True)]]
+    assert recorder.pending(USER_ID, BOOK_URL) is None
+
+
+def test_duplicate_key_upserts_are_retried_as_updates():
+    other_book = BOOK_URL.replace("ornek", "diger")
+    collection = StubCollection(errors=[{"index": 0, "code": 11000}])
+    recorder = ProgressRecorder(lambda: collection, flush_interval=3600)
+    recorder.record(USER_ID, BOOK_URL, 10, 4)
+    recorder.record(USER_ID, other_book, 10, 7)
+    first = recorder.pending(USER_ID, BOOK_URL)
+    second = recorder.pending(USER_ID, other_book)
+
+    assert recorder.flush() == 2
+
+    assert collection.calls == [
+        [expected_update(first, upsert=True), expected_update(second, upsert=True)],
+        [expected_update(first, upsert=False)],
+    ]
+    recorder.close()
+
+
+def test_other_write_errors_are_requeued():
+    # 121: belge doğrulama hatası; kayıt kaybolmaz, bir sonraki yazmada yeniden denenir
+    collection = StubCollection(errors=[{"index": 0, "code": 121}])
+    recorder = ProgressRecorder(lambda: collection, flush_interval=3600)
+    recorder.record(USER_ID, BOOK_URL, 10, 4)
+
+    assert recorder.flush() == 0
+    assert recorder.pending(USER_ID, BOOK_URL)["currentPage"] == 4
+
+    recorder.close()
+    assert len(collection.calls) == 2
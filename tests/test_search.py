@@ -0,0 +1,79 @@
+# tests/test_search.py
+
+import threading
+import time
+
+import core.search as search
+from core.search import SearchIndex
+
+BOOKS = [
+    {"url": "https://dijitalkitaplar.net/kitap/1", "title": "İnce Memed", "author": "Yaşar Kemal"},
+    {"url": "https://dijitalkitaplar.net/kitap/2", "title": "Kuyucaklı Yusuf", "author": "Sabahattin Ali"},
+]
+
+
+class SlowCollection:
+    """find çağrılarını sayan, her okumada bir süre bekleyen koleksiyon."""
+
+    def __init__(self, books, delay=0.2):
+        self.books = books
+        self.delay = delay
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        time.sleep(self.delay)
+        return [dict(book) for book in self.books]
+
+
+def test_concurrent_refreshes_run_once():
+    collection = SlowCollection(BOOKS)
+    index = SearchIndex()
+    index.refresh(collection)
+    index._last_refresh = 0.0  # eskimiş say
+    collection.finds = 0
+
+    threads = [threading.Thread(target=index.refresh_if_stale, args=(collection,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert collection.finds == 1
+
+
+def test_autocomplete_serves_old_completer_while_rebuilding(monkeypatch):
+    index = SearchIndex()
+    index.build(BOOKS)
+    state = {"completer": None, "version": None, "building": False, "lock": threading.Lock()}
+    built = threading.Event()
+    release = threading.Event()
+    original_build = search.build_autocompleter
+
+    def slow_build(documents, popularity):
+        if built.is_set():
+            release.wait(5)
+        built.set()
+        return original_build(documents, popularity)
+
+    monkeypatch.setattr(search, "get_all_books_collection", lambda: SlowCollection(BOOKS, delay=0))
+    monkeypatch.setattr(search, "get_search_index", lambda: index)
+    monkeypatch.setattr(search, "get_book_popularity", lambda: {})
+    monkeypatch.setattr(search, "_autocomplete_state", lambda: state)
+    monkeypatch.setattr(search, "build_autocompleter", slow_build)
+    monkeypatch.setattr(SearchIndex, "refresh_if_stale", lambda self, collection: None)
+
+    # İlk kurulum çağıranı bekletir
+    assert [c.text for c in search.autocomplete("kuy")] == ["Kuyucaklı Yusuf"]
+
+    index.upsert({"url": "https://dijitalkitaplar.net/kitap/3", "title": "Kuyruklu Yıldız", "author": "Ahmet Rasim"})
+    started = time.perf_counter()
+    assert [c.text for c in search.autocomplete("kuy")] == ["Kuyucaklı Yusuf"]
+    assert search.autocomplete("kuy") and state["building"]
+    assert time.perf_counter() - started < 1
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while state["building"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert {c.text for c in search.autocomplete("kuy")} == {"Kuyucaklı Yusuf", "Kuyruklu Yıldız"}
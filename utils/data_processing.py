@@ -1,90 +1,430 @@
 # utils/data_processing.py
 import streamlit as st
 import requests
-import fitz  # PyMuPDF
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import tempfile
+import hashlib
+import logging
+import threading
+import json
 import os
 import re
+import time
+from collections.abc import Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
 from urllib.parse import urljoin
+from utils.helpers import split_text_by_bytes
+from utils.disk_budget import DiskBudget
+from utils.html_extraction import extract_main_text
+from utils.lazy_import import lazy_import
+from utils.ttl_cache import TTLCache
+
+fitz = lazy_import("fitz")  # PyMuPDF; yalnızca PDF açılırken yüklenir
 
 BASE_URL = "https://dijitalkitaplar.net"
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 SESSION = requests.Session()
+# Bağlantılar havuzda yeniden kullanılır; geçici sunucu hataları geri çekilmeyle tekrar denenir.
+_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+               allowed_methods=("GET", "HEAD"))
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_RETRY)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+# İndirilecek dosyalar için üst sınır ve akış parça boyutu
+MAX_DOWNLOAD_BYTES = int(os.getenv("KITAVOX_MAX_DOWNLOAD_MB", "100")) * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Tür ve kitap listeleri bu süre boyunca taze sayılır; bir güne kadar eski değer
+# gösterilip arka planda yenilenir.
+LISTING_CACHE_TTL = int(os.getenv("KITAVOX_LISTING_CACHE_TTL", "600"))
+_LISTING_CACHE = TTLCache(ttl=LISTING_CACHE_TTL, max_stale=24 * 3600)
+# URL'den indirilen PDF'lerin saklandığı dizin (tembel okuma için dosya açık kalmalıdır)
+PDF_CACHE_DIR = os.getenv("KITAVOX_PDF_CACHE_DIR", os.path.join(".cache", "pdf"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("KITAVOX_PDF_CACHE_MAX_MB", "2048")) * 1024 * 1024
+# Sınır aşıldığında en uzun süredir açılmayan PDF'ler (ve ETag kayıtları) silinir
+_PDF_CACHE_BUDGET = DiskBudget(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES, suffix=".pdf", sidecar_suffixes=(".meta.json",))
+# Bu sayfa sayısının altındaki PDF'lerde süreç başlatma maliyeti kazancı aşar
+PARALLEL_PDF_MIN_PAGES = int(os.getenv("KITAVOX_PARALLEL_PDF_MIN_PAGES", "64"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("KITAVOX_PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+# Çıkarma süreç havuzları ilk büyük PDF'te açılır ve süreç boyunca yeniden kullanılır;
+# böylece her kitapta işçi süreçleri başlatma ve fitz'i yeniden yükleme maliyeti ödenmez.
+_EXTRACTION_EXECUTORS: dict[int, ProcessPoolExecutor] = {}
+_EXTRACTION_EXECUTORS_LOCK = threading.Lock()
+
+def _fetch_soup(path):
+    full_url = urljoin(BASE_URL, path)
+    response = SESSION.get(full_url, headers=HEADERS, timeout=15)
+    response.raise_for_status()
+    return BeautifulSoup(response.text, 'html.parser')
 
 def fetch_page(path):
     try:
-        full_url = urljoin(BASE_URL, path)
-        response = SESSION.get(full_url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
+        return _fetch_soup(path)
     except requests.RequestException as e:
         st.error(f"Sayfa alınamadı: {e}")
         return None
 
-def download_and_process_pdf(pdf_kaynak: str) -> tuple[list[str], int]:
+def _load_genre_links() -> list[tuple[str, str]]:
+    soup = _fetch_soup("/")
+    links, seen = [], set()
+    for a in soup.find_all("a", href=True):
+        name = a.get_text(strip=True)
+        if name and name not in seen:
+            seen.add(name)
+            links.append((name, a['href']))
+    return links
+
+def _load_genre_book_urls(genre_url: str) -> list[str]:
+    soup = _fetch_soup(genre_url)
+    return [urljoin(BASE_URL, a['href']) for a in soup.select("div.card-action a[href]")]
+
+def get_genre_links() -> Optional[list[tuple[str, str]]]:
     """
-    PDF'i indirir veya yerel dosyayı açar ve metin içeriğini çıkarır.
-    DÜZELTME: Metin çıkarma yöntemi, karmaşık ve taranmış PDF'lerle başa çıkmak için iyileştirildi.
+    Ana sayfadaki bağlantıları (ad, href) çiftleri olarak döndürür; tür butonları buradan seçilir.
+    Sonuç TTL önbelleğinden gelir; süresi geçmişse eski liste gösterilip arka planda yenilenir.
+    """
+    try:
+        return _LISTING_CACHE.get(("genres",), _load_genre_links)
+    except requests.RequestException as e:
+        st.error(f"Sayfa alınamadı: {e}")
+        return None
+
+def get_genre_book_urls(genre_url: str) -> Optional[list[str]]:
+    """Bir tür sayfasındaki kitap bağlantılarını (tam URL) önbellekli olarak döndürür."""
+    try:
+        return _LISTING_CACHE.get(("genre_books", genre_url), lambda: _load_genre_book_urls(genre_url))
+    except requests.RequestException as e:
+        st.error(f"Sayfa alınamadı: {e}")
+        return None
+
+def fetch_validators(url: str) -> dict:
+    """
+    Kaynağın ETag ve Last-Modified başlıklarını HEAD isteğiyle alır.
+    İstek başarısız olursa boş sözlük döner (hata arayüze yansıtılmaz).
     """
-    temp_file_path = None
     try:
-        is_url = pdf_kaynak.startswith(('http://', 'https://'))
-        if is_url:
-            response = requests.get(pdf_kaynak, headers=HEADERS, timeout=30)
-            response.raise_for_status()
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
-            pdf_path = temp_file_path
-        else:
-            pdf_path = pdf_kaynak
+        response = SESSION.head(url, headers=HEADERS, timeout=10, allow_redirects=True)
+        response.raise_for_status()
+    except requests.RequestException:
+        return {}
+    validators = {}
+    if response.headers.get("ETag"):
+        validators["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["last_modified"] = response.headers["Last-Modified"]
+    return validators
+
+def extract_page_text(page) -> str:
+    """
+    Tek bir PDF sayfasının temizlenmiş metnini döndürür.
+    Çok kısa veya boş sayfalar için boş string döner.
+    """
+    # DÜZELTME: Metni daha akıllıca çıkarmak için "dict" formatını kullanıyoruz.
+    # Bu, metnin konumunu ve yapısını daha iyi analiz etmemizi sağlar.
+    page_dict = page.get_text("dict", sort=True)
+    page_content = []
+    
+    for block in page_dict.get("blocks", []):
+        if block['type'] == 0: # Metin bloklarını işle
+            for line in block.get("lines", []):
+                line_text = ""
+                for span in line.get("spans", []):
+                    line_text += span.get("text", "")
+                page_content.append(line_text.strip())
+    
+    # DÜZELTME: Satır sonlarındaki tireleri birleştirerek kelimelerin bölünmesini engelle
+    full_page_text = " ".join(page_content)
+    full_page_text = re.sub(r'-\s+', '', full_page_text)
+    
+    # DÜZELTME: Anlamsız karakterleri ve gereksiz boşlukları temizle
+    cleaned_text = re.sub(r'\s+', ' ', full_page_text).strip()
+    
+    if len(cleaned_text) > 10: # Çok kısa veya boş sayfaları atla
+        return cleaned_text
+    return ""
+
+def _read_download_meta(meta_path: str) -> dict:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
+def download_to_file(url: str, dest_path: str, max_bytes: int = MAX_DOWNLOAD_BYTES) -> bool:
+    """
+    URL'deki içeriği parça parça diske yazar; yanıt gövdesi hiçbir zaman tamamen belleğe alınmaz.
+    Dosya daha önce indirildiyse saklanan ETag/Last-Modified ile koşullu istek gönderilir ve
+    içerik değişmemişse (304) yeniden aktarılmaz. İçerik güncellendiyse True döner.
+    Boyut sınırı aşılırsa ValueError fırlatılır ve yarım dosya silinir.
+    """
+    meta_path = f"{dest_path}.meta.json"
+    request_headers = dict(HEADERS)
+    if os.path.exists(dest_path):
+        meta = _read_download_meta(meta_path)
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    with SESSION.get(url, headers=request_headers, timeout=30, stream=True) as response:
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+
+        declared_size = int(response.headers.get("Content-Length") or 0)
+        if declared_size > max_bytes:
+            raise ValueError(f"Dosya çok büyük ({declared_size // (1024 * 1024)} MB); sınır {max_bytes // (1024 * 1024)} MB.")
+
+        dest_dir = os.path.dirname(dest_path) or "."
+        os.makedirs(dest_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".tmp")
+        try:
+            written = 0
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ValueError(f"Dosya {max_bytes // (1024 * 1024)} MB sınırını aşıyor.")
+                    f.write(chunk)
+            os.replace(tmp_path, dest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return True
+
+def download_pdf_to_cache(url: str) -> str:
+    """
+    URL'deki PDF'i kalıcı önbellek dizinine indirir ve dosya yolunu döndürür.
+    Dosya daha önce indirildiyse koşullu istekle yalnızca değiştiyse yeniden indirilir.
+    """
+    pdf_path = os.path.join(PDF_CACHE_DIR, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.pdf")
+    try:
+        if download_to_file(url, pdf_path):
+            _PDF_CACHE_BUDGET.added(os.path.getsize(pdf_path))
+            return pdf_path
+    except requests.RequestException:
+        # Sunucuya ulaşılamıyorsa elimizdeki kopya ile devam et
+        if not os.path.exists(pdf_path):
+            raise
+    _PDF_CACHE_BUDGET.touch(pdf_path)  # LRU için erişim zamanını güncelle
+    return pdf_path
+
+class LazyPdfPages(Sequence):
+    """
+    PDF sayfalarını ihtiyaç duyuldukça çıkaran, liste gibi davranan görünüm.
+    Belge bir kez açılır; her sayfa ilk erişimde çıkarılır ve sayfa dizininde saklanır.
+    Böylece kaldığı yerden devam eden bir dinleyici için ilk sesin gelme süresi
+    kitabın uzunluğundan bağımsız olur. Kısa/boş sayfalar boş string olarak döner;
+    bu sayede indeksler fiziksel sayfa numaralarıyla birebir eşleşir.
+    """
+
+    def __init__(self, pdf_path: str):
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF dosyası bulunamadı: {pdf_path}")
+        self.pdf_path = pdf_path
+        self._doc = None
+        self._page_index: dict[int, str] = {}  # fiziksel sayfa -> çıkarılmış metin
+        self._lock = threading.Lock()  # fitz belgeleri iş parçacığı güvenli değildir
+        self._background: list[Future] = []  # arka plan çıkarma işleri
+        self._page_count = self._open().page_count
 
-        doc = fitz.open(pdf_path)
-        pages_text = []
-        for page_num, page in enumerate(doc):
-            # DÜZELTME: Metni daha akıllıca çıkarmak için "dict" formatını kullanıyoruz.
-            # Bu, metnin konumunu ve yapısını daha iyi analiz etmemizi sağlar.
-            page_dict = page.get_text("dict", sort=True)
-            page_content = []
-            
-            for block in page_dict.get("blocks", []):
-                if block['type'] == 0: # Metin bloklarını işle
-                    for line in block.get("lines", []):
-                        line_text = ""
-                        for span in line.get("spans", []):
-                            line_text += span.get("text", "")
-                        page_content.append(line_text.strip())
-            
-            # DÜZELTME: Satır sonlarındaki tireleri birleştirerek kelimelerin bölünmesini engelle
-            full_page_text = " ".join(page_content)
-            full_page_text = re.sub(r'-\s+', '', full_page_text)
-            
-            # DÜZELTME: Anlamsız karakterleri ve gereksiz boşlukları temizle
-            cleaned_text = re.sub(r'\s+', ' ', full_page_text).strip()
-            
-            # Sadece anlamlı metin içeren sayfaları ekle
-            if cleaned_text and len(cleaned_text) > 10: # Çok kısa veya boş sayfaları atla
-                 pages_text.append(cleaned_text)
-
-        physical_pages = doc.page_count
-        doc.close()
-        return pages_text, physical_pages
+    def _open(self):
+        if self._doc is None or self._doc.is_closed:
+            self._doc = fitz.open(self.pdf_path)
+        return self._doc
+
+    def __len__(self) -> int:
+        return self._page_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PDF sayfa indeksi aralık dışında")
+
+        text = self._page_index.get(index)
+        if text is None:
+            with self._lock:
+                text = self._page_index.get(index)
+                if text is None:
+                    text = extract_page_text(self._open().load_page(index))
+                    self._page_index[index] = text
+        return text
+
+    def iter_pages(self, start: int = 0):
+        """Verilen sayfadan başlayarak (indeks, metin) çiftlerini tembel şekilde üretir."""
+        for index in range(max(0, start), len(self)):
+            yield index, self[index]
+
+    def extract_in_background(self, start: int = 0, workers: Optional[int] = None) -> list[Future]:
+        """
+        Büyük belgelerde tüm sayfaları paylaşılan süreç havuzunda arka planda çıkarır ve sonuçları
+        sayfa dizinine yazar; oynatıcı ilerledikçe sonraki sayfalar ilk erişimde hazır bulunur.
+        Aralıklar `start` sayfasından başlanarak gönderilir. Belge küçükse, tek işçi varsa veya
+        çıkarma zaten başlatıldıysa hiçbir iş gönderilmez. Her aralık için, sayfaları dizine
+        yazıldığında tamamlanan bir Future döndürür.
+        """
+        workers = PDF_EXTRACTION_WORKERS if workers is None else workers
+        if workers <= 1 or len(self) < PARALLEL_PDF_MIN_PAGES:
+            return []
+        with self._lock:
+            if self._background:
+                return []
+            ranges = _page_ranges(len(self), workers)
+            first = next((i for i, (_, stop) in enumerate(ranges) if start < stop), 0)
+            executor = _get_extraction_executor(workers)
+            stored_futures = []
+            try:
+                for range_start, range_stop in ranges[first:] + ranges[:first]:
+                    if all(index in self._page_index for index in range(range_start, range_stop)):
+                        continue
+                    future = executor.submit(_extract_page_range, self.pdf_path, range_start, range_stop)
+                    stored = Future()
+                    future.add_done_callback(
+                        lambda done, offset=range_start, stored=stored: self._store_range(offset, done, stored))
+                    self._background.append(future)
+                    stored_futures.append(stored)
+            except BrokenProcessPool:
+                _discard_extraction_executor(workers, executor)
+                logging.warning(f"Arka plan PDF çıkarma başlatılamadı ({self.pdf_path}): süreç havuzu çöktü.")
+            return stored_futures
+
+    def _store_range(self, start: int, future: Future, stored: Future) -> None:
+        if future.cancelled():
+            stored.cancel()
+            return
+        error = future.exception()
+        if error is not None:
+            # Sayfalar ilk erişimde bu süreçte çıkarılmaya devam eder
+            logging.warning(f"Arka plan PDF çıkarma başarısız ({self.pdf_path}, sayfa {start}): {error}")
+            stored.set_exception(error)
+            return
+        for offset, text in enumerate(future.result()):
+            self._page_index.setdefault(start + offset, text)
+        stored.set_result(None)
+
+    def close(self) -> None:
+        with self._lock:
+            for future in self._background:
+                future.cancel()
+            if self._doc is not None and not self._doc.is_closed:
+                self._doc.close()
+
+def open_lazy_pdf(pdf_kaynak: str) -> LazyPdfPages:
+    """URL veya yerel dosya için tembel sayfa görünümü oluşturur."""
+    if pdf_kaynak.startswith(('http://', 'https://')):
+        return LazyPdfPages(download_pdf_to_cache(pdf_kaynak))
+    return LazyPdfPages(pdf_kaynak)
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> list[str]:
+    """İşçi süreçte çalışır: belgeyi kendi açar ve [start, stop) aralığındaki sayfaları çıkarır."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [extract_page_text(doc.load_page(index)) for index in range(start, stop)]
     finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+        doc.close()
 
-def extract_text_from_html(url: str) -> str:
+def _get_extraction_executor(workers: int) -> ProcessPoolExecutor:
+    """Verilen işçi sayısı için süreç genelinde paylaşılan çıkarma havuzunu döndürür."""
+    with _EXTRACTION_EXECUTORS_LOCK:
+        executor = _EXTRACTION_EXECUTORS.get(workers)
+        if executor is None:
+            executor = _EXTRACTION_EXECUTORS[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+def _discard_extraction_executor(workers: int, executor: ProcessPoolExecutor) -> None:
+    """Çöken bir işçi havuzu kullanılamaz hale gelir; sonraki çağrı yenisini açar."""
+    with _EXTRACTION_EXECUTORS_LOCK:
+        if _EXTRACTION_EXECUTORS.get(workers) is executor:
+            del _EXTRACTION_EXECUTORS[workers]
+
+def _page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    """Sayfaları [start, stop) aralıklarına böler; yük dengesi için işçi başına birkaç aralık oluşturulur."""
+    range_count = min(page_count, workers * 4)
+    step = -(-page_count // range_count)  # yukarı yuvarlanmış bölme
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+def _extract_pages_parallel(pdf_path: str, page_count: int, workers: int) -> list[str]:
+    """Sayfa aralıklarını paylaşılan süreç havuzuna dağıtır ve sonuçları sayfa sırasıyla birleştirir."""
+    ranges = _page_ranges(page_count, workers)
+    executor = _get_extraction_executor(workers)
+    futures = [executor.submit(_extract_page_range, pdf_path, start, stop) for start, stop in ranges]
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+    except BrokenProcessPool:
+        _discard_extraction_executor(workers, executor)
+        raise
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return pages
+
+def download_and_process_pdf(pdf_kaynak: str, workers: Optional[int] = None) -> tuple[list[str], int]:
+    """
+    PDF'i indirir veya yerel dosyayı açar ve metin içeriğini çıkarır.
+    DÜZELTME: Metin çıkarma yöntemi, karmaşık ve taranmış PDF'lerle başa çıkmak için iyileştirildi.
+    Büyük belgelerde sayfalar `workers` süreçe bölünerek paralel çıkarılır; workers=1 seri çalışır.
+    """
+    is_url = pdf_kaynak.startswith(('http://', 'https://'))
+    # URL'ler akış halinde önbellek dizinine indirilir; değişmemiş dosyalar tekrar aktarılmaz
+    pdf_path = download_pdf_to_cache(pdf_kaynak) if is_url else pdf_kaynak
+
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"PDF dosyası bulunamadı: {pdf_path}")
+
+    doc = fitz.open(pdf_path)
+    physical_pages = doc.page_count
+    workers = PDF_EXTRACTION_WORKERS if workers is None else workers
+
+    if workers > 1 and physical_pages >= PARALLEL_PDF_MIN_PAGES:
+        doc.close()
+        extracted_pages = _extract_pages_parallel(pdf_path, physical_pages, workers)
+    else:
+        extracted_pages = [extract_page_text(page) for page in doc]
+        doc.close()
+
+    # Kısa/boş sayfalar boş string olarak kalır; LazyPdfPages'teki gibi indeksler fiziksel
+    # sayfa numaralarıyla eşleşir ve PagePacker oynatıcıyla aynı parçaları üretir
+    return extracted_pages, physical_pages
+
+def extract_text_from_html(url: str, timings: Optional[dict] = None) -> str:
+    """
+    Web sayfasının yalnızca ana içerik metnini döndürür (menü, alt bilgi vb. atılır).
+    `timings` verilirse fetch ve çıkarma aşamalarının süreleri bu sözlüğe yazılır.
+    """
+    try:
+        started = time.perf_counter()
+        response = SESSION.get(url, headers=HEADERS, timeout=30)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        for script in soup(["script", "style"]):
-            script.extract()
-        return soup.get_text(separator=' ', strip=True)
+        if timings is not None:
+            timings["fetch"] = time.perf_counter() - started
+        return extract_main_text(response.text, timings)
     except Exception as e:
         st.error(f"HTML metni okunurken hata: {e}")
         return ""
+
+def load_book_pages(kaynak: str) -> tuple[list[str], int]:
+    """
+    Oynatıcının seslendireceği sayfa listesini ve toplam sayfa sayısını döndürür.
+    PDF'ler fiziksel sayfalara, web sayfaları ise TTS byte limitine göre bölünür.
+    Oynatıcı ve ön seslendirme işi aynı parçalamayı kullansın diye tek yerde tutulur.
+    """
+    if kaynak.lower().endswith(".pdf"):
+        return download_and_process_pdf(kaynak)
+
+    text = extract_text_from_html(kaynak)
+    pages = split_text_by_bytes(text)
+    return pages, len(pages)
@@ -0,0 +1,79 @@
+# utils/disk_budget.py
+
+import os
+import logging
+import threading
+
+
+class DiskBudget:
+    """
+    Bir önbellek dizininin diskte kapladığı toplam boyutu sınırlar.
+
+    Dosyaların değiştirilme zamanı (mtime) son erişim zamanı olarak kullanılır: okuyanlar
+    `touch`, yazanlar `added` çağırır. Sınır aşıldığında en uzun süredir kullanılmayan
+    dosyalar sınırın %90'ına inilene kadar silinir (LRU); böylece her yazmada tarama yapılmaz.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str, sidecar_suffixes: tuple[str, ...] = ()):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.sidecar_suffixes = sidecar_suffixes  # Dosyayla birlikte silinecek yan dosyalar
+        self._lock = threading.Lock()
+        self._total_bytes = None  # İlk yazmada diskten hesaplanır
+
+    def touch(self, path: str) -> None:
+        """Dosyanın erişim zamanını günceller (LRU sırası için)."""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def added(self, size: int) -> None:
+        """Dizine `size` baytlık yeni bir dosya yazıldığını bildirir; gerekirse eski dosyaları siler."""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            else:
+                self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _iter_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _scan_total_bytes(self) -> int:
+        return sum(size for _, _, size in self._iter_entries())
+
+    def _evict(self) -> None:
+        # Başka süreçler de aynı dizine yazabildiği için toplam boyut diskten yeniden hesaplanır
+        entries = sorted(self._iter_entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+            for sidecar_suffix in self.sidecar_suffixes:
+                try:
+                    os.remove(f"{path}{sidecar_suffix}")
+                except OSError:
+                    pass
+        if removed:
+            logging.info(f"{self.directory}: {removed} eski önbellek dosyası silindi.")
+        self._total_bytes = total
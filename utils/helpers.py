@@ -28,35 +28,76 @@ def normalize_url(url: str) -> str:
     except Exception:
         return url
 
-def split_text_by_bytes(text: str, max_bytes=4800) -> list[str]:
+# Paragraf ve cümle sınırları; parçalar mümkünse bu noktalardan bölünür.
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+")
+# Parça bu oranda dolduysa yeni paragraf bir sonraki parçaya bırakılır.
+_PARAGRAPH_BREAK_RATIO = 0.75
+
+def _split_oversized_word(word: str, max_bytes: int):
+    """Tek başına limiti aşan bir kelimeyi karakter sınırlarından böler."""
+    piece, piece_bytes = [], 0
+    for char in word:
+        char_bytes = len(char.encode('utf-8'))
+        if piece and piece_bytes + char_bytes > max_bytes:
+            yield "".join(piece), piece_bytes
+            piece, piece_bytes = [], 0
+        piece.append(char)
+        piece_bytes += char_bytes
+    if piece:
+        yield "".join(piece), piece_bytes
+
+def _sentence_units(sentence: str, sentence_bytes: int, max_bytes: int):
+    """Cümle limite sığıyorsa tek parça, sığmıyorsa kelime kelime döndürülür."""
+    if sentence_bytes <= max_bytes:
+        yield sentence, sentence_bytes
+        return
+    for word in sentence.split(" "):
+        word_bytes = len(word.encode('utf-8'))
+        if word_bytes > max_bytes:
+            yield from _split_oversized_word(word, max_bytes)
+        else:
+            yield word, word_bytes
+
+def iter_text_chunks(text: str, max_bytes=4800):
     """
-    DÜZELTME: Metni, kelime kelime işleyerek UTF-8'de belirtilen byte limitini
-    aşmayacak parçalara bölen daha güvenilir bir fonksiyon.
+    Metni UTF-8'de max_bytes sınırını aşmayan parçalara bölerek tembel (lazy) şekilde üretir.
+    Her cümle yalnızca bir kez kodlanır ve parça boyutu artımlı olarak izlenir; böylece
+    çalışma süresi metin uzunluğuyla doğrusal kalır. Parçalar mümkün olduğunca cümle ve
+    paragraf sınırlarından bölünür; boşluklar tek boşluğa indirgenir.
     """
     if not text:
-        return []
-    
-    chunks = []
-    current_chunk = ""
-    words = text.split() # Metni kelimelere ayır
-
-    for word in words:
-        # Kelimeyi mevcut parçaya eklediğimizde limiti aşıyor mu diye kontrol et
-        if len((current_chunk + " " + word).encode('utf-8')) > max_bytes:
-            # Eğer aşıyorsa, mevcut parçayı listeye ekle
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            # Yeni parçayı bu kelimeyle başlat
-            current_chunk = word
-        else:
-            # Limiti aşmıyorsa, kelimeyi mevcut parçaya ekle
-            if current_chunk:
-                current_chunk += " " + word
-            else:
-                current_chunk = word
-    
-    # Döngü bittikten sonra kalan son parçayı da listeye ekle
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-        
-    return chunks
\ No newline at end of file
+        return
+
+    parts, size = [], 0
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        paragraph_start = True
+        for raw_sentence in _SENTENCE_SPLIT.split(paragraph):
+            sentence = " ".join(raw_sentence.split())
+            if not sentence:
+                continue
+            sentence_bytes = len(sentence.encode('utf-8'))
+
+            # Parça yeterince doluysa yeni paragrafı bir sonraki parçaya bırak
+            if paragraph_start and parts and size >= max_bytes * _PARAGRAPH_BREAK_RATIO:
+                yield " ".join(parts)
+                parts, size = [], 0
+            paragraph_start = False
+
+            for unit, unit_bytes in _sentence_units(sentence, sentence_bytes, max_bytes):
+                separator_bytes = 1 if parts else 0
+                if size + separator_bytes + unit_bytes > max_bytes:
+                    yield " ".join(parts)
+                    parts, size, separator_bytes = [], 0, 0
+                parts.append(unit)
+                size += separator_bytes + unit_bytes
+
+    if parts:
+        yield " ".join(parts)
+
+def split_text_by_bytes(text: str, max_bytes=4800) -> list[str]:
+    """
+    Metni, UTF-8'de belirtilen byte limitini aşmayan parçalara bölerek liste olarak döndürür.
+    Parçalama mantığı için bkz. iter_text_chunks.
+    """
+    return list(iter_text_chunks(text, max_bytes))
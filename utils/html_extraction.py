@@ -0,0 +1,265 @@
+# utils/html_extraction.py
+
+"""
+Web sayfalarından seslendirilecek ana metni çıkaran motor.
+
+Sayfa doğrudan `lxml` ağacına ayrıştırılır (BeautifulSoup katmanı kullanılmaz) ve ağaç
+üzerindeki işler lxml'in C tarafındaki yineleyicileri ile XPath'e bırakılır: metin içermeyen
+etiketler tek çağrıyla silinir; ana içerik işaretleri, puanlanacak paragraflar ve temizlenecek
+(menü, paylaşım, yorum...) bloklar Python'da her düğüm dolaşılmadan toplanır. Ana içerik
+seçildikten sonra yalnızca onun içindeki bloklar silinir ve metin seçilen bloktan çıkarılır.
+Her aşamanın süresi isteğe bağlı `timings` sözlüğüne yazılır.
+
+lxml kurulu değilse `html.parser` ile sayfanın tüm metni döndürülür.
+"""
+
+import re
+import time
+import logging
+from typing import Optional
+
+try:
+    from lxml import etree
+    HTML_PARSER = "lxml"
+except ImportError:
+    etree = None
+    HTML_PARSER = "html.parser"
+
+# Metin içermeyen etiketler; ana içerik seçilmeden önce tüm sayfadan silinir
+_NON_TEXT_TAGS = ["script", "style", "noscript", "template", "iframe", "svg", "canvas"]
+# Ana içeriğin içinde seslendirilmeyecek etiketler
+_DROP_TAGS = frozenset(["form", "button", "select", "nav", "header", "footer", "aside"])
+# İçindeki paragraflar ana içerik puanlamasına katılmayan sayfa bölümleri
+_CHROME_TAGS = frozenset(["nav", "header", "footer", "aside", "form"])
+# class/id değerlerinden biri tam olarak bu kelimelerden biriyse blok tekrar eden sayfa parçasıdır.
+# Yalnızca bütün değerler eşleşir: "no-sidebar", "menu-open" gibi durum sınıfları atlanmaz.
+_BOILERPLATE_HINT = re.compile(
+    r"(nav|navbar|menu|footer|header|sidebar|breadcrumbs?|comments?|share|social|"
+    r"cookie|banner|advert|ads|popup|modal|related|widget|pagination)",
+    re.IGNORECASE,
+)
+# Ana içerik işaretleyen öğeler, öncelik sırasıyla: (etiket adı, öznitelik, değer); None her şeyle eşleşir
+_MAIN_MARKERS = [(None, "itemprop", "articleBody"), ("article", None, None), ("main", None, None),
+                 (None, "role", "main")]
+# Bağlantı yoğunluğu yalnızca en yüksek ham puanlı bu kadar aday için hesaplanır
+SCORED_CANDIDATES = 5
+# Metin sırasında paragraf sonu sayılan etiketler
+_BLOCK_TAGS = frozenset(["p", "div", "section", "article", "blockquote", "pre", "li", "tr",
+                        "h1", "h2", "h3", "h4", "h5", "h6"])
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Bu uzunluğun altındaki paragraflar (buton, etiket vb.) puanlamaya katılmaz
+MIN_PARAGRAPH_CHARS = 25
+# Seçilen bloğun ana içerik sayılması için gereken en az metin uzunluğu
+MIN_MAIN_CONTENT_CHARS = 200
+
+
+class _StageTimer:
+    def __init__(self, timings: Optional[dict]):
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        if self.timings is not None:
+            self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+
+def _is_boilerplate(element) -> bool:
+    tokens = (element.get("class") or "").split() + (element.get("id") or "").split()
+    return any(_BOILERPLATE_HINT.fullmatch(token) for token in tokens)
+
+
+def _marker_rank(element) -> Optional[int]:
+    for rank, (name, attr, value) in enumerate(_MAIN_MARKERS):
+        if (name is None or element.tag == name) and (attr is None or element.get(attr) == value):
+            return rank
+    return None
+
+
+if etree is not None:
+    # Yorumlar ve işlem talimatları ayrıştırırken atılır; ağaçta yalnızca öğeler ve metin kalır
+    _LXML_PARSER = etree.HTMLParser(remove_comments=True, remove_pis=True)
+    # Boşluklar sadeleştirilmiş metin uzunluğu (C tarafında hesaplanır)
+    _TEXT_LENGTH = etree.XPath("string-length(normalize-space(.))")
+    _LINK_TEXT = etree.XPath("string(.)")
+    _MAIN_MARKER_XPATH = etree.XPath(
+        '//*[@itemprop="articleBody"] | //article | //main | //*[@role="main"]'
+    )
+    _CLASSED_XPATH = etree.XPath("//*[@class or @id]")
+
+
+def _text_length(element) -> int:
+    if not len(element):
+        # Alt öğesi olmayan (çoğu paragraf) öğelerde XPath çağrısına gerek yok
+        return len(" ".join((element.text or "").split()))
+    return int(_TEXT_LENGTH(element))
+
+
+def _link_density(element) -> float:
+    text_length = _text_length(element) or 1
+    link_length = sum(len(" ".join(_LINK_TEXT(a).split())) for a in element.iter("a"))
+    return link_length / text_length
+
+
+def _parse(html: str):
+    try:
+        return etree.fromstring(html, _LXML_PARSER)
+    except ValueError:
+        # Kodlama bildirimi içeren str belgeleri lxml yalnızca bayt olarak kabul eder
+        return etree.fromstring(html.encode("utf-8"), _LXML_PARSER)
+
+
+def _scan(document):
+    """
+    Her işaret türünün ilk örneğini, puanlanacak paragrafları ve temizlik adaylarını
+    döndürür. İşaretlerin üst öğeleri de döner; bunlar temizlikte hiçbir zaman silinmez.
+    Aramalar C tarafında yapılır; Python yalnızca eşleşen öğeleri ve class/id taşıyanları görür.
+    """
+    first_markers = {}
+    marker_ancestors = set()
+    for element in _MAIN_MARKER_XPATH(document):
+        first_markers.setdefault(_marker_rank(element), element)
+        marker_ancestors.update(element.iterancestors())
+
+    chrome = set()
+    for section in document.iter(*_CHROME_TAGS):
+        chrome.update(section.iter("p"))
+    paragraphs = [p for p in document.iter("p") if p not in chrome]
+
+    removable = list(document.iter(*_DROP_TAGS))
+    removable.extend(element for element in _CLASSED_XPATH(document) if _is_boilerplate(element))
+    return first_markers, marker_ancestors, paragraphs, removable
+
+
+def _drop_tree(element) -> None:
+    """Öğeyi alt ağacıyla siler; ardından gelen (tail) metin bir önceki düğüme eklenir."""
+    parent = element.getparent()
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + element.tail
+        else:
+            parent.text = (parent.text or "") + element.tail
+    parent.remove(element)
+
+
+def _select_main_content(document, first_markers: dict, paragraphs: list):
+    """
+    Ana içerik bloğunu ve temizlikte korunacak öğeleri döndürür; blok bulunamazsa
+    sayfanın gövdesine düşer.
+    """
+    for rank in sorted(first_markers):
+        element = first_markers[rank]
+        if _text_length(element) >= MIN_MAIN_CONTENT_CHARS:
+            return element, [element]
+
+    # Paragrafların uzunluğu üst öğesine tam, onun üstüne yarım puan olarak eklenir
+    scores: dict = {}
+    scored = []
+    for paragraph in paragraphs:
+        length = _text_length(paragraph)
+        if length < MIN_PARAGRAPH_CHARS:
+            continue
+        scored.append(paragraph)
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for element, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if element is None or element is document:
+                continue
+            scores[element] = scores.get(element, 0.0) + length * weight
+
+    best, best_score = None, 0.0
+    top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:SCORED_CANDIDATES]
+    for element, score in top:
+        score *= 1.0 - _link_density(element)
+        if score > best_score:
+            best, best_score = element, score
+
+    if best is not None and best_score >= MIN_MAIN_CONTENT_CHARS:
+        chosen = [p for p in scored if p.getparent() is best or p.getparent().getparent() is best]
+        return best, [best, *chosen]
+    root = document.find("body")
+    root = document if root is None else root
+    return root, [root]
+
+
+def _strip_boilerplate(root, keep: list, removable: list, marker_ancestors: set) -> None:
+    """
+    Temizlik adaylarından seçilen ana içeriğin içinde kalanları siler. `keep` içindeki öğeler
+    (puanlamada seçilen paragraflar) ve bunları içeren etiketler ile iç içe bir ana içerik
+    işareti (article, main...) barındıran etiketler hiçbir zaman silinmez.
+    """
+    protected = set()
+    for element in keep:
+        protected.add(element)
+        if element is not root:
+            for ancestor in element.iterancestors():
+                protected.add(ancestor)
+                if ancestor is root:
+                    break
+
+    for element in removable:
+        if element in protected or element in marker_ancestors or element is root:
+            continue
+        # Kökün dışında kalanlar ve üst öğesiyle birlikte silinmiş olanlar atlanır
+        for ancestor in element.iterancestors():
+            if ancestor is root:
+                _drop_tree(element)
+                break
+
+
+def _block_text(root) -> str:
+    """
+    Blok etiketlerinin başına ve sonuna paragraf sonu ekleyip metni tek itertext çağrısıyla
+    çıkarır ve boşlukları sadeleştirir. Ağaç bu aşamadan sonra kullanılmadığı için yerinde değiştirilir.
+    """
+    for element in root.iter(*_BLOCK_TAGS):
+        element.text = "\n\n" + (element.text or "")
+        element.tail = "\n\n" + (element.tail or "")
+    for element in root.iter("br"):
+        element.tail = "\n" + (element.tail or "")
+    text = "".join(root.itertext())
+    paragraphs = (" ".join(part.split()) for part in _PARAGRAPH_BREAK.split(text))
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+def _extract_full_text(html: str) -> str:
+    """lxml yokken kullanılan yedek: sayfanın tüm metni, yalnızca script/style atılır."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(_NON_TEXT_TAGS):
+        tag.decompose()
+    return soup.get_text(separator="\n\n", strip=True)
+
+
+def extract_main_text(html: str, timings: Optional[dict] = None) -> str:
+    """
+    HTML belgesinden yalnızca ana içeriğin metnini döndürür. Paragraflar boş satırla
+    ayrılır, böylece TTS parçalayıcı paragraf sınırlarında bölebilir.
+    `timings` verilirse parse/clean/select/text aşamalarının saniye cinsinden süreleri eklenir.
+    """
+    if etree is None:
+        return _extract_full_text(html)
+    if not html.strip():
+        return ""
+
+    timer = _StageTimer(timings)
+    document = _parse(html)
+    timer.mark("parse")
+    etree.strip_elements(document, *_NON_TEXT_TAGS, with_tail=False)
+    timer.mark("clean")
+    if document is None:
+        return ""
+    first_markers, marker_ancestors, paragraphs, removable = _scan(document)
+    root, keep = _select_main_content(document, first_markers, paragraphs)
+    timer.mark("select")
+    # Temizlik ana içerik seçildikten sonra ve yalnızca onun içinde yapılır; sayfanın
+    # sarmalayıcısındaki bir sınıf yüzünden içeriğin tamamı silinemez
+    _strip_boilerplate(root, keep, removable, marker_ancestors)
+    timer.mark("clean")
+    text = _block_text(root)
+    timer.mark("text")
+    logging.debug(f"HTML metni çıkarıldı ({HTML_PARSER}): {len(html)} -> {len(text)} karakter, {timings}")
+    return text
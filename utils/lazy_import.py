@@ -0,0 +1,53 @@
+# utils/lazy_import.py
+
+import sys
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+    Gerçek modülü ilk öznitelik erişiminde içe aktaran vekil.
+
+    `pygame = lazy_import("pygame")` satırı hiçbir şey yüklemez; `pygame.mixer` ilk
+    kullanıldığında modül içe aktarılır ve sonraki erişimler doğrudan ona gider.
+    Modül kurulu değilse ImportError da ancak bu ilk kullanımda yükselir.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "yüklendi" if self.__dict__["_lazy_module"] is not None else "henüz yüklenmedi"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Modülü gerektiğinde yüklenecek şekilde döndürür. Daha önce yüklenmişse
+    (örn. başka bir sayfa kullandıysa) gerçek modül hemen döndürülür.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
@@ -0,0 +1,75 @@
+# utils/ttl_cache.py
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Süreç içi, stale-while-revalidate davranışlı TTL önbelleği.
+
+    - Kayıt `ttl` saniyeden yeniyse doğrudan döner.
+    - `ttl` ile `max_stale` arasındaysa eski değer hemen döner ve değer arka planda
+      (anahtar başına en fazla bir iş parçacığıyla) yenilenir.
+    - Kayıt yoksa veya `max_stale`'den eskiyse yükleyici senkron olarak çağrılır.
+    Yükleyici None döndürür veya hata verirse sonuç önbelleğe alınmaz.
+    """
+
+    def __init__(self, ttl: float, max_stale: float, max_items: int = 256):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_items = max_items
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        try:
+            value = loader()
+            if value is not None:
+                self._store(key, value)
+        except Exception as e:
+            logging.warning(f"Önbellek kaydı arka planda yenilenemedi ({key}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                return value
+            if age < self.max_stale:
+                with self._lock:
+                    start_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start_refresh:
+                    threading.Thread(target=self._refresh, args=(key, loader), daemon=True,
+                                     name="ttl-cache-refresh").start()
+                return value
+
+        value = loader()
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Verilen anahtarı veya anahtar verilmezse tüm kayıtları siler."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -3,6 +3,7 @@ import base64
 import os
 from pathlib import Path
 from core.database import get_users_collection
+from core.user_cache import get_session_user, invalidate_session_user
 from bson.objectid import ObjectId
 
 def load_css(css_file):
@@ -43,9 +44,7 @@ def get_user_theme():
     """Kullanıcının tema tercihini getirir. Varsayılan: Açık Tema"""
     if 'user_id' in st.session_state and st.session_state.user_id:
         try:
-            users_collection = get_users_collection()
-            user_id_obj = ObjectId(st.session_state.user_id)
-            user = users_collection.find_one({"_id": user_id_obj})
+            user = get_session_user()
             if user and "preferences" in user:
                 return user["preferences"].get("theme", "Açık Tema")
         except Exception:
@@ -76,7 +75,7 @@ def save_user_theme(user_id, theme: str) -> bool:
         users_collection = get_users_collection()
         
         # Mevcut tema tercihini kontrol et
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
+        user = get_session_user(user_id)
         current_theme = "Açık Tema"  # Varsayılan
         if user and "preferences" in user:
             current_theme = user["preferences"].get("theme", "Açık Tema")
@@ -93,6 +92,7 @@ def save_user_theme(user_id, theme: str) -> bool:
         
         # Başarılı olursa session state'i işaretle
         if result.modified_count > 0:
+            invalidate_session_user()
             st.session_state.theme_changed = True
             return True
         return False